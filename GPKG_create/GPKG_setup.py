@@ -1,15 +1,9 @@
 from qgis.core import (
     QgsProject,
     QgsVectorLayer,
-    QgsFields,
-    QgsField,
-    QgsVectorFileWriter,
-    QgsWkbTypes,
     QgsEditorWidgetSetup,
     QgsDefaultValue,
     QgsFieldConstraints,
-    QgsProviderRegistry,
-    QgsFeature,
     QgsEditFormConfig,
     QgsAttributeEditorContainer,
     QgsAttributeEditorField,
@@ -18,628 +12,18 @@ from qgis.core import (
     QgsRelation
 )
 from qgis.PyQt.QtWidgets import QFileDialog, QApplication
-from qgis.PyQt.QtCore import QVariant
-import pandas as pd
 import uuid
 import os
+import sys
 import gc
 
-CONST_LANGUAGE = 'lt' # Change the language code to the desired language
-
-gpkg_layers_config = {
-    'accessibility_domain': {
-        'geometry': 'None',
-        'attributes': {
-            'code': {'type': QVariant.String, 'notnull': True},
-            'value': {'type': QVariant.String, 'notnull': True},
-        },
-    },
-    'access_control_domain': {
-        'geometry': 'None',
-        'attributes': {
-            'code': {'type': QVariant.String, 'notnull': True},
-            'value': {'type': QVariant.String, 'notnull': True},
-        },
-    },
-    'address': {
-        'geometry': 'None',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'address': {'type': QVariant.String, 'notnull': True},
-            'unit': {'type': QVariant.String, 'notnull': False},
-            'locality': {'type': QVariant.String, 'notnull': True},
-            'province': {'type': QVariant.String, 'notnull': False},
-            'country': {'type': QVariant.String, 'notnull': True},
-            'postal_code': {'type': QVariant.String, 'notnull': False},
-            'postal_code_ext': {'type': QVariant.String, 'notnull': False},
-            'postal_code_vanity': {'type': QVariant.String, 'notnull': False},
-        },
-    },
-    'venue': {
-        'geometry': 'Multipolygon',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'category': {'type': QVariant.String, 'notnull': True},
-            'restriction': {'type': QVariant.String, 'notnull': False},
-            'name': {'type': QVariant.StringList, 'notnull': True},
-            'alt_name': {'type': QVariant.StringList, 'notnull': False},
-            'hours': {'type': QVariant.String, 'notnull': False},
-            'phone': {'type': QVariant.String, 'notnull': False},
-            'website': {'type': QVariant.String, 'notnull': False},
-            'display_point': {'type': QVariant.String, 'notnull': True},
-            'address_id': {'type': QVariant.String, 'notnull': True},
-        },
-    },
-    'amenity': {
-        'geometry': 'Point',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'category': {'type': QVariant.String, 'notnull': True},
-            'accessibility': {'type': QVariant.String, 'notnull': False},
-            'name': {'type': QVariant.StringList, 'notnull': True},
-            'alt_name': {'type': QVariant.StringList, 'notnull': False},
-            'hours': {'type': QVariant.String, 'notnull': False},
-            'phone': {'type': QVariant.String, 'notnull': False},
-            'website': {'type': QVariant.String, 'notnull': False},
-            'address_id': {'type': QVariant.String, 'notnull': False},
-            'correlation_id': {'type': QVariant.String, 'notnull': False},
-        },
-    },
-    'anchor': {
-        'geometry': 'Point',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'address_id': {'type': QVariant.String, 'notnull': False},
-            'unit_id': {'type': QVariant.String, 'notnull': True},
-        },
-    },
-    'building': {
-        'geometry': 'None',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'name': {'type': QVariant.StringList, 'notnull': True},
-            'alt_name': {'type': QVariant.StringList, 'notnull': False},
-            'category': {'type': QVariant.String, 'notnull': True},
-            'restriction': {'type': QVariant.String, 'notnull': False},
-            'display_point': {'type': QVariant.String, 'notnull': False},
-            'address_id': {'type': QVariant.String, 'notnull': False},
-        },
-    },
-    'detail': {
-        'geometry': 'MultiLineString',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'level_id': {'type': QVariant.String, 'notnull': True},
-        },
-    },
-    'fixture': {
-        'geometry': 'Polygon',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'category': {'type': QVariant.String, 'notnull': True},
-            'name': {'type': QVariant.StringList, 'notnull': True},
-            'alt_name': {'type': QVariant.StringList, 'notnull': False},
-            'anchor_id': {'type': QVariant.String, 'notnull': False},
-            'level_id': {'type': QVariant.String, 'notnull': True},
-            'display_point': {'type': QVariant.String, 'notnull': False},
-        },
-    },
-    'footprint': {
-        'geometry': 'Multipolygon',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'category': {'type': QVariant.String, 'notnull': True},
-            'name': {'type': QVariant.StringList, 'notnull': True},
-        },
-    },
-    'geofence': {
-        'geometry': 'Polygon',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'category': {'type': QVariant.String, 'notnull': True},
-            'restriction': {'type': QVariant.String, 'notnull': False},
-            'name': {'type': QVariant.StringList, 'notnull': True},
-            'alt_name': {'type': QVariant.StringList, 'notnull': False},
-            'correlation_id': {'type': QVariant.String, 'notnull': False},
-            'display_point': {'type': QVariant.String, 'notnull': False},
-        },
-    },
-    'kiosk': {
-        'geometry': 'Polygon',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'name': {'type': QVariant.StringList, 'notnull': True},
-            'alt_name': {'type': QVariant.StringList, 'notnull': False},
-            'anchor_id': {'type': QVariant.String, 'notnull': False},
-            'level_id': {'type': QVariant.String, 'notnull': True},
-            'display_point': {'type': QVariant.String, 'notnull': False},
-        },
-    },
-    'level': {
-        'geometry': 'Multipolygon',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'category': {'type': QVariant.String, 'notnull': True},
-            'restriction': {'type': QVariant.String, 'notnull': False},
-            'outdoor': {'type': QVariant.Bool, 'notnull': True},
-            'ordinal': {'type': QVariant.Int, 'notnull': True},
-            'name': {'type': QVariant.StringList, 'notnull': True},
-            'short_name': {'type': QVariant.StringList, 'notnull': True},
-            'display_point': {'type': QVariant.String, 'notnull': False},
-            'address_id': {'type': QVariant.String, 'notnull': False},
-        },
-    },
-    'occupant': {
-        'geometry': 'None',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'name': {'type': QVariant.StringList, 'notnull': True},
-            'category': {'type': QVariant.String, 'notnull': True},
-            'anchor_id': {'type': QVariant.String, 'notnull': True},
-            'hours': {'type': QVariant.String, 'notnull': False},
-            'phone': {'type': QVariant.String, 'notnull': False},
-            'website': {'type': QVariant.String, 'notnull': False},
-            'start': {'type': QVariant.DateTime, 'notnull': False},
-            'end': {'type': QVariant.DateTime, 'notnull': False},
-            'modified': {'type': QVariant.DateTime, 'notnull': False},
-            'correlation_id': {'type': QVariant.String, 'notnull': False},
-        },
-    },
-    'opening': {
-        'geometry': 'String',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'category': {'type': QVariant.String, 'notnull': True},
-            'accessibility': {'type': QVariant.String, 'notnull': False},
-            'access_control': {'type': QVariant.String, 'notnull': False},
-            'type': {'type': QVariant.String, 'notnull': False},
-            'automatic': {'type': QVariant.Bool, 'notnull': False},
-            'material': {'type': QVariant.String, 'notnull': False},
-            'name': {'type': QVariant.StringList, 'notnull': True},
-            'alt_name': {'type': QVariant.StringList, 'notnull': False},
-            'display_point': {'type': QVariant.String, 'notnull': False},
-            'level_id': {'type': QVariant.String, 'notnull': True},
-        },
-    },
-    'relationship': {
-        'geometry': 'None',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'category': {'type': QVariant.String, 'notnull': True},
-            'direction': {'type': QVariant.String, 'notnull': True},
-            'origin_type': {'type': QVariant.String, 'notnull': False},
-            'origin_unit_id': {'type': QVariant.String, 'notnull': False},
-            'origin_opening_id': {'type': QVariant.String, 'notnull': False},
-            'intermediary_type': {'type': QVariant.String, 'notnull': False},
-            'destination_type': {'type': QVariant.String, 'notnull': False},
-            'destination_unit_id': {'type': QVariant.String, 'notnull': False},
-            'destination_opening_id': {'type': QVariant.String, 'notnull': False},
-            'hours': {'type': QVariant.String, 'notnull': False},
-        },
-    },
-    'section': {
-        'geometry': 'Polygon',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'category': {'type': QVariant.String, 'notnull': True},
-            'restriction': {'type': QVariant.String, 'notnull': False},
-            'accessibility': {'type': QVariant.String, 'notnull': False},
-            'name': {'type': QVariant.StringList, 'notnull': True},
-            'alt_name': {'type': QVariant.StringList, 'notnull': False},
-            'display_point': {'type': QVariant.String, 'notnull': False},
-            'level_id': {'type': QVariant.String, 'notnull': True},
-            'address_id': {'type': QVariant.String, 'notnull': False},
-            'correlation_id': {'type': QVariant.String, 'notnull': False},
-        },
-    },
-    'unit': {
-        'geometry': 'Polygon',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'category': {'type': QVariant.String, 'notnull': True},
-            'restriction': {'type': QVariant.String, 'notnull': False},
-            'accessibility': {'type': QVariant.String, 'notnull': False},
-            'name': {'type': QVariant.StringList, 'notnull': True},
-            'alt_name': {'type': QVariant.StringList, 'notnull': False},
-            'level_id': {'type': QVariant.String, 'notnull': True},
-            'display_point': {'type': QVariant.String, 'notnull': False},
-        },
-    },
-    'geofence_level': {
-        'geometry': 'None',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'geofence_id': {'type': QVariant.String, 'notnull': True},
-            'level_id': {'type': QVariant.String, 'notnull': True},
-        },
-    },
-    'level_building': {
-        'geometry': 'None',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'level_id': {'type': QVariant.String, 'notnull': True},
-            'building_id': {'type': QVariant.String, 'notnull': True},
-        },
-    },
-    'geofence_building': {
-        'geometry': 'None',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'geofence_id': {'type': QVariant.String, 'notnull': True},
-            'building_id': {'type': QVariant.String, 'notnull': True},
-        },
-    },
-    'footprint_building': {
-        'geometry': 'None',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'footprint_id': {'type': QVariant.String, 'notnull': True},
-            'building_id': {'type': QVariant.String, 'notnull': True},
-        },
-    },
-    'relationship_opening': {
-        'geometry': 'None',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'relationship_id': {'type': QVariant.String, 'notnull': True},
-            'opening_id': {'type': QVariant.String, 'notnull': True},
-        },
-    },
-    'relationship_unit': {
-        'geometry': 'None',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'relationship_id': {'type': QVariant.String, 'notnull': True},
-            'unit_id': {'type': QVariant.String, 'notnull': True},
-        },
-    },
-    'geofence_parent': {
-        'geometry': 'None',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'parent_id': {'type': QVariant.String, 'notnull': True},
-            'child_id': {'type': QVariant.String, 'notnull': True},
-        },
-    },
-    'section_parent': {
-        'geometry': 'None',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'parent_id': {'type': QVariant.String, 'notnull': True},
-            'child_id': {'type': QVariant.String, 'notnull': True},
-        },
-    },
-    'amenity_unit': {
-        'geometry': 'None',
-        'attributes': {
-            'id': {'type': QVariant.String, 'notnull': True},
-            'amenity_id': {'type': QVariant.String, 'notnull': True},
-            'unit_id': {'type': QVariant.String, 'notnull': True},
-        },
-    },
-}
-
-
-relationships_config = {
-    'section_correlation': {
-        'referenced_layer': 'section',
-        'referencing_layer': 'section',
-        'referenced_field': 'id',
-        'referencing_field': 'correlation_id',
-        'strength': QgsRelation.Association
-    },
-    'address_amenity': {
-        'referenced_layer': 'address',
-        'referencing_layer': 'amenity',
-        'referenced_field': 'id',
-        'referencing_field': 'address_id',
-        'strength': QgsRelation.Association
-    },
-    'amenity_correlation_id': {
-        'referenced_layer': 'amenity',
-        'referencing_layer': 'amenity',
-        'referenced_field': 'id',
-        'referencing_field': 'correlation_id',
-        'strength': QgsRelation.Association
-    },
-    'address_anchor': {
-        'referenced_layer': 'address',
-        'referencing_layer': 'anchor',
-        'referenced_field': 'id',
-        'referencing_field': 'address_id',
-        'strength': QgsRelation.Association
-    },
-    'unit_anchor': {
-        'referenced_layer': 'unit',
-        'referencing_layer': 'anchor',
-        'referenced_field': 'id',
-        'referencing_field': 'unit_id',
-        'strength': QgsRelation.Composition
-    },
-    'address_building': {
-        'referenced_layer': 'address',
-        'referencing_layer': 'building',
-        'referenced_field': 'id',
-        'referencing_field': 'address_id',
-        'strength': QgsRelation.Association
-    },
-    'level_detail': {
-        'referenced_layer': 'level',
-        'referencing_layer': 'detail',
-        'referenced_field': 'id',
-        'referencing_field': 'level_id',
-        'strength': QgsRelation.Composition
-    },
-    'anchor_fixture': {
-        'referenced_layer': 'anchor',
-        'referencing_layer': 'fixture',
-        'referenced_field': 'id',
-        'referencing_field': 'anchor_id',
-        'strength': QgsRelation.Association
-    },
-    'level_fixture': {
-        'referenced_layer': 'level',
-        'referencing_layer': 'fixture',
-        'referenced_field': 'id',
-        'referencing_field': 'level_id',
-        'strength': QgsRelation.Composition
-    },
-    'geofence_correlation_id': {
-        'referenced_layer': 'geofence',
-        'referencing_layer': 'geofence',
-        'referenced_field': 'id',
-        'referencing_field': 'correlation_id',
-        'strength': QgsRelation.Association
-    },
-    'anchor_kiosk': {
-        'referenced_layer': 'anchor',
-        'referencing_layer': 'kiosk',
-        'referenced_field': 'id',
-        'referencing_field': 'anchor_id',
-        'strength': QgsRelation.Association
-    },
-    'level_kiosk': {
-        'referenced_layer': 'level',
-        'referencing_layer': 'kiosk',
-        'referenced_field': 'id',
-        'referencing_field': 'level_id',
-        'strength': QgsRelation.Composition
-    },
-    'address_level': {
-        'referenced_layer': 'address',
-        'referencing_layer': 'level',
-        'referenced_field': 'id',
-        'referencing_field': 'address_id',
-        'strength': QgsRelation.Association
-    },
-    'anchor_occupant': {
-        'referenced_layer': 'anchor',
-        'referencing_layer': 'occupant',
-        'referenced_field': 'id',
-        'referencing_field': 'anchor_id',
-        'strength': QgsRelation.Association
-    },
-    'occupant_correlation_id': {
-        'referenced_layer': 'occupant',
-        'referencing_layer': 'occupant',
-        'referenced_field': 'id',
-        'referencing_field': 'correlation_id',
-        'strength': QgsRelation.Association
-    },
-    'level_opening': {
-        'referenced_layer': 'level',
-        'referencing_layer': 'opening',
-        'referenced_field': 'id',
-        'referencing_field': 'level_id',
-        'strength': QgsRelation.Composition
-    },
-    'unit_relationship': {
-        'referenced_layer': 'unit',
-        'referencing_layer': 'relationship',
-        'referenced_field': 'id',
-        'referencing_field': 'origin_unit_id',
-        'strength': QgsRelation.Composition
-    },
-    'opening_relationship': {
-        'referenced_layer': 'opening',
-        'referencing_layer': 'relationship',
-        'referenced_field': 'id',
-        'referencing_field': 'origin_opening_id',
-        'strength': QgsRelation.Composition
-    },
-    'unit_destination': {
-        'referenced_layer': 'unit',
-        'referencing_layer': 'relationship',
-        'referenced_field': 'id',
-        'referencing_field': 'destination_unit_id',
-        'strength': QgsRelation.Composition
-    },
-    'opening_destination': {
-        'referenced_layer': 'opening',
-        'referencing_layer': 'relationship',
-        'referenced_field': 'id',
-        'referencing_field': 'destination_opening_id',
-        'strength': QgsRelation.Composition
-    },
-    'level_section': {
-        'referenced_layer': 'level',
-        'referencing_layer': 'section',
-        'referenced_field': 'id',
-        'referencing_field': 'level_id',
-        'strength': QgsRelation.Composition
-    },
-    'address_section': {
-        'referenced_layer': 'address',
-        'referencing_layer': 'section',
-        'referenced_field': 'id',
-        'referencing_field': 'address_id',
-        'strength': QgsRelation.Association
-    },
-    'section_correlation_id': {
-        'referenced_layer': 'section',
-        'referencing_layer': 'section',
-        'referenced_field': 'id',
-        'referencing_field': 'correlation_id',
-        'strength': QgsRelation.Association
-    },
-    'level_unit': {
-        'referenced_layer': 'level',
-        'referencing_layer': 'unit',
-        'referenced_field': 'id',
-        'referencing_field': 'level_id',
-        'strength': QgsRelation.Composition
-    },
-    'address_venue': {
-        'referenced_layer': 'address',
-        'referencing_layer': 'venue',
-        'referenced_field': 'id',
-        'referencing_field': 'address_id',
-        'strength': QgsRelation.Association
-    },
-    'level_geofence_level': {
-        'referenced_layer': 'level',
-        'referencing_layer': 'geofence_level',
-        'referenced_field': 'id',
-        'referencing_field': 'level_id',
-        'strength': QgsRelation.Association
-    },
-    'geofence_level_ids': {
-        'referenced_layer': 'geofence',
-        'referencing_layer': 'geofence_level',
-        'referenced_field': 'id',
-        'referencing_field': 'geofence_id',
-        'strength': QgsRelation.Association
-    },
-    'level_building_ids': {
-        'referenced_layer': 'level',
-        'referencing_layer': 'level_building',
-        'referenced_field': 'id',
-        'referencing_field': 'level_id',
-        'strength': QgsRelation.Association
-    },
-    'building_level_building': {
-        'referenced_layer': 'building',
-        'referencing_layer': 'level_building',
-        'referenced_field': 'id',
-        'referencing_field': 'building_id',
-        'strength': QgsRelation.Association
-    },
-    'geofence_building_ids': {
-        'referenced_layer': 'geofence',
-        'referencing_layer': 'geofence_building',
-        'referenced_field': 'id',
-        'referencing_field': 'geofence_id',
-        'strength': QgsRelation.Association
-    },
-    'building_geofence_building': {
-        'referenced_layer': 'building',
-        'referencing_layer': 'geofence_building',
-        'referenced_field': 'id',
-        'referencing_field': 'building_id',
-        'strength': QgsRelation.Association
-    },
-    'footprint_building_ids': {
-        'referenced_layer': 'footprint',
-        'referencing_layer': 'footprint_building',
-        'referenced_field': 'id',
-        'referencing_field': 'footprint_id',
-        'strength': QgsRelation.Association
-    },
-    'building_footprint_building': {
-        'referenced_layer': 'building',
-        'referencing_layer': 'footprint_building',
-        'referenced_field': 'id',
-        'referencing_field': 'building_id',
-        'strength': QgsRelation.Association
-    },
-    'intermediary_opening_ids': {
-        'referenced_layer': 'relationship',
-        'referencing_layer': 'relationship_opening',
-        'referenced_field': 'id',
-        'referencing_field': 'relationship_id',
-        'strength': QgsRelation.Association
-    },
-    'opening_relationship_opening': {
-        'referenced_layer': 'opening',
-        'referencing_layer': 'relationship_opening',
-        'referenced_field': 'id',
-        'referencing_field': 'opening_id',
-        'strength': QgsRelation.Association
-    },
-    'intermediary_unit_ids': {
-        'referenced_layer': 'relationship',
-        'referencing_layer': 'relationship_unit',
-        'referenced_field': 'id',
-        'referencing_field': 'relationship_id',
-        'strength': QgsRelation.Association
-    },
-    'unit_relationship_unit': {
-        'referenced_layer': 'unit',
-        'referencing_layer': 'relationship_unit',
-        'referenced_field': 'id',
-        'referencing_field': 'unit_id',
-        'strength': QgsRelation.Association
-    },
-    'geofence_parent_ids': {
-        'referenced_layer': 'geofence',
-        'referencing_layer': 'geofence_parent',
-        'referenced_field': 'id',
-        'referencing_field': 'child_id',
-        'strength': QgsRelation.Association
-    },
-    'geofence_parent_child_ids': {
-        'referenced_layer': 'geofence',
-        'referencing_layer': 'geofence_parent',
-        'referenced_field': 'id',
-        'referencing_field': 'parent_id',
-        'strength': QgsRelation.Association
-    },
-    'section_parent_ids': {
-        'referenced_layer': 'section',
-        'referencing_layer': 'section_parent',
-        'referenced_field': 'id',
-        'referencing_field': 'child_id',
-        'strength': QgsRelation.Association
-    },
-    'section_parent_child_ids': {
-        'referenced_layer': 'section',
-        'referencing_layer': 'section_parent',
-        'referenced_field': 'id',
-        'referencing_field': 'parent_id',
-        'strength': QgsRelation.Association
-    },
-    'amenity_unit_ids': {
-        'referenced_layer': 'amenity',
-        'referencing_layer': 'amenity_unit',
-        'referenced_field': 'id',
-        'referencing_field': 'amenity_id',
-        'strength': QgsRelation.Association
-    },
-    'unit_amenity_unit': {
-        'referenced_layer': 'unit',
-        'referencing_layer': 'amenity_unit',
-        'referenced_field': 'id',
-        'referencing_field': 'unit_id',
-        'strength': QgsRelation.Association
-    },
-}
+# The layer schema lives in gpkg_schema.py next to this script
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from gpkg_schema import gpkg_layers_config, domain_fields_config, domain_config, relationships_config
+from gpkg_builder import build_gpkg
+from domain_loader import load_domains, read_domain_workbook
 
-domain_fields_config = {
-    'accessibility': 'accessibility_domain',
-    'access_control': 'access_control_domain'
-}
-
-domain_config = {
-    'Key': 'code',
-    'Value': 'code',
-    'AllowMulti': True,
-    'AllowNull': True,
-    'FilterExpression': '',
-    'OrderByValue': False,
-    'Description': 'value',
-    'UseCompleter': False,
-    'NofColumns': 1
-}
+CONST_LANGUAGE = 'lt' # Change the language code to the desired language
 
 layer_groups_config = {
     'IMDF features': [
@@ -657,64 +41,6 @@ layer_groups_config = {
     ]
 }
 
-def add_enum_domain(conn, constraint_name, values, table_name, column_name):
-    """Inserts an enum domain into the GeoPackage data column constraints table"""
-    # Escape single quotes in values
-    value_tuples = [
-        f"""('{constraint_name}', 'enum', '{str(code).replace("'", "''")}', '{str(value).replace("'", "''")}')"""
-        for code, value in values
-    ]
-    values_sql = ",\n".join(value_tuples)
-
-    insert_sql = f"""
-        INSERT OR IGNORE INTO gpkg_data_column_constraints (constraint_name, constraint_type, value, description)
-        VALUES
-        {values_sql};
-    """
-    conn.executeSql(insert_sql)
-
-    conn.executeSql(f"""
-        INSERT OR REPLACE INTO gpkg_data_columns (table_name, column_name, constraint_name)
-        VALUES ('{table_name}', '{column_name}', '{constraint_name}');
-    """)
-
-def insert_domain_values(gpkg_path, excel_data, domain_sheets):
-    """
-    Insert domain values from Excel sheets into GeoPackage domain tables
-    
-    Args:
-        gpkg_path (str): Path to the GeoPackage file
-        excel_data (dict): Excel data containig domain values
-        domain_sheets (list): List of tuples containing (sheet_name, table_name) pairs
-    """
-    for sheet_name, table_name in domain_sheets:
-        if sheet_name not in excel_data:
-            print(f"Warning: Sheet '{sheet_name}' not found in Excel file. Skipping.")
-            continue
-            
-        df = excel_data[sheet_name]
-        if not {"code", "value"}.issubset(df.columns):
-            print(f"Warning: Sheet '{sheet_name}' must contain 'code' and 'value' columns. Skipping.")
-            continue
-            
-        layer = QgsVectorLayer(f"{gpkg_path}|layername={table_name}", table_name, "ogr")
-        
-        if layer.isValid():
-            layer.startEditing()
-            for _, row in df.iterrows():
-                feature = QgsFeature(layer.fields())
-                feature.setAttribute("code", str(row["code"]))
-                feature.setAttribute("value", str(row["value"]))
-                layer.addFeature(feature)
-            
-            success = layer.commitChanges()
-            if success:
-                print(f"Added values to {table_name} table from {sheet_name} sheet")
-            else:
-                print(f"Failed to add values to {table_name} table")
-        else:
-            print(f"Warning: Could not load layer {table_name}")
-
 def configure_value_relation_widgets(layer, layer_name):
     """
     Configures Value Relation widgets for fields with different configurations
@@ -750,7 +76,7 @@ def setup_relationships(loaded_layers):
             relation.setReferencedLayer(referenced_layer.id())
             relation.setReferencingLayer(referencing_layer.id())
             relation.addFieldPair(rel_config['referencing_field'], rel_config['referenced_field'])
-            relation.setStrength(rel_config['strength'])
+            relation.setStrength(getattr(QgsRelation, rel_config['strength']))
             
             if relation.isValid():
                 QgsProject.instance().relationManager().addRelation(relation)
@@ -799,106 +125,15 @@ if os.path.exists(gpkg_path):
     except PermissionError as e:
         raise Exception(f"Failed to delete GeoPackage: {e}")
 
-# Create a new GeoPackage
-for i, (layer_name, config) in enumerate(gpkg_layers_config.items()):
-    geometry_type = QgsWkbTypes.NoGeometry if config['geometry'] == 'None' else QgsWkbTypes.parseType(config['geometry'])
-    geometry_str = QgsWkbTypes.displayString(geometry_type)
-    layer = QgsVectorLayer(f"{geometry_str}?crs=EPSG:4326", layer_name, "memory")
-    pr = layer.dataProvider()
-
-    fields = QgsFields()
-    for attr, dtype in config['attributes'].items():
-        if isinstance(dtype, dict):
-            fields.append(QgsField(attr, dtype['type']))
-        else:
-            fields.append(QgsField(attr, dtype))
-    pr.addAttributes(fields)
-    layer.updateFields()
-
-    options = QgsVectorFileWriter.SaveVectorOptions()
-    options.driverName = "GPKG"
-    options.layerName = layer_name
-    options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteFile if i == 0 else QgsVectorFileWriter.CreateOrOverwriteLayer
-
-    res, err = QgsVectorFileWriter.writeAsVectorFormatV2(
-        layer,
-        gpkg_path,
-        QgsProject.instance().transformContext(),
-        options
-    )
-
-    if res == QgsVectorFileWriter.NoError:
-        print(f"Layer '{layer_name}' written.")
-    else:
-        print(f"Failed to write layer '{layer_name}': {err}")
-
-# Create necessary tables for domain constraints
-conn = QgsProviderRegistry.instance().providerMetadata('ogr').createConnection(gpkg_path, {})
-
-conn.executeSql("""
-    CREATE TABLE IF NOT EXISTS gpkg_data_column_constraints (
-        constraint_name TEXT NOT NULL,
-        constraint_type TEXT NOT NULL,
-        value TEXT,
-        min NUMERIC,
-        min_is_inclusive BOOLEAN,
-        max NUMERIC,
-        max_is_inclusive BOOLEAN,
-        description TEXT,
-        CONSTRAINT gdcc_ntv UNIQUE (constraint_name, constraint_type, value)
-    );
-""")
-
-conn.executeSql("""
-    CREATE TABLE IF NOT EXISTS gpkg_data_columns (
-        table_name TEXT NOT NULL,
-        column_name TEXT NOT NULL,
-        name TEXT UNIQUE,
-        title TEXT,
-        description TEXT,
-        mime_type TEXT,
-        constraint_name TEXT,
-        CONSTRAINT pk_gdc PRIMARY KEY (table_name, column_name),
-        CONSTRAINT fk_gdc_tn FOREIGN KEY (table_name) REFERENCES gpkg_contents(table_name)
-    );
-""")
-
-# Load Excel data
-excel_data = pd.read_excel(excel_path, sheet_name=None)
-
-if "domain_layer_field" not in excel_data:
-    raise Exception("The Excel file must contain a sheet named 'domain_layer_field'.")
-
-domain_map_df = excel_data["domain_layer_field"]
-required_cols = {"constraint_name", "layer", "attribute"}
-if not required_cols.issubset(domain_map_df.columns):
-    raise Exception(f"'domain_layer_field' must contain columns: {required_cols}")
-
-domain_sheets = [
-    ("accessibility_category", "accessibility_domain"),
-    ("access_control_category", "access_control_domain")
-]
-
-# Insert domain values into the GeoPackage
-insert_domain_values(gpkg_path, excel_data, domain_sheets)
-
-for _, row in domain_map_df.iterrows():
-    constraint = row["constraint_name"]
-    table = row["layer"]
-    column = row["attribute"]
-
-    if constraint not in excel_data:
-        print(f"Warning: No sheet named '{constraint}' found. Skipping.")
-        continue
-
-    domain_df = excel_data[constraint]
-    if not {"code", "value"}.issubset(domain_df.columns):
-        print(f"Warning: Sheet '{constraint}' must contain 'code' and 'value' columns.")
-        continue
+# Create a new GeoPackage with all layers and system tables in one transaction
+tables = build_gpkg(gpkg_path)
+print(f"{len(tables)} layers written.")
 
-    code_value_pairs = list(zip(domain_df["code"], domain_df["value"]))
-    add_enum_domain(conn, constraint, code_value_pairs, table, column)
+# Load the needed sheets of the Excel file, parsed again only when the file changed
+excel_data = read_domain_workbook(excel_path)
 
+# Insert domain values and enum domains into the GeoPackage
+load_domains(gpkg_path, excel_data)
 print("Enum domains successfully applied.")
 
 # Create layer groups in the project
@@ -0,0 +1,266 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import closing
+
+# The system table definitions live in gpkg_builder.py next to this script
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from gpkg_builder import SYSTEM_TABLES_SQL
+
+# Sheet that maps enum domains to the layer columns they constrain
+DOMAIN_MAP_SHEET = "domain_layer_field"
+
+# (sheet name, domain table) pairs of the code/value domain tables
+DOMAIN_TABLE_SHEETS = [
+    ("accessibility_category", "accessibility_domain"),
+    ("access_control_category", "access_control_domain")
+]
+
+# Parsed workbook sheets are cached next to the workbook in <workbook><DOMAIN_CACHE_SUFFIX>
+DOMAIN_CACHE_SUFFIX = ".domains.json"
+# Bump when the cached sheet format changes
+DOMAIN_CACHE_VERSION = 1
+
+# Columns kept from the mapping sheet and from the code/value sheets
+DOMAIN_MAP_COLUMNS = ["constraint_name", "layer", "attribute"]
+CODE_VALUE_COLUMNS = ["code", "value"]
+
+def get_file_hash(path):
+    """Hash the content of a file"""
+    file_hash = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+def get_sheet_columns(df, columns):
+    """Get the given columns of a sheet as lists of strings, columns the sheet lacks are left out"""
+    return {column: [str(value) for value in df[column]] for column in columns if column in df.columns}
+
+def get_needed_sheets(sheets, sheet_names, domain_sheets):
+    """Get the sheets of the workbook that the domain tables and domain_layer_field refer to, in workbook order"""
+    needed = {sheet_name for sheet_name, _ in domain_sheets}
+    needed.update(sheets.get(DOMAIN_MAP_SHEET, {}).get("constraint_name", []))
+    return [sheet_name for sheet_name in sheet_names if sheet_name in needed]
+
+def load_workbook_cache(cache_path, workbook_hash):
+    """Load the cached sheets of a workbook, None if there is no cache for this workbook content"""
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Warning: Ignoring unreadable domain cache {cache_path}: {e}")
+        return None
+    if cache.get("version") != DOMAIN_CACHE_VERSION or cache.get("workbook_hash") != workbook_hash:
+        return None
+    return cache
+
+def save_workbook_cache(cache_path, workbook_hash, sheet_names, sheets):
+    """Save the parsed sheets of a workbook, a cache that cannot be written is only a warning"""
+    cache = {
+        "version": DOMAIN_CACHE_VERSION,
+        "workbook_hash": workbook_hash,
+        "sheet_names": sheet_names,
+        "sheets": sheets
+    }
+    temp_path = cache_path + ".tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: Could not write domain cache {cache_path}: {e}")
+
+def read_domain_workbook(excel_path, domain_sheets=None, use_cache=True):
+    """
+    Read the sheets of the domain workbook that the domain loader needs
+
+    Only domain_layer_field, the domain table sheets and the sheets domain_layer_field refers
+    to are parsed, and only their code/value (or mapping) columns are kept, as lists of
+    strings. The result is cached next to the workbook under the hash of its content, so
+    an unchanged workbook is not parsed again. Returns sheet name -> column -> values.
+    """
+    domain_sheets = DOMAIN_TABLE_SHEETS if domain_sheets is None else domain_sheets
+    workbook_hash = get_file_hash(excel_path)
+    cache_path = excel_path + DOMAIN_CACHE_SUFFIX
+
+    if use_cache:
+        cache = load_workbook_cache(cache_path, workbook_hash)
+        # Another set of domain sheets may need sheets that were not cached
+        if cache is not None and set(get_needed_sheets(cache["sheets"], cache["sheet_names"], domain_sheets)) <= set(cache["sheets"]):
+            return cache["sheets"]
+
+    import pandas as pd
+
+    sheets = {}
+    with pd.ExcelFile(excel_path) as workbook:
+        sheet_names = workbook.sheet_names
+        if DOMAIN_MAP_SHEET in sheet_names:
+            sheets[DOMAIN_MAP_SHEET] = get_sheet_columns(workbook.parse(DOMAIN_MAP_SHEET), DOMAIN_MAP_COLUMNS)
+        for sheet_name in get_needed_sheets(sheets, sheet_names, domain_sheets):
+            if sheet_name != DOMAIN_MAP_SHEET:
+                sheets[sheet_name] = get_sheet_columns(workbook.parse(sheet_name), CODE_VALUE_COLUMNS)
+
+    if use_cache:
+        save_workbook_cache(cache_path, workbook_hash, sheet_names, sheets)
+    return sheets
+
+def read_code_values(excel_data, sheet_name):
+    """Get the (code, value) pairs of a sheet as strings, None with a warning if the sheet is unusable"""
+    if sheet_name not in excel_data:
+        print(f"Warning: No sheet named '{sheet_name}' found. Skipping.")
+        return None
+    df = excel_data[sheet_name]
+    if not {"code", "value"}.issubset(df.keys()):
+        print(f"Warning: Sheet '{sheet_name}' must contain 'code' and 'value' columns. Skipping.")
+        return None
+    return [(str(code), str(value)) for code, value in zip(df["code"], df["value"])]
+
+def collect_domains(excel_data, domain_sheets=None):
+    """
+    Collect the domain tables, enum domains and column bindings defined in the Excel sheets
+
+    excel_data maps sheet names to DataFrames or to the column lists of read_domain_workbook.
+
+    Returns (domain tables, enum domains, column bindings): table -> [(code, value)],
+    constraint name -> [(code, value)] and (table, column) -> constraint name.
+    """
+    domain_sheets = DOMAIN_TABLE_SHEETS if domain_sheets is None else domain_sheets
+    if DOMAIN_MAP_SHEET not in excel_data:
+        raise ValueError(f"The Excel file must contain a sheet named '{DOMAIN_MAP_SHEET}'.")
+    domain_map_df = excel_data[DOMAIN_MAP_SHEET]
+    required_cols = {"constraint_name", "layer", "attribute"}
+    if not required_cols.issubset(domain_map_df.keys()):
+        raise ValueError(f"'{DOMAIN_MAP_SHEET}' must contain columns: {required_cols}")
+
+    domain_tables = {}
+    for sheet_name, table_name in domain_sheets:
+        rows = read_code_values(excel_data, sheet_name)
+        if rows is not None:
+            domain_tables[table_name] = rows
+
+    enum_domains = {}
+    column_bindings = {}
+    for constraint, table, column in zip(
+        domain_map_df["constraint_name"], domain_map_df["layer"], domain_map_df["attribute"]
+    ):
+        if constraint not in enum_domains:
+            rows = read_code_values(excel_data, constraint)
+            if rows is None:
+                continue
+            # Codes are unique within a domain, the first row of a code wins
+            code_values = {}
+            for code, value in rows:
+                code_values.setdefault(code, value)
+            enum_domains[constraint] = list(code_values.items())
+        column_bindings[(table, column)] = constraint
+
+    return domain_tables, enum_domains, column_bindings
+
+def load_domains(gpkg_path, excel_data, domain_sheets=None, changed_only=True):
+    """
+    Write the domain tables, gpkg_data_column_constraints and gpkg_data_columns in one transaction
+
+    Rows are written with parameterized executemany calls. With changed_only the current
+    content of the GeoPackage is compared first and only the domains that differ from the
+    Excel sheets are replaced, so loading the same workbook again writes nothing. Returns
+    the names of the updated domain tables, enum domains and bound columns.
+    """
+    domain_tables, enum_domains, column_bindings = collect_domains(excel_data, domain_sheets)
+    updated = {'tables': [], 'domains': [], 'columns': []}
+
+    with closing(sqlite3.connect(gpkg_path, isolation_level=None)) as conn:
+        existing_tables = {row[0] for row in conn.execute("SELECT table_name FROM gpkg_contents")}
+
+        conn.execute("BEGIN")
+        try:
+            # GeoPackages that were not made by gpkg_builder.py may lack the schema extension tables
+            for sql in SYSTEM_TABLES_SQL:
+                if 'gpkg_data_column' in sql:
+                    conn.execute(sql.replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1))
+
+            for table_name, rows in domain_tables.items():
+                if table_name not in existing_tables:
+                    print(f"Warning: The GeoPackage has no '{table_name}' table. Skipping.")
+                    continue
+                if changed_only and conn.execute(f'SELECT code, value FROM "{table_name}" ORDER BY fid').fetchall() == rows:
+                    continue
+                conn.execute(f'DELETE FROM "{table_name}"')
+                conn.executemany(f'INSERT INTO "{table_name}" (code, value) VALUES (?, ?)', rows)
+                updated['tables'].append(table_name)
+
+            for constraint, rows in enum_domains.items():
+                if changed_only:
+                    current = conn.execute(
+                        "SELECT value, description FROM gpkg_data_column_constraints "
+                        "WHERE constraint_name = ? AND constraint_type = 'enum'",
+                        (constraint,)
+                    ).fetchall()
+                    if sorted(current) == sorted(rows):
+                        continue
+                conn.execute(
+                    "DELETE FROM gpkg_data_column_constraints WHERE constraint_name = ? AND constraint_type = 'enum'",
+                    (constraint,)
+                )
+                conn.executemany(
+                    "INSERT INTO gpkg_data_column_constraints (constraint_name, constraint_type, value, description) "
+                    "VALUES (?, 'enum', ?, ?)",
+                    [(constraint, code, value) for code, value in rows]
+                )
+                updated['domains'].append(constraint)
+
+            current_bindings = {
+                (table, column): constraint for table, column, constraint in
+                conn.execute("SELECT table_name, column_name, constraint_name FROM gpkg_data_columns")
+            }
+            changed_bindings = [
+                (table, column, constraint) for (table, column), constraint in column_bindings.items()
+                if not changed_only or current_bindings.get((table, column)) != constraint
+            ]
+            # Keep the other columns of existing rows, like the mime type of list columns
+            conn.executemany(
+                "INSERT INTO gpkg_data_columns (table_name, column_name, constraint_name) VALUES (?, ?, ?) "
+                "ON CONFLICT (table_name, column_name) DO UPDATE SET constraint_name = excluded.constraint_name",
+                changed_bindings
+            )
+            updated['columns'] = [f"{table}.{column}" for table, column, _ in changed_bindings]
+
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    return updated
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load the domain values of an Excel workbook into a GeoPackage")
+    parser.add_argument("gpkg", help="GeoPackage with the gpkg_layers_config schema")
+    parser.add_argument("excel", help="Excel workbook with the domain sheets")
+    parser.add_argument("--all", action="store_true", help="Rewrite every domain, not only the changed ones")
+    parser.add_argument("--no-cache", action="store_true", help="Parse the workbook even if it is cached")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.gpkg):
+        raise FileNotFoundError(f"GeoPackage '{args.gpkg}' does not exist, create it with gpkg_builder.py first")
+
+    start = time.perf_counter()
+    excel_data = read_domain_workbook(args.excel, use_cache=not args.no_cache)
+    updated = load_domains(args.gpkg, excel_data, changed_only=not args.all)
+    for table_name in updated['tables']:
+        print(f"Updated domain table {table_name}")
+    for constraint in updated['domains']:
+        print(f"Updated enum domain {constraint}")
+    print(
+        f"Updated {len(updated['tables'])} domain table(s), {len(updated['domains'])} enum domain(s) "
+        f"and {len(updated['columns'])} column binding(s) in {time.perf_counter() - start:.2f} s"
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
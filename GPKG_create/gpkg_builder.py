@@ -0,0 +1,264 @@
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from contextlib import closing
+
+# The layer schema lives in gpkg_schema.py next to this script
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from gpkg_schema import gpkg_layers_config
+
+SRS_ID = 4326
+
+# GeoPackage 1.2
+APPLICATION_ID = 1196444487  # 'GPKG'
+USER_VERSION = 10200
+
+# gpkg_schema geometry names -> GeoPackage geometry type names
+GEOMETRY_TYPE_NAMES = {
+    'Point': 'POINT',
+    'String': 'LINESTRING',
+    'Polygon': 'POLYGON',
+    'MultiLineString': 'MULTILINESTRING',
+    'Multipolygon': 'MULTIPOLYGON'
+}
+
+# QVariant type names -> GeoPackage column types, as QGIS writes them
+COLUMN_TYPES = {
+    'String': 'TEXT',
+    'StringList': 'TEXT',
+    'Bool': 'BOOLEAN',
+    'Int': 'MEDIUMINT',
+    'DateTime': 'DATETIME'
+}
+
+# Column name of the feature ID and the geometry, as QGIS writes them
+FID_COLUMN = 'fid'
+GEOMETRY_COLUMN = 'geom'
+
+WGS84_DEFINITION = (
+    'GEOGCS["WGS 84",DATUM["WGS_1984",SPHEROID["WGS 84",6378137,298.257223563,AUTHORITY["EPSG","7030"]],'
+    'AUTHORITY["EPSG","6326"]],PRIMEM["Greenwich",0,AUTHORITY["EPSG","8901"]],'
+    'UNIT["degree",0.0174532925199433,AUTHORITY["EPSG","9122"]],AXIS["Latitude",NORTH],'
+    'AXIS["Longitude",EAST],AUTHORITY["EPSG","4326"]]'
+)
+
+SYSTEM_TABLES_SQL = [
+    """CREATE TABLE gpkg_spatial_ref_sys (
+        srs_name TEXT NOT NULL,
+        srs_id INTEGER PRIMARY KEY,
+        organization TEXT NOT NULL,
+        organization_coordsys_id INTEGER NOT NULL,
+        definition TEXT NOT NULL,
+        description TEXT
+    )""",
+    """CREATE TABLE gpkg_contents (
+        table_name TEXT NOT NULL PRIMARY KEY,
+        data_type TEXT NOT NULL,
+        identifier TEXT UNIQUE,
+        description TEXT DEFAULT '',
+        last_change DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now')),
+        min_x DOUBLE,
+        min_y DOUBLE,
+        max_x DOUBLE,
+        max_y DOUBLE,
+        srs_id INTEGER,
+        CONSTRAINT fk_gc_r_srs_id FOREIGN KEY (srs_id) REFERENCES gpkg_spatial_ref_sys(srs_id)
+    )""",
+    """CREATE TABLE gpkg_geometry_columns (
+        table_name TEXT NOT NULL,
+        column_name TEXT NOT NULL,
+        geometry_type_name TEXT NOT NULL,
+        srs_id INTEGER NOT NULL,
+        z TINYINT NOT NULL,
+        m TINYINT NOT NULL,
+        CONSTRAINT pk_geom_cols PRIMARY KEY (table_name, column_name),
+        CONSTRAINT fk_gc_tn FOREIGN KEY (table_name) REFERENCES gpkg_contents(table_name),
+        CONSTRAINT fk_gc_srs FOREIGN KEY (srs_id) REFERENCES gpkg_spatial_ref_sys(srs_id)
+    )""",
+    """CREATE TABLE gpkg_extensions (
+        table_name TEXT,
+        column_name TEXT,
+        extension_name TEXT NOT NULL,
+        definition TEXT NOT NULL,
+        scope TEXT NOT NULL,
+        CONSTRAINT ge_tce UNIQUE (table_name, column_name, extension_name)
+    )""",
+    """CREATE TABLE gpkg_data_columns (
+        table_name TEXT NOT NULL,
+        column_name TEXT NOT NULL,
+        name TEXT UNIQUE,
+        title TEXT,
+        description TEXT,
+        mime_type TEXT,
+        constraint_name TEXT,
+        CONSTRAINT pk_gdc PRIMARY KEY (table_name, column_name),
+        CONSTRAINT fk_gdc_tn FOREIGN KEY (table_name) REFERENCES gpkg_contents(table_name)
+    )""",
+    """CREATE TABLE gpkg_data_column_constraints (
+        constraint_name TEXT NOT NULL,
+        constraint_type TEXT NOT NULL,
+        value TEXT,
+        min NUMERIC,
+        min_is_inclusive BOOLEAN,
+        max NUMERIC,
+        max_is_inclusive BOOLEAN,
+        description TEXT,
+        CONSTRAINT gdcc_ntv UNIQUE (constraint_name, constraint_type, value)
+    )"""
+]
+
+# R-tree spatial index triggers of the GeoPackage 1.2 rtree extension, {t} is the table,
+# {c} the geometry column and {i} the feature ID column
+RTREE_TRIGGERS_SQL = [
+    """CREATE TRIGGER "rtree_{t}_{c}_insert" AFTER INSERT ON "{t}"
+        WHEN (new."{c}" NOT NULL AND NOT ST_IsEmpty(NEW."{c}"))
+        BEGIN
+            INSERT OR REPLACE INTO "rtree_{t}_{c}" VALUES (
+                NEW."{i}", ST_MinX(NEW."{c}"), ST_MaxX(NEW."{c}"), ST_MinY(NEW."{c}"), ST_MaxY(NEW."{c}")
+            );
+        END""",
+    """CREATE TRIGGER "rtree_{t}_{c}_update1" AFTER UPDATE OF "{c}" ON "{t}"
+        WHEN OLD."{i}" = NEW."{i}" AND (NEW."{c}" NOTNULL AND NOT ST_IsEmpty(NEW."{c}"))
+        BEGIN
+            INSERT OR REPLACE INTO "rtree_{t}_{c}" VALUES (
+                NEW."{i}", ST_MinX(NEW."{c}"), ST_MaxX(NEW."{c}"), ST_MinY(NEW."{c}"), ST_MaxY(NEW."{c}")
+            );
+        END""",
+    """CREATE TRIGGER "rtree_{t}_{c}_update2" AFTER UPDATE OF "{c}" ON "{t}"
+        WHEN OLD."{i}" = NEW."{i}" AND (NEW."{c}" IS NULL OR ST_IsEmpty(NEW."{c}"))
+        BEGIN
+            DELETE FROM "rtree_{t}_{c}" WHERE id = OLD."{i}";
+        END""",
+    """CREATE TRIGGER "rtree_{t}_{c}_update3" AFTER UPDATE ON "{t}"
+        WHEN OLD."{i}" != NEW."{i}" AND (NEW."{c}" NOTNULL AND NOT ST_IsEmpty(NEW."{c}"))
+        BEGIN
+            DELETE FROM "rtree_{t}_{c}" WHERE id = OLD."{i}";
+            INSERT OR REPLACE INTO "rtree_{t}_{c}" VALUES (
+                NEW."{i}", ST_MinX(NEW."{c}"), ST_MaxX(NEW."{c}"), ST_MinY(NEW."{c}"), ST_MaxY(NEW."{c}")
+            );
+        END""",
+    """CREATE TRIGGER "rtree_{t}_{c}_update4" AFTER UPDATE ON "{t}"
+        WHEN OLD."{i}" != NEW."{i}" AND (NEW."{c}" IS NULL OR ST_IsEmpty(NEW."{c}"))
+        BEGIN
+            DELETE FROM "rtree_{t}_{c}" WHERE id IN (OLD."{i}", NEW."{i}");
+        END""",
+    """CREATE TRIGGER "rtree_{t}_{c}_delete" AFTER DELETE ON "{t}"
+        WHEN old."{c}" NOT NULL
+        BEGIN
+            DELETE FROM "rtree_{t}_{c}" WHERE id = OLD."{i}";
+        END"""
+]
+
+def create_system_tables(conn):
+    """Create the GeoPackage system tables, the SRS definitions and the schema extension rows"""
+    conn.execute(f"PRAGMA application_id = {APPLICATION_ID}")
+    conn.execute(f"PRAGMA user_version = {USER_VERSION}")
+    for sql in SYSTEM_TABLES_SQL:
+        conn.execute(sql)
+
+    conn.executemany("INSERT INTO gpkg_spatial_ref_sys VALUES (?, ?, ?, ?, ?, ?)", [
+        ('Undefined cartesian SRS', -1, 'NONE', -1, 'undefined', 'undefined cartesian coordinate reference system'),
+        ('Undefined geographic SRS', 0, 'NONE', 0, 'undefined', 'undefined geographic coordinate reference system'),
+        ('WGS 84 geodetic', SRS_ID, 'EPSG', SRS_ID, WGS84_DEFINITION, 'longitude/latitude coordinates in decimal degrees on the WGS 84 spheroid')
+    ])
+    conn.executemany("INSERT INTO gpkg_extensions VALUES (?, NULL, 'gpkg_schema', ?, 'read-write')", [
+        ('gpkg_data_columns', 'http://www.geopackage.org/spec/#extension_schema'),
+        ('gpkg_data_column_constraints', 'http://www.geopackage.org/spec/#extension_schema')
+    ])
+
+def create_layer_table(conn, layer_name, layer_config, spatial_index=True):
+    """
+    Create the table of one layer of gpkg_layers_config with its gpkg_contents,
+    gpkg_geometry_columns and gpkg_data_columns rows (and R-tree index)
+    """
+    geometry_type = GEOMETRY_TYPE_NAMES.get(layer_config['geometry'])
+    columns = [f'"{FID_COLUMN}" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL']
+    if geometry_type:
+        columns.append(f'"{GEOMETRY_COLUMN}" {geometry_type}')
+
+    json_columns = []
+    for name, attribute in layer_config['attributes'].items():
+        attribute_type = attribute['type'] if isinstance(attribute, dict) else attribute
+        columns.append(f'"{name}" {COLUMN_TYPES[attribute_type]}')
+        if attribute_type == 'StringList':
+            json_columns.append(name)
+
+    conn.execute(f'CREATE TABLE "{layer_name}" ({", ".join(columns)})')
+    conn.execute(
+        "INSERT INTO gpkg_contents (table_name, data_type, identifier, srs_id) VALUES (?, ?, ?, ?)",
+        (layer_name, 'features' if geometry_type else 'attributes', layer_name, SRS_ID if geometry_type else None)
+    )
+
+    # String lists are JSON, the exporter reads them back from the mime type
+    if json_columns:
+        conn.executemany(
+            "INSERT INTO gpkg_data_columns (table_name, column_name, mime_type) VALUES (?, ?, 'application/json')",
+            [(layer_name, name) for name in json_columns]
+        )
+
+    if not geometry_type:
+        return
+
+    conn.execute(
+        "INSERT INTO gpkg_geometry_columns VALUES (?, ?, ?, ?, 0, 0)",
+        (layer_name, GEOMETRY_COLUMN, geometry_type, SRS_ID)
+    )
+
+    if spatial_index:
+        names = {'t': layer_name, 'c': GEOMETRY_COLUMN, 'i': FID_COLUMN}
+        conn.execute(f'CREATE VIRTUAL TABLE "rtree_{layer_name}_{GEOMETRY_COLUMN}" USING rtree(id, minx, maxx, miny, maxy)')
+        for sql in RTREE_TRIGGERS_SQL:
+            conn.execute(sql.format(**names))
+        conn.execute(
+            "INSERT INTO gpkg_extensions VALUES (?, ?, 'gpkg_rtree_index', "
+            "'http://www.geopackage.org/spec120/#extension_rtree', 'write-only')",
+            (layer_name, GEOMETRY_COLUMN)
+        )
+
+def build_gpkg(gpkg_path, layers_config=None, spatial_index=True, overwrite=True):
+    """
+    Create a GeoPackage with every layer of gpkg_layers_config in one SQLite transaction
+
+    The file is written with journaling and syncing turned off and removed again if anything
+    fails, so it is either complete or not there. Returns the created tables.
+    """
+    layers_config = gpkg_layers_config if layers_config is None else layers_config
+    if os.path.exists(gpkg_path):
+        if not overwrite:
+            raise FileExistsError(f"GeoPackage '{gpkg_path}' already exists")
+        os.remove(gpkg_path)
+
+    try:
+        with closing(sqlite3.connect(gpkg_path, isolation_level=None)) as conn:
+            # A new file that is deleted on failure needs no rollback journal or fsync
+            conn.execute("PRAGMA journal_mode = OFF")
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute("PRAGMA foreign_keys = ON")
+
+            conn.execute("BEGIN")
+            create_system_tables(conn)
+            for layer_name, layer_config in layers_config.items():
+                create_layer_table(conn, layer_name, layer_config, spatial_index)
+            conn.execute("COMMIT")
+    except BaseException:
+        if os.path.exists(gpkg_path):
+            os.remove(gpkg_path)
+        raise
+
+    return list(layers_config)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create an empty GeoPackage with the IMDF layer schema")
+    parser.add_argument("gpkg", help="GeoPackage file to create (replaced if it exists)")
+    parser.add_argument("--no-spatial-index", action="store_true", help="Do not create R-tree spatial indexes")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    tables = build_gpkg(args.gpkg, spatial_index=not args.no_spatial_index)
+    print(f"Created {args.gpkg} with {len(tables)} layers in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,647 @@
+# GeoPackage schema of the IMDF layers, junction tables and domain tables.
+# Kept free of QGIS imports so it can be used outside of QGIS as well.
+# Attribute types are QVariant type names.
+
+gpkg_layers_config = {
+    'accessibility_domain': {
+        'geometry': 'None',
+        'attributes': {
+            'code': {'type': 'String', 'notnull': True},
+            'value': {'type': 'String', 'notnull': True},
+        },
+    },
+    'access_control_domain': {
+        'geometry': 'None',
+        'attributes': {
+            'code': {'type': 'String', 'notnull': True},
+            'value': {'type': 'String', 'notnull': True},
+        },
+    },
+    'address': {
+        'geometry': 'None',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'address': {'type': 'String', 'notnull': True},
+            'unit': {'type': 'String', 'notnull': False},
+            'locality': {'type': 'String', 'notnull': True},
+            'province': {'type': 'String', 'notnull': False},
+            'country': {'type': 'String', 'notnull': True},
+            'postal_code': {'type': 'String', 'notnull': False},
+            'postal_code_ext': {'type': 'String', 'notnull': False},
+            'postal_code_vanity': {'type': 'String', 'notnull': False},
+        },
+    },
+    'venue': {
+        'geometry': 'Multipolygon',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'category': {'type': 'String', 'notnull': True},
+            'restriction': {'type': 'String', 'notnull': False},
+            'name': {'type': 'StringList', 'notnull': True},
+            'alt_name': {'type': 'StringList', 'notnull': False},
+            'hours': {'type': 'String', 'notnull': False},
+            'phone': {'type': 'String', 'notnull': False},
+            'website': {'type': 'String', 'notnull': False},
+            'display_point': {'type': 'String', 'notnull': True},
+            'address_id': {'type': 'String', 'notnull': True},
+        },
+    },
+    'amenity': {
+        'geometry': 'Point',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'category': {'type': 'String', 'notnull': True},
+            'accessibility': {'type': 'String', 'notnull': False},
+            'name': {'type': 'StringList', 'notnull': True},
+            'alt_name': {'type': 'StringList', 'notnull': False},
+            'hours': {'type': 'String', 'notnull': False},
+            'phone': {'type': 'String', 'notnull': False},
+            'website': {'type': 'String', 'notnull': False},
+            'address_id': {'type': 'String', 'notnull': False},
+            'correlation_id': {'type': 'String', 'notnull': False},
+        },
+    },
+    'anchor': {
+        'geometry': 'Point',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'address_id': {'type': 'String', 'notnull': False},
+            'unit_id': {'type': 'String', 'notnull': True},
+        },
+    },
+    'building': {
+        'geometry': 'None',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'name': {'type': 'StringList', 'notnull': True},
+            'alt_name': {'type': 'StringList', 'notnull': False},
+            'category': {'type': 'String', 'notnull': True},
+            'restriction': {'type': 'String', 'notnull': False},
+            'display_point': {'type': 'String', 'notnull': False},
+            'address_id': {'type': 'String', 'notnull': False},
+        },
+    },
+    'detail': {
+        'geometry': 'MultiLineString',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'level_id': {'type': 'String', 'notnull': True},
+        },
+    },
+    'fixture': {
+        'geometry': 'Polygon',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'category': {'type': 'String', 'notnull': True},
+            'name': {'type': 'StringList', 'notnull': True},
+            'alt_name': {'type': 'StringList', 'notnull': False},
+            'anchor_id': {'type': 'String', 'notnull': False},
+            'level_id': {'type': 'String', 'notnull': True},
+            'display_point': {'type': 'String', 'notnull': False},
+        },
+    },
+    'footprint': {
+        'geometry': 'Multipolygon',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'category': {'type': 'String', 'notnull': True},
+            'name': {'type': 'StringList', 'notnull': True},
+        },
+    },
+    'geofence': {
+        'geometry': 'Polygon',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'category': {'type': 'String', 'notnull': True},
+            'restriction': {'type': 'String', 'notnull': False},
+            'name': {'type': 'StringList', 'notnull': True},
+            'alt_name': {'type': 'StringList', 'notnull': False},
+            'correlation_id': {'type': 'String', 'notnull': False},
+            'display_point': {'type': 'String', 'notnull': False},
+        },
+    },
+    'kiosk': {
+        'geometry': 'Polygon',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'name': {'type': 'StringList', 'notnull': True},
+            'alt_name': {'type': 'StringList', 'notnull': False},
+            'anchor_id': {'type': 'String', 'notnull': False},
+            'level_id': {'type': 'String', 'notnull': True},
+            'display_point': {'type': 'String', 'notnull': False},
+        },
+    },
+    'level': {
+        'geometry': 'Multipolygon',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'category': {'type': 'String', 'notnull': True},
+            'restriction': {'type': 'String', 'notnull': False},
+            'outdoor': {'type': 'Bool', 'notnull': True},
+            'ordinal': {'type': 'Int', 'notnull': True},
+            'name': {'type': 'StringList', 'notnull': True},
+            'short_name': {'type': 'StringList', 'notnull': True},
+            'display_point': {'type': 'String', 'notnull': False},
+            'address_id': {'type': 'String', 'notnull': False},
+        },
+    },
+    'occupant': {
+        'geometry': 'None',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'name': {'type': 'StringList', 'notnull': True},
+            'category': {'type': 'String', 'notnull': True},
+            'anchor_id': {'type': 'String', 'notnull': True},
+            'hours': {'type': 'String', 'notnull': False},
+            'phone': {'type': 'String', 'notnull': False},
+            'website': {'type': 'String', 'notnull': False},
+            'start': {'type': 'DateTime', 'notnull': False},
+            'end': {'type': 'DateTime', 'notnull': False},
+            'modified': {'type': 'DateTime', 'notnull': False},
+            'correlation_id': {'type': 'String', 'notnull': False},
+        },
+    },
+    'opening': {
+        'geometry': 'String',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'category': {'type': 'String', 'notnull': True},
+            'accessibility': {'type': 'String', 'notnull': False},
+            'access_control': {'type': 'String', 'notnull': False},
+            'type': {'type': 'String', 'notnull': False},
+            'automatic': {'type': 'Bool', 'notnull': False},
+            'material': {'type': 'String', 'notnull': False},
+            'name': {'type': 'StringList', 'notnull': True},
+            'alt_name': {'type': 'StringList', 'notnull': False},
+            'display_point': {'type': 'String', 'notnull': False},
+            'level_id': {'type': 'String', 'notnull': True},
+        },
+    },
+    'relationship': {
+        'geometry': 'None',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'category': {'type': 'String', 'notnull': True},
+            'direction': {'type': 'String', 'notnull': True},
+            'origin_type': {'type': 'String', 'notnull': False},
+            'origin_unit_id': {'type': 'String', 'notnull': False},
+            'origin_opening_id': {'type': 'String', 'notnull': False},
+            'intermediary_type': {'type': 'String', 'notnull': False},
+            'destination_type': {'type': 'String', 'notnull': False},
+            'destination_unit_id': {'type': 'String', 'notnull': False},
+            'destination_opening_id': {'type': 'String', 'notnull': False},
+            'hours': {'type': 'String', 'notnull': False},
+        },
+    },
+    'section': {
+        'geometry': 'Polygon',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'category': {'type': 'String', 'notnull': True},
+            'restriction': {'type': 'String', 'notnull': False},
+            'accessibility': {'type': 'String', 'notnull': False},
+            'name': {'type': 'StringList', 'notnull': True},
+            'alt_name': {'type': 'StringList', 'notnull': False},
+            'display_point': {'type': 'String', 'notnull': False},
+            'level_id': {'type': 'String', 'notnull': True},
+            'address_id': {'type': 'String', 'notnull': False},
+            'correlation_id': {'type': 'String', 'notnull': False},
+        },
+    },
+    'unit': {
+        'geometry': 'Polygon',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'category': {'type': 'String', 'notnull': True},
+            'restriction': {'type': 'String', 'notnull': False},
+            'accessibility': {'type': 'String', 'notnull': False},
+            'name': {'type': 'StringList', 'notnull': True},
+            'alt_name': {'type': 'StringList', 'notnull': False},
+            'level_id': {'type': 'String', 'notnull': True},
+            'display_point': {'type': 'String', 'notnull': False},
+        },
+    },
+    'geofence_level': {
+        'geometry': 'None',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'geofence_id': {'type': 'String', 'notnull': True},
+            'level_id': {'type': 'String', 'notnull': True},
+        },
+    },
+    'level_building': {
+        'geometry': 'None',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'level_id': {'type': 'String', 'notnull': True},
+            'building_id': {'type': 'String', 'notnull': True},
+        },
+    },
+    'geofence_building': {
+        'geometry': 'None',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'geofence_id': {'type': 'String', 'notnull': True},
+            'building_id': {'type': 'String', 'notnull': True},
+        },
+    },
+    'footprint_building': {
+        'geometry': 'None',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'footprint_id': {'type': 'String', 'notnull': True},
+            'building_id': {'type': 'String', 'notnull': True},
+        },
+    },
+    'relationship_opening': {
+        'geometry': 'None',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'relationship_id': {'type': 'String', 'notnull': True},
+            'opening_id': {'type': 'String', 'notnull': True},
+        },
+    },
+    'relationship_unit': {
+        'geometry': 'None',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'relationship_id': {'type': 'String', 'notnull': True},
+            'unit_id': {'type': 'String', 'notnull': True},
+        },
+    },
+    'geofence_parent': {
+        'geometry': 'None',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'parent_id': {'type': 'String', 'notnull': True},
+            'child_id': {'type': 'String', 'notnull': True},
+        },
+    },
+    'section_parent': {
+        'geometry': 'None',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'parent_id': {'type': 'String', 'notnull': True},
+            'child_id': {'type': 'String', 'notnull': True},
+        },
+    },
+    'amenity_unit': {
+        'geometry': 'None',
+        'attributes': {
+            'id': {'type': 'String', 'notnull': True},
+            'amenity_id': {'type': 'String', 'notnull': True},
+            'unit_id': {'type': 'String', 'notnull': True},
+        },
+    },
+}
+
+# Fields edited with a Value Relation widget on a domain table
+domain_fields_config = {
+    'accessibility': 'accessibility_domain',
+    'access_control': 'access_control_domain'
+}
+
+domain_config = {
+    'Key': 'code',
+    'Value': 'code',
+    'AllowMulti': True,
+    'AllowNull': True,
+    'FilterExpression': '',
+    'OrderByValue': False,
+    'Description': 'value',
+    'UseCompleter': False,
+    'NofColumns': 1
+}
+
+# Relations between layers, strength is the name of a QgsRelation.RelationStrength value.
+# The exporter also checks the ID references of these relations before exporting.
+relationships_config = {
+    'section_correlation': {
+        'referenced_layer': 'section',
+        'referencing_layer': 'section',
+        'referenced_field': 'id',
+        'referencing_field': 'correlation_id',
+        'strength': 'Association'
+    },
+    'address_amenity': {
+        'referenced_layer': 'address',
+        'referencing_layer': 'amenity',
+        'referenced_field': 'id',
+        'referencing_field': 'address_id',
+        'strength': 'Association'
+    },
+    'amenity_correlation_id': {
+        'referenced_layer': 'amenity',
+        'referencing_layer': 'amenity',
+        'referenced_field': 'id',
+        'referencing_field': 'correlation_id',
+        'strength': 'Association'
+    },
+    'address_anchor': {
+        'referenced_layer': 'address',
+        'referencing_layer': 'anchor',
+        'referenced_field': 'id',
+        'referencing_field': 'address_id',
+        'strength': 'Association'
+    },
+    'unit_anchor': {
+        'referenced_layer': 'unit',
+        'referencing_layer': 'anchor',
+        'referenced_field': 'id',
+        'referencing_field': 'unit_id',
+        'strength': 'Composition'
+    },
+    'address_building': {
+        'referenced_layer': 'address',
+        'referencing_layer': 'building',
+        'referenced_field': 'id',
+        'referencing_field': 'address_id',
+        'strength': 'Association'
+    },
+    'level_detail': {
+        'referenced_layer': 'level',
+        'referencing_layer': 'detail',
+        'referenced_field': 'id',
+        'referencing_field': 'level_id',
+        'strength': 'Composition'
+    },
+    'anchor_fixture': {
+        'referenced_layer': 'anchor',
+        'referencing_layer': 'fixture',
+        'referenced_field': 'id',
+        'referencing_field': 'anchor_id',
+        'strength': 'Association'
+    },
+    'level_fixture': {
+        'referenced_layer': 'level',
+        'referencing_layer': 'fixture',
+        'referenced_field': 'id',
+        'referencing_field': 'level_id',
+        'strength': 'Composition'
+    },
+    'geofence_correlation_id': {
+        'referenced_layer': 'geofence',
+        'referencing_layer': 'geofence',
+        'referenced_field': 'id',
+        'referencing_field': 'correlation_id',
+        'strength': 'Association'
+    },
+    'anchor_kiosk': {
+        'referenced_layer': 'anchor',
+        'referencing_layer': 'kiosk',
+        'referenced_field': 'id',
+        'referencing_field': 'anchor_id',
+        'strength': 'Association'
+    },
+    'level_kiosk': {
+        'referenced_layer': 'level',
+        'referencing_layer': 'kiosk',
+        'referenced_field': 'id',
+        'referencing_field': 'level_id',
+        'strength': 'Composition'
+    },
+    'address_level': {
+        'referenced_layer': 'address',
+        'referencing_layer': 'level',
+        'referenced_field': 'id',
+        'referencing_field': 'address_id',
+        'strength': 'Association'
+    },
+    'anchor_occupant': {
+        'referenced_layer': 'anchor',
+        'referencing_layer': 'occupant',
+        'referenced_field': 'id',
+        'referencing_field': 'anchor_id',
+        'strength': 'Association'
+    },
+    'occupant_correlation_id': {
+        'referenced_layer': 'occupant',
+        'referencing_layer': 'occupant',
+        'referenced_field': 'id',
+        'referencing_field': 'correlation_id',
+        'strength': 'Association'
+    },
+    'level_opening': {
+        'referenced_layer': 'level',
+        'referencing_layer': 'opening',
+        'referenced_field': 'id',
+        'referencing_field': 'level_id',
+        'strength': 'Composition'
+    },
+    'unit_relationship': {
+        'referenced_layer': 'unit',
+        'referencing_layer': 'relationship',
+        'referenced_field': 'id',
+        'referencing_field': 'origin_unit_id',
+        'strength': 'Composition'
+    },
+    'opening_relationship': {
+        'referenced_layer': 'opening',
+        'referencing_layer': 'relationship',
+        'referenced_field': 'id',
+        'referencing_field': 'origin_opening_id',
+        'strength': 'Composition'
+    },
+    'unit_destination': {
+        'referenced_layer': 'unit',
+        'referencing_layer': 'relationship',
+        'referenced_field': 'id',
+        'referencing_field': 'destination_unit_id',
+        'strength': 'Composition'
+    },
+    'opening_destination': {
+        'referenced_layer': 'opening',
+        'referencing_layer': 'relationship',
+        'referenced_field': 'id',
+        'referencing_field': 'destination_opening_id',
+        'strength': 'Composition'
+    },
+    'level_section': {
+        'referenced_layer': 'level',
+        'referencing_layer': 'section',
+        'referenced_field': 'id',
+        'referencing_field': 'level_id',
+        'strength': 'Composition'
+    },
+    'address_section': {
+        'referenced_layer': 'address',
+        'referencing_layer': 'section',
+        'referenced_field': 'id',
+        'referencing_field': 'address_id',
+        'strength': 'Association'
+    },
+    'section_correlation_id': {
+        'referenced_layer': 'section',
+        'referencing_layer': 'section',
+        'referenced_field': 'id',
+        'referencing_field': 'correlation_id',
+        'strength': 'Association'
+    },
+    'level_unit': {
+        'referenced_layer': 'level',
+        'referencing_layer': 'unit',
+        'referenced_field': 'id',
+        'referencing_field': 'level_id',
+        'strength': 'Composition'
+    },
+    'address_venue': {
+        'referenced_layer': 'address',
+        'referencing_layer': 'venue',
+        'referenced_field': 'id',
+        'referencing_field': 'address_id',
+        'strength': 'Association'
+    },
+    'level_geofence_level': {
+        'referenced_layer': 'level',
+        'referencing_layer': 'geofence_level',
+        'referenced_field': 'id',
+        'referencing_field': 'level_id',
+        'strength': 'Association'
+    },
+    'geofence_level_ids': {
+        'referenced_layer': 'geofence',
+        'referencing_layer': 'geofence_level',
+        'referenced_field': 'id',
+        'referencing_field': 'geofence_id',
+        'strength': 'Association'
+    },
+    'level_building_ids': {
+        'referenced_layer': 'level',
+        'referencing_layer': 'level_building',
+        'referenced_field': 'id',
+        'referencing_field': 'level_id',
+        'strength': 'Association'
+    },
+    'building_level_building': {
+        'referenced_layer': 'building',
+        'referencing_layer': 'level_building',
+        'referenced_field': 'id',
+        'referencing_field': 'building_id',
+        'strength': 'Association'
+    },
+    'geofence_building_ids': {
+        'referenced_layer': 'geofence',
+        'referencing_layer': 'geofence_building',
+        'referenced_field': 'id',
+        'referencing_field': 'geofence_id',
+        'strength': 'Association'
+    },
+    'building_geofence_building': {
+        'referenced_layer': 'building',
+        'referencing_layer': 'geofence_building',
+        'referenced_field': 'id',
+        'referencing_field': 'building_id',
+        'strength': 'Association'
+    },
+    'footprint_building_ids': {
+        'referenced_layer': 'footprint',
+        'referencing_layer': 'footprint_building',
+        'referenced_field': 'id',
+        'referencing_field': 'footprint_id',
+        'strength': 'Association'
+    },
+    'building_footprint_building': {
+        'referenced_layer': 'building',
+        'referencing_layer': 'footprint_building',
+        'referenced_field': 'id',
+        'referencing_field': 'building_id',
+        'strength': 'Association'
+    },
+    'intermediary_opening_ids': {
+        'referenced_layer': 'relationship',
+        'referencing_layer': 'relationship_opening',
+        'referenced_field': 'id',
+        'referencing_field': 'relationship_id',
+        'strength': 'Association'
+    },
+    'opening_relationship_opening': {
+        'referenced_layer': 'opening',
+        'referencing_layer': 'relationship_opening',
+        'referenced_field': 'id',
+        'referencing_field': 'opening_id',
+        'strength': 'Association'
+    },
+    'intermediary_unit_ids': {
+        'referenced_layer': 'relationship',
+        'referencing_layer': 'relationship_unit',
+        'referenced_field': 'id',
+        'referencing_field': 'relationship_id',
+        'strength': 'Association'
+    },
+    'unit_relationship_unit': {
+        'referenced_layer': 'unit',
+        'referencing_layer': 'relationship_unit',
+        'referenced_field': 'id',
+        'referencing_field': 'unit_id',
+        'strength': 'Association'
+    },
+    'geofence_parent_ids': {
+        'referenced_layer': 'geofence',
+        'referencing_layer': 'geofence_parent',
+        'referenced_field': 'id',
+        'referencing_field': 'child_id',
+        'strength': 'Association'
+    },
+    'geofence_parent_child_ids': {
+        'referenced_layer': 'geofence',
+        'referencing_layer': 'geofence_parent',
+        'referenced_field': 'id',
+        'referencing_field': 'parent_id',
+        'strength': 'Association'
+    },
+    'section_parent_ids': {
+        'referenced_layer': 'section',
+        'referencing_layer': 'section_parent',
+        'referenced_field': 'id',
+        'referencing_field': 'child_id',
+        'strength': 'Association'
+    },
+    'section_parent_child_ids': {
+        'referenced_layer': 'section',
+        'referencing_layer': 'section_parent',
+        'referenced_field': 'id',
+        'referencing_field': 'parent_id',
+        'strength': 'Association'
+    },
+    'amenity_unit_ids': {
+        'referenced_layer': 'amenity',
+        'referencing_layer': 'amenity_unit',
+        'referenced_field': 'id',
+        'referencing_field': 'amenity_id',
+        'strength': 'Association'
+    },
+    'unit_amenity_unit': {
+        'referenced_layer': 'unit',
+        'referencing_layer': 'amenity_unit',
+        'referenced_field': 'id',
+        'referencing_field': 'unit_id',
+        'strength': 'Association'
+    },
+}
+
+# Junction tables of the _ids fields: feature type -> _ids field -> junction table, the column
+# holding the referenced IDs ('id') and the column pointing back to the feature ('ref').
+# The exporter turns their rows into _ids arrays and the IMDF importer writes them back.
+junction_mappings = {
+    'level': {
+        'building_ids': {'table': 'level_building', 'id': 'building_id', 'ref': 'level_id'}
+    },
+    'footprint': {
+        'building_ids': {'table': 'footprint_building', 'id': 'building_id', 'ref': 'footprint_id'}
+    },
+    'geofence': {
+        'building_ids': {'table': 'geofence_building', 'id': 'building_id', 'ref': 'geofence_id'},
+        'level_ids': {'table': 'geofence_level', 'id': 'level_id', 'ref': 'geofence_id'},
+        'parents': {'table': 'geofence_parent', 'id': 'parent_id', 'ref': 'child_id'}
+    },
+    'section': {
+        'parents': {'table': 'section_parent', 'id': 'parent_id', 'ref': 'child_id'}
+    },
+    'amenity': {
+        'unit_ids': {'table': 'amenity_unit', 'id': 'unit_id', 'ref': 'amenity_id'}
+    },
+    'relationship': {
+        'opening_ids': {'table': 'relationship_opening', 'id': 'opening_id', 'ref': 'relationship_id'},
+        'unit_ids': {'table': 'relationship_unit', 'id': 'unit_id', 'ref': 'relationship_id'}
+    }
+}
@@ -0,0 +1,427 @@
+import argparse
+import json
+import os
+import sqlite3
+import struct
+import sys
+import time
+import uuid
+import zipfile
+from contextlib import closing
+
+# The layer schema and junction table mappings live in gpkg_schema.py next to this script
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from gpkg_schema import gpkg_layers_config, domain_fields_config, junction_mappings
+
+try:
+    import ijson
+except ImportError:
+    # Without ijson every layer file is parsed in one go, one layer at a time
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Rows inserted per executemany call
+IMPORT_BATCH_SIZE = 10000
+
+# Fields holding IMDF labels, stored as JSON strings
+LABEL_FIELDS = ['name', 'alt_name', 'short_name']
+
+# GeoJSON geometry type -> WKB type code
+WKB_TYPE_CODES = {
+    'Point': 1,
+    'LineString': 2,
+    'Polygon': 3,
+    'MultiPoint': 4,
+    'MultiLineString': 5,
+    'MultiPolygon': 6,
+    'GeometryCollection': 7
+}
+
+def iter_layer_features(zipf, entry_name):
+    """Yield the features of a GeoJSON FeatureCollection entry of the archive"""
+    with zipf.open(entry_name) as f:
+        if ijson is not None:
+            yield from ijson.items(f, 'features.item', use_float=True)
+        elif orjson is not None:
+            yield from orjson.loads(f.read()).get('features') or []
+        else:
+            yield from json.load(f).get('features') or []
+
+def get_table_columns(conn, table):
+    """Get (geometry column, [attribute columns]) of a table, the fid column is left out"""
+    columns = conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+    if not columns:
+        raise ValueError(f"Table '{table}' does not exist in the GeoPackage")
+
+    geometry_row = conn.execute(
+        "SELECT column_name, srs_id FROM gpkg_geometry_columns WHERE table_name = ?", (table,)
+    ).fetchone()
+    geometry_column = geometry_row[0] if geometry_row else None
+    attributes = [
+        name for _, name, declared_type, _, _, pk in columns
+        if name != geometry_column and not (pk and declared_type.upper() == 'INTEGER')
+    ]
+    return geometry_row, attributes
+
+def encode_gpkg_geometry(geometry, srs_id, bounds):
+    """
+    Encode a GeoJSON geometry as a GeoPackage geometry blob (little endian WKB with an
+    xy envelope), the envelope is also merged into bounds [min x, min y, max x, max y]
+    """
+    if not geometry:
+        return None
+
+    envelope = [float('inf'), float('inf'), float('-inf'), float('-inf')]
+    wkb = bytearray()
+    write_wkb(geometry, wkb, envelope)
+
+    if envelope[0] > envelope[2]:
+        # Empty geometry: no envelope, empty flag set
+        return b'GP\x00' + bytes([0b10001]) + struct.pack('<i', srs_id) + bytes(wkb)
+
+    bounds[0] = min(bounds[0], envelope[0])
+    bounds[1] = min(bounds[1], envelope[1])
+    bounds[2] = max(bounds[2], envelope[2])
+    bounds[3] = max(bounds[3], envelope[3])
+    header = b'GP\x00' + bytes([0b11]) + struct.pack('<i', srs_id)
+    header += struct.pack('<4d', envelope[0], envelope[2], envelope[1], envelope[3])
+    return header + bytes(wkb)
+
+def write_wkb(geometry, wkb, envelope):
+    """Append the WKB of a GeoJSON geometry to wkb, growing envelope by its coordinates"""
+    geometry_type = geometry['type']
+    if geometry_type == 'GeometryCollection':
+        parts = geometry.get('geometries') or []
+        wkb += struct.pack('<BII', 1, 7, len(parts))
+        for part in parts:
+            write_wkb(part, wkb, envelope)
+        return
+
+    coordinates = geometry.get('coordinates') or []
+    has_z = has_z_coordinates(coordinates, geometry_type)
+    type_code = WKB_TYPE_CODES[geometry_type] + (1000 if has_z else 0)
+    dimensions = 3 if has_z else 2
+
+    if geometry_type == 'Point':
+        if not coordinates:
+            # An empty point is encoded with NaN coordinates
+            coordinates = [float('nan')] * dimensions
+        wkb += struct.pack('<BI', 1, type_code)
+        write_points([coordinates], wkb, envelope, dimensions, with_count=False)
+    elif geometry_type == 'LineString':
+        wkb += struct.pack('<BI', 1, type_code)
+        write_points(coordinates, wkb, envelope, dimensions)
+    elif geometry_type == 'Polygon':
+        wkb += struct.pack('<BII', 1, type_code, len(coordinates))
+        for ring in coordinates:
+            write_points(ring, wkb, envelope, dimensions)
+    else:
+        part_type = geometry_type[len('Multi'):]
+        wkb += struct.pack('<BII', 1, type_code, len(coordinates))
+        for part in coordinates:
+            write_wkb({'type': part_type, 'coordinates': part}, wkb, envelope)
+
+def has_z_coordinates(coordinates, geometry_type):
+    """Check whether the first position of a GeoJSON geometry has a z value"""
+    depth = {'Point': 0, 'LineString': 1, 'MultiPoint': 1, 'Polygon': 2, 'MultiLineString': 2}.get(geometry_type, 3)
+    position = coordinates
+    for _ in range(depth):
+        if not position:
+            return False
+        position = position[0]
+    return len(position) > 2
+
+def write_points(points, wkb, envelope, dimensions, with_count=True):
+    """Append a list of positions (optionally preceded by their count) to wkb"""
+    if with_count:
+        wkb += struct.pack('<I', len(points))
+    values = [float(value) for point in points for value in point[:dimensions]]
+    wkb += struct.pack(f'<{len(values)}d', *values)
+
+    xs = [value for value in values[0::dimensions] if value == value]
+    ys = [value for value in values[1::dimensions] if value == value]
+    if xs:
+        envelope[0] = min(envelope[0], min(xs))
+        envelope[2] = max(envelope[2], max(xs))
+    if ys:
+        envelope[1] = min(envelope[1], min(ys))
+        envelope[3] = max(envelope[3], max(ys))
+
+def read_envelope(blob):
+    """Get (min x, max x, min y, max y) from the envelope of a GeoPackage geometry blob, None without one"""
+    if blob is None or len(blob) < 8 or (blob[3] >> 1) & 0b111 == 0:
+        return None
+    return struct.unpack('<4d' if blob[3] & 1 else '>4d', blob[8:40])
+
+def register_spatial_functions(conn):
+    """
+    Register the ST_* functions the R-tree triggers of GDAL and QGIS GeoPackages call
+
+    The importer writes every geometry with an envelope, so they are read from there.
+    """
+    conn.create_function('ST_IsEmpty', 1, lambda blob: None if blob is None else (blob[3] >> 4) & 1, deterministic=True)
+    for index, name in enumerate(['ST_MinX', 'ST_MaxX', 'ST_MinY', 'ST_MaxY']):
+        conn.create_function(
+            name, 1, lambda blob, index=index: (read_envelope(blob) or [None] * 4)[index], deterministic=True
+        )
+
+def to_column_value(value):
+    """Convert an IMDF property value to the value stored in its GeoPackage column"""
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, list):
+        return to_array_value(value)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+def to_json_value(value):
+    """Store labels (and other objects) as JSON strings"""
+    return None if value is None else json.dumps(value, ensure_ascii=False)
+
+def to_array_value(value):
+    """Store multi-value domain fields as gpkg array strings"""
+    if not isinstance(value, list):
+        return value
+    return '{' + ','.join(str(item) for item in value) + '}'
+
+def to_display_point_value(value):
+    """Store a GeoJSON display point as a "lat, lon" string"""
+    if not isinstance(value, dict):
+        return value
+    lon, lat = value['coordinates'][:2]
+    return f"{lat}, {lon}"
+
+def build_column_converters(feature_type, columns):
+    """Pick the converter of every column once per layer from gpkg_layers_config, None stores values as they are"""
+    attributes = gpkg_layers_config.get(feature_type, {}).get('attributes', {})
+    converters = []
+    for name in columns:
+        attribute_type = attributes.get(name, {}).get('type')
+        if name == 'display_point':
+            converters.append(to_display_point_value)
+        elif name in LABEL_FIELDS or attribute_type == 'StringList':
+            converters.append(to_json_value)
+        elif name in domain_fields_config:
+            converters.append(to_array_value)
+        elif attribute_type in ('String', 'Int', 'DateTime'):
+            # IMDF scalars are stored as they are
+            converters.append(None)
+        else:
+            converters.append(to_column_value)
+    return converters
+
+def flatten_properties(properties, feature_type):
+    """
+    Unpack the IMDF objects the exporter builds back into their flat GeoPackage columns
+
+    Returns the flat properties and the intermediary features of a relationship as
+    (feature type, id) pairs.
+    """
+    properties = dict(properties or {})
+    intermediaries = []
+
+    if feature_type == 'opening':
+        door = properties.pop('door', None) or {}
+        properties['type'] = door.get('type')
+        properties['automatic'] = door.get('automatic', False)
+        properties['material'] = door.get('material')
+    elif feature_type == 'occupant':
+        validity = properties.pop('validity', None) or {}
+        for name in ('start', 'end', 'modified'):
+            properties[name] = validity.get(name)
+    elif feature_type == 'relationship':
+        for end in ('origin', 'destination'):
+            reference = properties.pop(end, None) or {}
+            reference_type = reference.get('feature_type')
+            properties[f'{end}_type'] = reference_type
+            properties[f'{end}_unit_id'] = reference.get('id') if reference_type == 'unit' else None
+            properties[f'{end}_opening_id'] = reference.get('id') if reference_type == 'opening' else None
+
+        intermediaries = [
+            (reference.get('feature_type'), reference.get('id'))
+            for reference in properties.pop('intermediary', None) or []
+        ]
+        properties['intermediary_type'] = intermediaries[0][0] if intermediaries else None
+
+    return properties, intermediaries
+
+class RowInserter:
+    """Buffer rows per table and insert them with executemany in batches of IMPORT_BATCH_SIZE"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.statements = {}
+        self.buffers = {}
+        self.counts = {}
+
+    def add(self, table, columns, values):
+        if table not in self.statements:
+            column_list = ", ".join(f'"{column}"' for column in columns)
+            placeholders = ", ".join('?' * len(columns))
+            self.statements[table] = f'INSERT INTO "{table}" ({column_list}) VALUES ({placeholders})'
+            self.buffers[table] = []
+        buffer = self.buffers[table]
+        buffer.append(values)
+        if len(buffer) >= IMPORT_BATCH_SIZE:
+            self.flush(table)
+
+    def flush(self, table):
+        buffer = self.buffers[table]
+        if buffer:
+            self.conn.executemany(self.statements[table], buffer)
+            self.counts[table] = self.counts.get(table, 0) + len(buffer)
+            buffer.clear()
+
+    def flush_all(self):
+        for table in self.buffers:
+            self.flush(table)
+
+def add_junction_row(inserter, table, ref_field, ref_value, id_field, id_value):
+    """Insert one junction table row pairing a feature with a referenced ID"""
+    inserter.add(table, ['id', ref_field, id_field], (str(uuid.uuid4()), ref_value, id_value))
+
+def import_layer(conn, inserter, zipf, entry_name, feature_type):
+    """Import one layer file of the archive, returns its feature count and the unknown properties"""
+    geometry_row, columns = get_table_columns(conn, feature_type)
+    geometry_column, srs_id = geometry_row if geometry_row else (None, None)
+    insert_columns = ([geometry_column] if geometry_column else []) + columns
+    layer_junction_mappings = junction_mappings.get(feature_type, {})
+    column_converters = list(zip(columns, build_column_converters(feature_type, columns)))
+    column_names = set(columns)
+    # Importing a feature twice would silently duplicate its ID
+    existing_ids = {row[0] for row in conn.execute(f'SELECT id FROM "{feature_type}"')} if 'id' in column_names else set()
+    imported_ids = set()
+
+    bounds = [float('inf'), float('inf'), float('-inf'), float('-inf')]
+    unknown_properties = set()
+    count = 0
+    for feature in iter_layer_features(zipf, entry_name):
+        feature_id = feature.get('id')
+        if feature_id in existing_ids:
+            raise ValueError(
+                f"Feature '{feature_id}' of {entry_name} is already in the '{feature_type}' table, "
+                "use --replace to replace the rows of the imported layers"
+            )
+        if feature_id in imported_ids:
+            raise ValueError(f"Feature ID '{feature_id}' appears more than once in {entry_name}")
+        imported_ids.add(feature_id)
+        properties, intermediaries = flatten_properties(feature.get('properties'), feature_type)
+        properties['id'] = feature_id
+
+        # _ids arrays become junction table rows
+        for field_name, mapping in layer_junction_mappings.items():
+            for id_value in properties.pop(field_name, None) or []:
+                add_junction_row(inserter, mapping['table'], mapping['ref'], feature_id, mapping['id'], id_value)
+        # Relationship intermediaries go to the junction table of their unit_ids/opening_ids field
+        for intermediary_type, intermediary_id in intermediaries:
+            mapping = layer_junction_mappings.get(f'{intermediary_type}_ids')
+            if mapping:
+                add_junction_row(inserter, mapping['table'], mapping['ref'], feature_id, mapping['id'], intermediary_id)
+
+        unknown_properties.update(properties.keys() - column_names)
+        values = [
+            properties.get(name) if convert is None else convert(properties.get(name))
+            for name, convert in column_converters
+        ]
+        if geometry_column:
+            values.insert(0, encode_gpkg_geometry(feature.get('geometry'), srs_id, bounds))
+        inserter.add(feature_type, insert_columns, values)
+        count += 1
+
+    if count:
+        update_contents(conn, feature_type, bounds if bounds[0] <= bounds[2] else None)
+    return count, unknown_properties
+
+def update_contents(conn, table, bounds):
+    """Update last_change and grow the extent of a table in gpkg_contents"""
+    conn.execute(
+        "UPDATE gpkg_contents SET last_change = strftime('%Y-%m-%dT%H:%M:%fZ', 'now') WHERE table_name = ?",
+        (table,)
+    )
+    if bounds:
+        conn.execute(
+            "UPDATE gpkg_contents SET min_x = min(coalesce(min_x, :min_x), :min_x), "
+            "min_y = min(coalesce(min_y, :min_y), :min_y), max_x = max(coalesce(max_x, :max_x), :max_x), "
+            "max_y = max(coalesce(max_y, :max_y), :max_y) WHERE table_name = :table",
+            {'min_x': bounds[0], 'min_y': bounds[1], 'max_x': bounds[2], 'max_y': bounds[3], 'table': table}
+        )
+
+def get_import_layers(zipf, conn):
+    """Map the layer files of an IMDF archive to the GeoPackage tables they go to, in archive order"""
+    tables = {row[0] for row in conn.execute("SELECT table_name FROM gpkg_contents")}
+    layers = []
+    for entry_name in zipf.namelist():
+        name, extension = os.path.splitext(os.path.basename(entry_name))
+        if extension != '.geojson':
+            continue
+        if name not in gpkg_layers_config:
+            print(f"Warning: Skipping '{entry_name}', there is no '{name}' layer in the GeoPackage schema")
+            continue
+        if name not in tables:
+            print(f"Warning: Skipping '{entry_name}', the GeoPackage has no '{name}' table")
+            continue
+        layers.append((entry_name, name))
+    return layers
+
+def import_imdf_archive(zip_path, gpkg_path, replace=False):
+    """
+    Import the features of an IMDF archive into a GeoPackage with the gpkg_layers_config schema
+
+    Features are streamed layer by layer and inserted in batches, all in one transaction: the
+    GeoPackage is left unchanged if anything fails. With replace the rows of the imported
+    layers and of their junction tables are deleted first, without it the import fails if a
+    feature ID is already in its table. Returns table -> inserted rows.
+    """
+    if not os.path.exists(gpkg_path):
+        raise FileNotFoundError(f"GeoPackage '{gpkg_path}' does not exist, create it with gpkg_builder.py first")
+
+    with zipfile.ZipFile(zip_path) as zipf, closing(sqlite3.connect(gpkg_path, isolation_level=None)) as conn:
+        register_spatial_functions(conn)
+        layers = get_import_layers(zipf, conn)
+        inserter = RowInserter(conn)
+
+        conn.execute("BEGIN")
+        try:
+            if replace:
+                tables = [feature_type for _, feature_type in layers]
+                for _, feature_type in layers:
+                    tables += [mapping['table'] for mapping in junction_mappings.get(feature_type, {}).values()]
+                for table in dict.fromkeys(tables):
+                    conn.execute(f'DELETE FROM "{table}"')
+
+            for entry_name, feature_type in layers:
+                count, unknown_properties = import_layer(conn, inserter, zipf, entry_name, feature_type)
+                print(f"Read {count} features from {entry_name}")
+                if unknown_properties:
+                    print(f"Warning: Properties not in the {feature_type} table were skipped: {sorted(unknown_properties)}")
+
+            inserter.flush_all()
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    return inserter.counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import an IMDF archive into a GeoPackage")
+    parser.add_argument("imdf_zip", help="IMDF archive")
+    parser.add_argument("gpkg", help="GeoPackage with the gpkg_layers_config schema")
+    parser.add_argument("--replace", action="store_true",
+                        help="Delete the rows of the imported layers and their junction tables first")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    counts = import_imdf_archive(args.imdf_zip, args.gpkg, args.replace)
+    for table, count in counts.items():
+        print(f"{table}: {count} rows")
+    print(f"Imported {sum(counts.values())} rows in {time.perf_counter() - start:.2f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
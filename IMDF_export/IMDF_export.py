@@ -1,47 +1,138 @@
-import geopandas as gpd
-import fiona
 import os
+import shutil
+import tempfile
 import json
+import itertools
+import logging
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack, closing, contextmanager, nullcontext
 from datetime import datetime, timezone
-import pandas as pd
 import config
+import gpkg_reader
+import export_cache
+import feature_cache
+import export_metrics
+import geometry_qa
+import reference_validator
+from shared_schema import gpkg_layers_config, domain_fields_config, domain_config, junction_mappings
 
-def get_junction_table_ids(gpkg_path, junction_table, id_field, reference_field, reference_value):
-    """Get array of IDs from junction table for a given reference value"""
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np
+    import shapely
+except ImportError:
+    np = shapely = None
+
+try:
+    import geopandas as gpd
+    import fiona
+except ImportError:
+    # Only the "geopandas" reader engine needs the geopandas/fiona stack
+    gpd = fiona = None
+
+try:
+    import pyogrio
+    import pyarrow
+except ImportError:
+    # Only the "arrow" reader engine needs pyogrio with pyarrow
+    pyogrio = pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+# Record batch size of the "arrow" reader engine when config.read_batch_size is not set
+ARROW_BATCH_SIZE = 65536
+
+def get_reader_engine():
+    """Get the reader engine to use, resolving "auto" to the best one that is installed"""
+    if config.reader_engine != 'auto':
+        return config.reader_engine
+    # The feature cache works on the raw rows of the "sqlite" engine
+    if config.feature_cache:
+        return 'sqlite'
+    if is_arrow_available():
+        return 'arrow'
+    # Needs no third-party packages and streams rows instead of loading whole layers
+    return 'sqlite'
+
+def is_arrow_available():
+    """Check if pyogrio can read layers as Arrow tables (needs pyarrow, shapely and GDAL 3.6+)"""
+    return pyogrio is not None and shapely is not None and pyogrio.__gdal_version__ >= (3, 6, 0)
+
+def list_layers(gpkg_path):
+    """List the layers of a GeoPackage with the configured reader engine"""
+    reader_engine = get_reader_engine()
+    if reader_engine == 'sqlite':
+        return gpkg_reader.list_layers(gpkg_path)
+    if reader_engine == 'arrow':
+        return [str(layer) for layer, _ in pyogrio.list_layers(gpkg_path)]
+    return fiona.listlayers(gpkg_path)
+
+def read_layer_rows(gpkg_path, layer):
+    """Yield the features of a layer as dicts of attributes plus a GeoJSON 'geometry', read by the "sqlite" engine"""
+    return gpkg_reader.read_rows(gpkg_path, layer, config.coordinate_precision, config.drop_repeated_vertices)
+
+def load_junction_index(gpkg_path):
+    """Read every junction table in junction_mappings once and index its IDs by reference value"""
+    junction_index = {}
+
+    for mappings in junction_mappings.values():
+        for mapping in mappings.values():
+            key = (mapping['table'], mapping['ref'], mapping['id'])
+            if key in junction_index:
+                continue
+            junction_index[key] = read_junction_table(gpkg_path, *key)
+
+    return junction_index
+
+def read_junction_table(gpkg_path, junction_table, reference_field, id_field):
+    """Read a junction table into a reference value -> list of IDs lookup"""
+    lookup = {}
     try:
-        # Read junction table
-        junction_df = gpd.read_file(gpkg_path, layer=junction_table)
-        
-        # Convert reference_value to string for comparison
-        reference_value = str(reference_value)
-        
-        # Convert reference field values to strings for comparison
-        junction_df[reference_field] = junction_df[reference_field].astype(str)
-        
-        # Filter and get IDs
-        matched_rows = junction_df[junction_df[reference_field] == reference_value]
-        
-        if matched_rows.empty:
-            return None
-        
-        # Convert IDs to strings and get as list
-        ids = matched_rows[id_field].astype(str).tolist()
-        print(f"Found {len(ids)} IDs in {junction_table} for {reference_field}={reference_value}")
-        return ids
-        
+        reader_engine = get_reader_engine()
+        if reader_engine == 'sqlite':
+            rows = gpkg_reader.read_columns(gpkg_path, junction_table, [reference_field, id_field])
+        elif reader_engine == 'arrow':
+            _, table = pyogrio.read_arrow(gpkg_path, layer=junction_table, columns=[reference_field, id_field])
+            rows = zip(table.column(reference_field).to_pylist(), table.column(id_field).to_pylist())
+        else:
+            junction_df = gpd.read_file(gpkg_path, layer=junction_table)
+            rows = zip(junction_df[reference_field], junction_df[id_field])
+
+        # Reference values and IDs are compared and exported as strings
+        row_count = 0
+        for reference_value, id_value in rows:
+            lookup.setdefault(str(reference_value), []).append(str(id_value))
+            row_count += 1
+
+        print(f"Indexed {row_count} rows of junction table {junction_table}")
+
     except Exception as e:
         print(f"Warning: Error processing junction table {junction_table}: {e}")
+
+    return lookup
+
+def get_junction_table_ids(junction_index, junction_table, id_field, reference_field, reference_value):
+    """Get array of IDs from junction table for a given reference value"""
+    lookup = junction_index.get((junction_table, reference_field, id_field), {})
+    ids = lookup.get(str(reference_value))
+
+    if not ids:
         return None
 
-def process_junction_tables(row_dict, feature_type, gpkg_path):
+    logger.debug("Found %d IDs in %s for %s=%s", len(ids), junction_table, reference_field, reference_value)
+    return list(ids)
+
+def process_junction_tables(row_dict, feature_type, junction_index):
     """Process junction tables and add _ids fields to properties"""
     
     feature_id = row_dict.get('id')
-    print(f"Processing {feature_type} feature with ID: {feature_id}")
+    logger.debug("Processing %s feature with ID: %s", feature_type, feature_id)
 
-    junction_mappings = config.junction_mappings
-    
     # Check if feature type has junction tables
     if feature_type not in junction_mappings:
         return
@@ -49,14 +140,16 @@ def process_junction_tables(row_dict, feature_type, gpkg_path):
     # Process each _ids field for the feature type
     for field_name, mapping in junction_mappings[feature_type].items():
         ids = get_junction_table_ids(
-            gpkg_path,
+            junction_index,
             mapping['table'],
             mapping['id'],
             mapping['ref'],
             feature_id
         )
+        export_metrics.count(feature_type, 'junction_lookups')
         # Only add field if IDs were found
         if ids:
+            export_metrics.count(feature_type, 'junction_hits')
             row_dict[field_name] = ids
         else:
             row_dict[field_name] = None  # Set to null if no IDs found
@@ -69,44 +162,39 @@ def convert_gpkg_array_to_list(value):
     items = value[1:-1].split(',')
     return [item.strip().strip('"').strip("'") for item in items if item.strip()]
 
+def is_null_value(value):
+    """Check if value is None, NaN or NaT"""
+    return value is None or value != value
+
 def is_empty_value(value):
     """Check if value is an empty array or dictionary"""
     return isinstance(value, (list, dict)) and len(value) == 0
 
+ADDRESS_STRING_FIELDS = ['unit', 'postal_code', 'postal_code_ext', 'postal_code_vanity']
+NAME_FIELDS = ['name', 'alt_name', 'short_name']
+
 def process_address_fields(row_dict, feature_type):
     """Force string type for address feature fields"""
     if feature_type == 'address':
-        for key in ['unit', 'postal_code', 'postal_code_ext', 'postal_code_vanity']:
+        for key in ADDRESS_STRING_FIELDS:
             row_dict[key] = str(row_dict.get(key)) if row_dict.get(key) is not None else None
 
-def process_name_fields(row_dict):
-    """Handle name fields"""
-    for key in ['name', 'alt_name', 'short_name']:
-        value = row_dict.get(key)
-        if isinstance(value, str):
-            try:
-                parsed_value = json.loads(value)
-                row_dict[key] = None if is_empty_value(parsed_value) else parsed_value
-            except json.JSONDecodeError:
-                continue
-
-def process_other_fields(row_dict, key, value):
-    """Handle gpkg array strings and JSON string fields"""
-    pg_array = convert_gpkg_array_to_list(value)
-    if isinstance(pg_array, list):
-        return None if len(pg_array) == 0 else pg_array
-
-    if isinstance(value, str):
-        try:
-            parsed_value = json.loads(value)
-            return None if is_empty_value(parsed_value) else parsed_value
-        except json.JSONDecodeError:
-            return value
-
-    if is_empty_value(value):
-        return None
+def parse_name_value(value):
+    """Parse a JSON name string, empty names become None and invalid JSON is kept as is"""
+    if not isinstance(value, str):
+        return value
+    try:
+        parsed_value = json.loads(value)
+        return None if is_empty_value(parsed_value) else parsed_value
+    except json.JSONDecodeError:
+        return value
 
-    return value
+def parse_array_value(value):
+    """Convert a gpkg array string to a list, empty arrays become None"""
+    array = convert_gpkg_array_to_list(value)
+    if isinstance(array, list):
+        return None if len(array) == 0 else array
+    return array
 
 def process_display_point(row_dict):
     """Handle display_point"""
@@ -123,31 +211,399 @@ def process_display_point(row_dict):
             print(f"Warning: Could not parse display_point '{row_dict['display_point']}'")
     return row_dict.get('display_point')
 
-def export_layers_custom_format(gpkg_path, output_folder, layers_to_export):
-    available_layers = fiona.listlayers(gpkg_path)
-    exported_files = []
+def convert_display_point(value):
+    """Convert a single display_point value like process_display_point"""
+    display_point = process_display_point({'display_point': value})
+    return display_point if display_point else value
+
+# Column plan kind -> converter, kinds without a converter are exported as read
+COLUMN_CONVERTERS = {
+    'json': parse_name_value,
+    'array': parse_array_value,
+    'display_point': convert_display_point
+}
+
+def export_layers_custom_format(gpkg_path, output_folder, layers_to_export, zipf=None):
+    """
+    Export layers as GeoJSON FeatureCollections
+
+    Without zipf every layer is written to output_folder/<layer>.geojson and the file paths
+    are returned. With zipf every layer is streamed straight into a <layer>.geojson entry of
+    the open archive (plus a loose file if config.write_geojson_files is set) and the entry
+    names are returned.
+    """
+    available_layers = list_layers(gpkg_path)
 
+    layers = []
     for layer in layers_to_export:
         if layer not in available_layers:
             print(f"Layer '{layer}' not found. Available layers: {available_layers}")
             continue
+        layers.append(layer)
 
-        print(f"Reading layer: {layer}")
-        gdf = gpd.read_file(gpkg_path, layer=layer)
+    os.makedirs(output_folder, exist_ok=True)
 
-        os.makedirs(output_folder, exist_ok=True)
-        output_path = os.path.join(output_folder, f"{layer}.geojson")
+    cache_folder = None
+    cached_layers = {}
 
-        if gdf.empty:
+    if config.incremental_export:
+        cache_folder = export_cache.get_cache_folder(output_folder)
+        cache_state = export_cache.load_state(cache_folder)
+        settings_hash = export_cache.get_settings_hash(get_config_settings())
+        fingerprints = {
+            layer: export_cache.get_layer_fingerprint(gpkg_path, layer, settings_hash, build_column_plan(gpkg_path, layer))
+            for layer in layers
+        }
+
+        for layer in layers:
+            is_cached, cached_path = export_cache.get_cached_layer(cache_folder, cache_state, layer, fingerprints[layer])
+            if is_cached:
+                print(f"Layer '{layer}' is unchanged, reusing the cached export")
+                cached_layers[layer] = cached_path
+
+    changed_layers = [layer for layer in layers if layer not in cached_layers]
+
+    # Junction tables are read once per export run and shared by all layers
+    with export_metrics.stage('junctions'):
+        junction_index = load_junction_index(gpkg_path) if changed_layers else {}
+
+    feature_cache_path = get_feature_cache_path(output_folder) if changed_layers else None
+
+    parallel_results = {}
+    if changed_layers and config.export_workers > 1:
+        parallel_results = export_layers_parallel(
+            gpkg_path, output_folder, changed_layers, junction_index, zipf, cache_folder, feature_cache_path
+        )
+
+    # Write in the requested layer order regardless of the order the layers finished in
+    exported = {}
+    for layer in layers:
+        file_name = f"{layer}.geojson"
+
+        if layer in cached_layers:
+            written = cached_layers[layer] is not None
+            if written:
+                with open(cached_layers[layer], "rb") as cached_file, \
+                        open_export_output(output_folder, file_name, zipf) as f:
+                    writer = export_metrics.TimedWriter(f, layer)
+                    shutil.copyfileobj(cached_file, writer)
+                export_metrics.count(layer, 'bytes', writer.bytes_written)
+                export_metrics.count(layer, 'features', export_cache.get_cached_feature_count(cache_state, layer))
+                export_metrics.count(layer, 'cached_layers')
+
+        elif layer in parallel_results:
+            written = parallel_results[layer] is not None
+            if written and zipf is not None:
+                try:
+                    with open(parallel_results[layer], "rb") as encoded_file, \
+                            open_export_output(output_folder, file_name, zipf, cache_folder) as f:
+                        shutil.copyfileobj(encoded_file, export_metrics.TimedWriter(f, layer))
+                finally:
+                    os.remove(parallel_results[layer])
+
+        else:
+            written = export_layer(
+                gpkg_path, layer, junction_index,
+                lambda: open_export_output(output_folder, file_name, zipf, cache_folder),
+                feature_cache_path
+            )
+
+        exported[layer] = get_export_name(output_folder, file_name, zipf) if written else None
+
+        if cache_folder and layer not in cached_layers:
+            export_cache.update_state(
+                cache_folder, cache_state, layer, fingerprints[layer], written, export_metrics.get_count(layer, 'features')
+            )
+
+    return [exported[layer] for layer in layers if exported[layer]]
+
+def export_layer(gpkg_path, layer, junction_index, open_output, feature_cache_path=None):
+    """Read, transform and write one layer to the file opened by open_output(), returns False if the layer has no features"""
+    if feature_cache_path:
+        return export_layer_cached(gpkg_path, layer, junction_index, open_output, feature_cache_path)
+
+    print(f"Reading layer: {layer}")
+    with export_metrics.stage('read', layer):
+        features = read_layer_features(gpkg_path, layer, junction_index)
+
+    if features is None:
+        print(f"Warning: Layer '{layer}' has no features. Skipping export.")
+        return False
+
+    print(f"Exporting layer as GeoJSON FeatureCollection: {layer}.geojson")
+    # Serialization is what remains after the nested transform and write stages
+    with open_output() as f, export_metrics.stage('serialize', layer):
+        writer = export_metrics.TimedWriter(f, layer)
+        write_feature_collection(export_metrics.timed(features, 'transform', layer, 'features'), writer)
+    export_metrics.count(layer, 'bytes', writer.bytes_written)
+    return True
+
+def get_feature_cache_path(output_folder):
+    """Get the feature cache database of an output directory, None if the feature cache is off or cannot be used"""
+    if not config.feature_cache:
+        return None
+    if get_reader_engine() != 'sqlite':
+        print("Warning: The feature cache needs the \"sqlite\" reader engine, exporting without it")
+        return None
+    if geometry_qa.is_geometry_qa_enabled() or geometry_qa.is_display_point_check_enabled():
+        print("Warning: The feature cache is not used while geometry QA or the display point check is on")
+        return None
+    return feature_cache.get_cache_path(output_folder)
+
+def export_layer_cached(gpkg_path, layer, junction_index, open_output, feature_cache_path):
+    """
+    Export one layer like export_layer with the "sqlite" reader engine, reusing cached features
+
+    Rows are read raw and keyed by their values, geometry blob and junction IDs. Only the
+    rows the feature cache has no encoded feature for are decoded, transformed and encoded,
+    and their encodings are added to the cache.
+    """
+    print(f"Reading layer: {layer}")
+    column_plan = build_column_plan(gpkg_path, layer)
+    mappings = list(junction_mappings.get(layer, {}).values())
+    key_prefix = feature_cache.get_key_prefix(export_cache.get_settings_hash(get_config_settings()), layer, column_plan)
+    max_bytes = config.feature_cache_max_mb * 1024 * 1024
+
+    with closing(gpkg_reader.connect(gpkg_path)) as conn, \
+            closing(feature_cache.FeatureCache(feature_cache_path, max_bytes)) as cache:
+        sql, names, decode_row = gpkg_reader.prepare_row_query(
+            conn, layer, config.coordinate_precision, config.drop_repeated_vertices
+        )
+        id_index = names.index('id') if 'id' in names else None
+
+        with export_metrics.stage('read', layer):
+            cursor = conn.execute(sql)
+            rows = cursor.fetchmany(feature_cache.LOOKUP_BATCH_SIZE)
+        if not rows:
             print(f"Warning: Layer '{layer}' has no features. Skipping export.")
-            continue
+            return False
+
+        print(f"Exporting layer as GeoJSON FeatureCollection: {layer}.geojson")
+        features = hits = 0
+        with open_output() as f, export_metrics.stage('serialize', layer):
+            writer = FeatureCollectionWriter(export_metrics.TimedWriter(f, layer))
+            while rows:
+                with export_metrics.stage('junctions', layer):
+                    junction_ids = [
+                        [
+                            get_junction_table_ids(junction_index, mapping['table'], mapping['id'], mapping['ref'], row[id_index])
+                            for mapping in mappings
+                        ] if id_index is not None else None
+                        for row in rows
+                    ]
+                keys = [feature_cache.get_feature_key(key_prefix, row, ids) for row, ids in zip(rows, junction_ids)]
+                cached = cache.get_many(keys)
+
+                for row, key in zip(rows, keys):
+                    encoded = cached.get(key)
+                    if encoded is None:
+                        with export_metrics.stage('transform', layer):
+                            feature = next(iter_layer_features([decode_row(row)], layer, junction_index, column_plan), None)
+                        if feature is None:
+                            continue
+                        encoded = writer.encode(feature)
+                        cache.put(key, encoded)
+                    else:
+                        hits += 1
+                    writer.write_encoded(encoded)
+                    features += 1
+
+                with export_metrics.stage('read', layer):
+                    rows = cursor.fetchmany(feature_cache.LOOKUP_BATCH_SIZE)
+            writer.close()
+
+    export_metrics.count(layer, 'features', features)
+    export_metrics.count(layer, 'feature_cache_hits', hits)
+    export_metrics.count(layer, 'bytes', writer.f.bytes_written)
+    return True
+
+def read_layer_features(gpkg_path, layer, junction_index):
+    """Read a layer, returns an iterator of its IMDF features or None if the layer has no rows"""
+    column_plan = build_column_plan(gpkg_path, layer)
+    reader_engine = get_reader_engine()
+
+    if reader_engine == 'arrow':
+        batches = export_metrics.timed(read_arrow_batches(gpkg_path, layer), 'read', layer)
+        first_batch = next(batches, None)
+        if first_batch is None:
+            return None
+        return itertools.chain.from_iterable(
+            iter_arrow_features(batch, geometry_name, layer, junction_index, column_plan)
+            for geometry_name, batch in itertools.chain([first_batch], batches)
+        )
+
+    if reader_engine == 'geopandas' and config.read_batch_size:
+        batches = export_metrics.timed(read_layer_batches(gpkg_path, layer), 'read', layer)
+        first_batch = next(batches, None)
+        if first_batch is None:
+            return None
+        return itertools.chain.from_iterable(
+            iter_geodataframe_features(gdf, layer, junction_index, column_plan)
+            for gdf in itertools.chain([first_batch], batches)
+        )
+
+    if reader_engine == 'geopandas':
+        gdf = gpd.read_file(gpkg_path, layer=layer)
+        if gdf.empty:
+            return None
+        return iter_geodataframe_features(gdf, layer, junction_index, column_plan)
 
-        print(f"Exporting layer as GeoJSON FeatureCollection: {output_path}")
-        # Pass gpkg_path to export_spatial_layer
-        export_spatial_layer(gdf, output_path, feature_type=layer, gpkg_path=gpkg_path)
-        exported_files.append(output_path)
+    if geometry_qa.is_geometry_qa_enabled() or geometry_qa.is_display_point_check_enabled():
+        rows = export_metrics.timed(gpkg_reader.read_rows_with_wkb(
+            gpkg_path, layer, config.coordinate_precision, config.drop_repeated_vertices
+        ), 'read', layer)
+        rows = geometry_qa.check_row_geometries(rows, layer, round_geometries)
+    else:
+        rows = export_metrics.timed(read_layer_rows(gpkg_path, layer), 'read', layer)
+    first_row = next(rows, None)
+    if first_row is None:
+        return None
+    return iter_layer_features(itertools.chain([first_row], rows), layer, junction_index, column_plan)
+
+def read_arrow_batches(gpkg_path, layer):
+    """
+    Yield a layer as Arrow record batches in fid order, as (geometry column name, batch)
+
+    The geometry column holds WKB, the geometry column name is None for attribute tables.
+    """
+    batch_size = config.read_batch_size or ARROW_BATCH_SIZE
+    with pyogrio.open_arrow(gpkg_path, layer=layer, batch_size=batch_size, use_pyarrow=True) as (meta, reader):
+        geometry_name = None
+        if meta['geometry_type']:
+            geometry_name = meta['geometry_name'] or 'wkb_geometry'
+
+        for batch in reader:
+            if batch.num_rows:
+                yield geometry_name, batch
+
+def read_layer_batches(gpkg_path, layer):
+    """Yield a layer as GeoDataFrames of config.read_batch_size rows in fid order, so only one batch is in memory"""
+    fid_column, batches = gpkg_reader.get_fid_batches(gpkg_path, layer, config.read_batch_size)
+
+    if fid_column is None:
+        gdf = gpd.read_file(gpkg_path, layer=layer)
+        if not gdf.empty:
+            yield gdf
+        return
+
+    for first_fid, last_fid in batches:
+        yield gpd.read_file(
+            gpkg_path, layer=layer, where=f'"{fid_column}" >= {first_fid} AND "{fid_column}" <= {last_fid}'
+        )
+
+def get_export_name(output_folder, file_name, zipf=None):
+    """Name an exported file is reported as: its archive name when writing into a zip, else its path"""
+    return file_name if zipf is not None else os.path.join(output_folder, file_name)
+
+@contextmanager
+def open_export_output(output_folder, file_name, zipf=None, cache_folder=None):
+    """
+    Open the binary destination of an exported file: an entry of zipf and/or a loose file
+    in output_folder, plus a copy in the incremental export cache when cache_folder is given
+    """
+    with ExitStack() as stack:
+        outputs = []
+        if zipf is not None:
+            outputs.append(stack.enter_context(zipf.open(file_name, "w")))
+        if zipf is None or config.write_geojson_files:
+            outputs.append(stack.enter_context(open(os.path.join(output_folder, file_name), "wb")))
+        if cache_folder:
+            outputs.append(stack.enter_context(export_cache.open_cache_file(cache_folder, file_name)))
+
+        yield outputs[0] if len(outputs) == 1 else TeeWriter(outputs)
+
+class TeeWriter:
+    """Binary writer that passes every write on to several files"""
+
+    def __init__(self, files):
+        self.files = files
+
+    def write(self, data):
+        for f in self.files:
+            f.write(data)
+        return len(data)
+
+def export_layers_parallel(gpkg_path, output_folder, layers, junction_index, zipf=None, cache_folder=None,
+                           feature_cache_path=None):
+    """
+    Export layers in a process pool
+
+    Returns a layer -> result mapping: the path of a temporary file in output_folder with
+    the encoded layer when writing into zipf (only one process can write the archive, the
+    caller copies and removes the file), True when the worker wrote the file itself, or
+    None if the layer has no features. The metrics of the workers are added to this run.
+    """
+    # Start the largest layers first so the slowest one is not left running alone at the end
+    feature_counts = {layer: gpkg_reader.count_rows(gpkg_path, layer) for layer in layers}
+    scheduled_layers = sorted(layers, key=lambda layer: feature_counts[layer], reverse=True)
+
+    results = {}
+    with ProcessPoolExecutor(
+        max_workers=config.export_workers,
+        initializer=init_export_worker,
+        initargs=(get_config_settings(), junction_index)
+    ) as executor:
+        futures = {
+            executor.submit(
+                export_layer_in_worker,
+                gpkg_path, output_folder, layer, zipf is not None, cache_folder, feature_cache_path
+            ): layer
+            for layer in scheduled_layers
+        }
+        for future in as_completed(futures):
+            results[futures[future]], worker_metrics = future.result()
+            export_metrics.get_metrics().merge(worker_metrics)
+
+    return results
+
+def get_config_settings():
+    """Get the current config values so worker processes see runtime changes too"""
+    return {
+        name: value for name, value in vars(config).items()
+        if not name.startswith('__') and isinstance(value, (str, int, float, bool, list, dict, type(None)))
+    }
+
+_worker_junction_index = None
+
+def init_export_worker(config_settings, junction_index):
+    """Process pool initializer: apply the parent's config and keep the junction index for all tasks"""
+    global _worker_junction_index
+    for name, value in config_settings.items():
+        setattr(config, name, value)
+    logging.basicConfig(level=config.log_level)
+    _worker_junction_index = junction_index
+
+def export_layer_in_worker(gpkg_path, output_folder, layer, encode_only, cache_folder=None, feature_cache_path=None):
+    """
+    Process pool task: export one layer with the junction index of this worker
+
+    Writes output_folder/<layer>.geojson, or with encode_only a temporary file in
+    output_folder whose path is returned for the parent process to copy. The result is
+    None if the layer has no features. Returns (result, metrics snapshot of the task).
+    """
+    export_metrics.reset()
+
+    if encode_only:
+        fd, encoded_path = tempfile.mkstemp(prefix=f"{layer}.", suffix=".geojson.tmp", dir=output_folder)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                written = export_layer(
+                    gpkg_path, layer, _worker_junction_index, lambda: nullcontext(f), feature_cache_path
+                )
+        except BaseException:
+            os.remove(encoded_path)
+            raise
+        if not written:
+            os.remove(encoded_path)
+            encoded_path = None
+        return encoded_path, export_metrics.get_metrics().snapshot()
 
-    return exported_files
+    written = export_layer(
+        gpkg_path, layer, _worker_junction_index,
+        lambda: open_export_output(output_folder, f"{layer}.geojson", cache_folder=cache_folder),
+        feature_cache_path
+    )
+    return (True if written else None), export_metrics.get_metrics().snapshot()
 
 def process_door_fields(properties):
     """Process door fields for opening layer"""
@@ -155,6 +611,10 @@ def process_door_fields(properties):
     automatic = properties.pop('automatic', False)
     material = properties.pop('material', None)
 
+    properties['door'] = build_door(type_val, automatic, material)
+
+def build_door(type_val, automatic, material):
+    """Build the door object of an opening, None if no door field is set"""
     if automatic or material or type_val:
         door_dict = {}
         if type_val:
@@ -164,9 +624,8 @@ def process_door_fields(properties):
         if material:
             door_dict['material'] = material
 
-        properties['door'] = door_dict
-    else:
-        properties['door'] = None
+        return door_dict
+    return None
 
 def process_validity_fields(properties):
     """Process validity fields for occupant layer"""
@@ -174,9 +633,13 @@ def process_validity_fields(properties):
     end = properties.pop('end', None)
     modified = properties.pop('modified', None)
 
-    start = start.isoformat() if pd.notnull(start) and hasattr(start, 'isoformat') else None
-    end = end.isoformat() if pd.notnull(end) and hasattr(end, 'isoformat') else None
-    modified = modified.isoformat() if pd.notnull(modified) and hasattr(modified, 'isoformat') else None
+    properties['validity'] = build_validity(start, end, modified)
+
+def build_validity(start, end, modified):
+    """Build the validity object of an occupant, None if no date is set"""
+    start = start.isoformat() if not is_null_value(start) and hasattr(start, 'isoformat') else None
+    end = end.isoformat() if not is_null_value(end) and hasattr(end, 'isoformat') else None
+    modified = modified.isoformat() if not is_null_value(modified) and hasattr(modified, 'isoformat') else None
 
     if any(x is not None for x in [start, end, modified]):
         validity_dict = {}
@@ -187,9 +650,8 @@ def process_validity_fields(properties):
         if modified:
             validity_dict['modified'] = modified
 
-        properties['validity'] = validity_dict
-    else:
-        properties['validity'] = None
+        return validity_dict
+    return None
 
 def format_relationship_properties(properties):
     """Format relationship properties"""
@@ -247,21 +709,14 @@ def format_relationship_properties(properties):
 
     return properties
 
-def process_feature_properties(row_dict, feature_type):
-    """Process all fields of a feature"""
+def process_feature_properties(row_dict, feature_type, column_plan):
+    """Process all fields of a feature, running only the converters the column plan assigns"""
     process_address_fields(row_dict, feature_type)
-    process_name_fields(row_dict)
 
     for key, value in row_dict.items():
-        if key in ['unit', 'postal_code', 'postal_code_ext', 'postal_code_vanity', 'name', 'alt_name', 'short_name']:
-            continue
-
-        processed_value = process_other_fields(row_dict, key, value)
-        row_dict[key] = processed_value
-
-    display_point = process_display_point(row_dict)
-    if display_point:
-        row_dict['display_point'] = display_point
+        convert = COLUMN_CONVERTERS.get(column_plan.get(key))
+        if convert:
+            row_dict[key] = convert(value)
 
     if feature_type == 'opening':
         process_door_fields(row_dict)
@@ -270,14 +725,233 @@ def process_feature_properties(row_dict, feature_type):
     elif feature_type == 'relationship':
         row_dict = format_relationship_properties(row_dict)
 
-def export_spatial_layer(gdf, output_path, feature_type, gpkg_path):
-    features = []
-    
-    for _, row in gdf.iterrows():
-        row_dict = row.to_dict()
+def build_column_plan(gpkg_path, feature_type):
+    """
+    Decide once per layer how each column has to be converted
+
+    The column kind comes from the declared GeoPackage column type, gpkg_data_columns
+    (mime type) and the attribute types in gpkg_layers_config:
+    json - JSON strings such as names, parsed into objects
+    array - gpkg array strings of multi-value domain fields, parsed into lists
+    display_point - "lat, lon" strings, parsed into GeoJSON points
+    ids - _ids lists from junction tables
+    datetime, bool, int, text - exported as read
+    """
+    declared_types, data_columns = gpkg_reader.get_column_metadata(gpkg_path, feature_type)
+    attribute_types = get_attribute_types(feature_type)
+
+    column_plan = {
+        name: get_column_kind(name, declared_type, attribute_types.get(name), data_columns.get(name, {}))
+        for name, declared_type in declared_types.items()
+    }
+    for field_name in junction_mappings.get(feature_type, {}):
+        column_plan[field_name] = 'ids'
+
+    return column_plan
+
+def get_column_kind(name, declared_type, attribute_type, data_column):
+    """Get the column plan kind of a single column"""
+    if name in ADDRESS_STRING_FIELDS:
+        # Converted to strings by process_address_fields
+        return 'text'
+    if name in NAME_FIELDS or attribute_type == 'StringList' or data_column.get('mime_type') == 'application/json':
+        return 'json'
+    if name == 'display_point':
+        return 'display_point'
+    if name in domain_fields_config and domain_config['AllowMulti']:
+        return 'array'
+    if declared_type in ('DATETIME', 'DATE') or attribute_type == 'DateTime':
+        return 'datetime'
+    if declared_type == 'BOOLEAN' or attribute_type == 'Bool':
+        return 'bool'
+    if declared_type in ('INTEGER', 'MEDIUMINT', 'SMALLINT', 'TINYINT') or attribute_type == 'Int':
+        return 'int'
+    return 'text'
+
+def get_attribute_types(feature_type):
+    """Get the attribute -> QVariant type name mapping of a layer from gpkg_layers_config"""
+    attributes = gpkg_layers_config.get(feature_type, {}).get('attributes', {})
+    return {
+        name: attribute['type'] if isinstance(attribute, dict) else attribute
+        for name, attribute in attributes.items()
+    }
+
+def nulls_to_none(values):
+    """Replace the missing values of a column (None, NaN or NaT) by None"""
+    return [None if is_null_value(value) else value for value in values]
+
+def map_distinct(values, convert):
+    """Apply convert once per distinct non-null value of a column"""
+    converted = {}
+    result = []
+    for value in values:
+        if is_null_value(value) or isinstance(value, (list, dict)):
+            result.append(convert(value))
+            continue
+        # Keyed by type too, so that e.g. 1 and True are not mixed up
+        key = (type(value), value)
+        if key not in converted:
+            converted[key] = convert(value)
+        result.append(converted[key])
+    return result
+
+def transform_columns(columns, geometries, row_count, feature_type, junction_index, column_plan):
+    """
+    Apply the processing of process_junction_tables and process_feature_properties column by column
+
+    columns maps attribute names to lists of values and geometries is an array of shapely
+    geometries (None for attribute tables). Each column runs only the converter its column
+    plan kind needs, once per distinct value. Missing values (NaN and NaT of pandas columns)
+    become None first, so every reader engine gives the converters the same values.
+    Returns (feature IDs, GeoJSON geometries, property name -> list of values).
+    """
+    columns = {name: nulls_to_none(values) for name, values in columns.items()}
+    ids = columns.pop('id', [None] * row_count)
+    if geometries is not None:
+        geometries = round_geometries(geometries)
+        if geometry_qa.is_geometry_qa_enabled():
+            geometries = geometry_qa.check_geometries(geometries, ids, feature_type)
+        if 'display_point' in columns and geometry_qa.is_display_point_check_enabled():
+            columns['display_point'] = geometry_qa.check_display_points(
+                columns['display_point'], geometries, ids, feature_type
+            )
+        geometries = [geometry.__geo_interface__ if geometry else None for geometry in geometries]
+    else:
+        geometries = [None] * row_count
+
+    # Junction table _ids fields
+    with export_metrics.stage('junctions', feature_type):
+        for field_name, mapping in junction_mappings.get(feature_type, {}).items():
+            ids_lookup = junction_index.get((mapping['table'], mapping['ref'], mapping['id']), {})
+            columns[field_name] = [
+                list(ids_lookup[str(feature_id)]) if str(feature_id) in ids_lookup else None
+                for feature_id in ids
+            ]
+            export_metrics.count(feature_type, 'junction_lookups', row_count)
+            export_metrics.count(feature_type, 'junction_hits', sum(value is not None for value in columns[field_name]))
+
+    if feature_type == 'address':
+        for name in ADDRESS_STRING_FIELDS:
+            values = columns.get(name, [None] * row_count)
+            columns[name] = map_distinct(values, lambda value: str(value) if value is not None else None)
+
+    for name, values in columns.items():
+        convert = COLUMN_CONVERTERS.get(column_plan.get(name))
+        if convert:
+            columns[name] = map_distinct(values, convert)
+
+    if feature_type == 'opening':
+        type_values = columns.pop('type', [None] * row_count)
+        automatic_values = columns.pop('automatic', [False] * row_count)
+        material_values = columns.pop('material', [None] * row_count)
+        columns['door'] = [
+            build_door(type_val, automatic, material)
+            for type_val, automatic, material in zip(type_values, automatic_values, material_values)
+        ]
+    elif feature_type == 'occupant':
+        start_values = columns.pop('start', [None] * row_count)
+        end_values = columns.pop('end', [None] * row_count)
+        modified_values = columns.pop('modified', [None] * row_count)
+        columns['validity'] = [
+            build_validity(start, end, modified)
+            for start, end, modified in zip(start_values, end_values, modified_values)
+        ]
+
+    return ids, geometries, columns
+
+def round_geometries(geometries):
+    """
+    Round the coordinates of an array of shapely geometries to config.coordinate_precision decimals
+
+    All coordinates of the array are rounded in one NumPy call. With config.drop_repeated_vertices
+    consecutive vertices that became equal are removed as well.
+    """
+    if config.coordinate_precision is None:
+        return geometries
+
+    geometries = np.asarray(geometries, dtype=object)
+    precision = config.coordinate_precision
+    include_z = bool(shapely.has_z(geometries).any())
+    geometries = shapely.transform(geometries, lambda coordinates: np.round(coordinates, precision), include_z=include_z)
+
+    if config.drop_repeated_vertices:
+        geometries = remove_repeated_vertices(geometries)
+    return geometries
+
+def remove_repeated_vertices(geometries):
+    """
+    Remove repeated vertices from an array of geometries
+
+    Geometries that would be left with a line of less than 2 or a ring of less than 4
+    vertices are kept as they are.
+    """
+    try:
+        result = shapely.remove_repeated_points(geometries, tolerance=0)
+    except shapely.errors.GEOSException:
+        # GEOS refuses to build some collapsed geometry, retry one geometry at a time
+        result = np.array([remove_repeated_vertices_of(geometry) for geometry in geometries], dtype=object)
+
+    rings, index = shapely.get_rings(result, return_index=True)
+    collapsed = np.unique(index[shapely.get_num_coordinates(rings) < 4])
+    result[collapsed] = geometries[collapsed]
+    return result
+
+def remove_repeated_vertices_of(geometry):
+    """Remove repeated vertices of a single geometry, unchanged if GEOS cannot build the result"""
+    try:
+        return shapely.remove_repeated_points(geometry, tolerance=0)
+    except shapely.errors.GEOSException:
+        return geometry
+
+def iter_geodataframe_features(gdf, feature_type, junction_index, column_plan):
+    """Transform a GeoDataFrame column by column, then turn its rows into IMDF features"""
+    columns = {name: gdf[name].tolist() for name in gdf.columns if name != 'geometry'}
+    geometries = gdf['geometry'].values if 'geometry' in gdf.columns else None
+    yield from iter_column_features(columns, geometries, len(gdf), feature_type, junction_index, column_plan)
+
+def iter_arrow_features(batch, geometry_name, feature_type, junction_index, column_plan):
+    """Transform an Arrow record batch column by column, then turn its rows into IMDF features"""
+    columns = {
+        name: batch.column(name).to_pylist() for name in batch.schema.names if name != geometry_name
+    }
+    geometries = None
+    if geometry_name:
+        # All WKB geometries of the batch are parsed in one call
+        geometries = shapely.from_wkb(batch.column(geometry_name).to_numpy(zero_copy_only=False))
+    yield from iter_column_features(columns, geometries, batch.num_rows, feature_type, junction_index, column_plan)
+
+def iter_column_features(columns, geometries, row_count, feature_type, junction_index, column_plan):
+    """Transform the columns of a layer, then turn its rows into IMDF features"""
+    ids, geometries, columns = transform_columns(
+        columns, geometries, row_count, feature_type, junction_index, column_plan
+    )
+
+    names = list(columns)
+    rows = zip(*columns.values()) if columns else itertools.repeat((), len(ids))
+
+    for feature_id, geometry, values in zip(ids, geometries, rows):
+        if feature_id is None:
+            continue
+
+        properties = dict(zip(names, values))
+        if feature_type == 'relationship':
+            format_relationship_properties(properties)
+
+        yield {
+            "id": feature_id,
+            "type": "Feature",
+            "feature_type": feature_type,
+            "geometry": geometry,
+            "properties": properties
+        }
+
+def iter_layer_features(rows, feature_type, junction_index, column_plan):
+    """Turn layer rows into IMDF features one at a time"""
+    for row_dict in rows:
         
         # Process junction tables to add _ids fields
-        process_junction_tables(row_dict, feature_type, gpkg_path)
+        with export_metrics.stage('junctions', feature_type):
+            process_junction_tables(row_dict, feature_type, junction_index)
         
         feature_id = row_dict.pop('id', None)
         geometry = row_dict.pop('geometry', None)
@@ -286,26 +960,108 @@ def export_spatial_layer(gdf, output_path, feature_type, gpkg_path):
             continue
 
         # Process all fields
-        process_feature_properties(row_dict, feature_type)
+        process_feature_properties(row_dict, feature_type, column_plan)
 
-        feature = {
+        yield {
             "id": feature_id,
             "type": "Feature",
             "feature_type": feature_type,
-            "geometry": geometry.__geo_interface__ if geometry else None,
+            "geometry": geometry,
             "properties": row_dict
         }
-        features.append(feature)
 
-    feature_collection = {
-        "type": "FeatureCollection",
-        "features": features
-    }
+def write_feature_collection(features, f):
+    """
+    Stream features into a binary file as a GeoJSON FeatureCollection
+
+    Each feature is encoded and written as soon as it is produced, so memory use does not
+    grow with the layer size.
+    """
+    writer = FeatureCollectionWriter(f)
+    for feature in features:
+        writer.write(feature)
+    writer.close()
+
+class FeatureCollectionWriter:
+    """
+    Writes a GeoJSON FeatureCollection into a binary file one feature at a time
+
+    The "pretty" profile writes the same layout as json.dump(..., indent=2), the "compact"
+    profile writes no whitespace at all.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.encode = get_json_encoder()
+        self.compact = config.output_profile == 'compact'
+        self.feature_count = 0
+
+        if self.compact:
+            f.write(b'{"type":"FeatureCollection","features":[')
+        else:
+            f.write(b'{\n  "type": "FeatureCollection",\n  "features": [')
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(feature_collection, f, ensure_ascii=False, indent=2)
+    def write(self, feature):
+        self.write_encoded(self.encode(feature))
 
-def create_manifest_json(output_folder):
+    def write_encoded(self, encoded):
+        """Write a feature that was already encoded with self.encode"""
+        if self.compact:
+            if self.feature_count:
+                self.f.write(b',')
+            self.f.write(encoded)
+        else:
+            self.f.write(b',\n    ' if self.feature_count else b'\n    ')
+            # Nest the feature two levels deep, like json.dump does for list items
+            self.f.write(encoded.replace(b'\n', b'\n    '))
+        self.feature_count += 1
+
+    def close(self):
+        if self.compact:
+            self.f.write(b']}')
+        else:
+            # An empty array is written as [] by json.dump
+            self.f.write(b'\n  ]\n}' if self.feature_count else b']\n}')
+
+def get_json_encoder():
+    """Get a function that encodes an object to UTF-8 JSON bytes for the configured output profile and encoder"""
+    key = (config.output_profile, config.json_encoder)
+    if key not in _json_encoders:
+        _json_encoders[key] = create_json_encoder(*key)
+    return _json_encoders[key]
+
+_json_encoders = {}
+
+def create_json_encoder(output_profile, json_encoder):
+    """Create the encode function of an output profile ("pretty" or "compact") and encoder ("auto", "orjson" or "json")"""
+    if output_profile not in ('pretty', 'compact'):
+        raise ValueError(f"Unknown output profile '{output_profile}', expected 'pretty' or 'compact'")
+    if json_encoder not in ('auto', 'orjson', 'json'):
+        raise ValueError(f"Unknown JSON encoder '{json_encoder}', expected 'auto', 'orjson' or 'json'")
+
+    if json_encoder in ('auto', 'orjson') and orjson is not None:
+        option = orjson.OPT_INDENT_2 if output_profile == 'pretty' else 0
+        return lambda obj: orjson.dumps(obj, default=encode_json_fallback, option=option)
+
+    if json_encoder == 'orjson':
+        raise ImportError("orjson is not installed, set config.json_encoder to 'auto' or 'json'")
+
+    # Without indent the standard library uses its C accelerated encoder
+    if output_profile == 'pretty':
+        encoder = json.JSONEncoder(ensure_ascii=False, indent=2, default=encode_json_fallback)
+    else:
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=encode_json_fallback)
+    return lambda obj: encoder.encode(obj).encode('utf-8')
+
+def encode_json_fallback(value):
+    """Default hook of both encoders for values they do not serialize natively (e.g. NumPy scalars)"""
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def create_manifest_json(output_folder, zipf=None):
     """Creates a manifest.json file with metadata about the export."""
     manifest = {
         "version": "1.0.0",
@@ -314,12 +1070,12 @@ def create_manifest_json(output_folder):
         "language": config.language
     }
 
-    manifest_path = os.path.join(output_folder, "manifest.json")
-    with open(manifest_path, "w", encoding="utf-8") as f:
-        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    with open_export_output(output_folder, "manifest.json", zipf) as f:
+        f.write(get_json_encoder()(manifest))
 
-    print(f"Created manifest at {manifest_path}")
-    return manifest_path
+    manifest_name = get_export_name(output_folder, "manifest.json", zipf)
+    print(f"Created manifest at {manifest_name}")
+    return manifest_name
 
 def create_zip_archive(output_folder, files_to_zip, zip_name="exported_imdf.zip"):
     """Creates a ZIP archive of the exported files."""
@@ -330,22 +1086,221 @@ def create_zip_archive(output_folder, files_to_zip, zip_name="exported_imdf.zip"
             zipf.write(file_path, arcname)
     print(f"Created ZIP archive: {zip_path}")
 
+def export_imdf_archive(gpkg_path, output_folder, layers_to_export, zip_name="exported_imdf.zip"):
+    """Exports layers and the manifest straight into an IMDF ZIP archive, returns the archive path"""
+    export_metrics.reset()
+    with export_metrics.stage('validate'):
+        reference_validator.validate_references(gpkg_path)
+    os.makedirs(output_folder, exist_ok=True)
+    zip_path = os.path.join(output_folder, zip_name)
+
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+        export_layers_custom_format(gpkg_path, output_folder, layers_to_export, zipf=zipf)
+        with export_metrics.stage('write'):
+            create_manifest_json(output_folder, zipf=zipf)
+
+    print(f"Created ZIP archive: {zip_path}")
+
+    if config.metrics_report:
+        report_path = export_metrics.write_report(output_folder, zip_name)
+        print(f"Wrote export metrics to {report_path}")
+    return zip_path
+
+# Layers in the order venue partitioning needs them: every layer comes after the layers
+# whose features decide its venue (addresses last, they belong to whoever references them)
+VENUE_LAYER_ORDER = [
+    'venue', 'level', 'building', 'footprint', 'unit', 'opening', 'section', 'fixture', 'kiosk',
+    'detail', 'geofence', 'anchor', 'amenity', 'occupant', 'relationship', 'address'
+]
+
+# Feature properties holding the IDs of the features that decide a feature's venue
+VENUE_REFERENCE_FIELDS = [
+    'level_id', 'unit_id', 'anchor_id', 'building_ids', 'level_ids', 'unit_ids', 'opening_ids', 'parents'
+]
+
+# Properties whose features take the venue of the feature referencing them
+# (a building gets the venue of its levels, an address the venue of whatever uses it)
+VENUE_REVERSE_FIELDS = ['building_ids', 'address_id']
+
+def export_venue_archives(gpkg_path, output_folder, layers_to_export):
+    """
+    Export every venue of a GeoPackage into its own IMDF archive, output_folder/<venue id>.zip
+
+    Each layer is read once and every feature is routed to the archives of the venues it
+    belongs to, see VenuePartitioner. Returns a venue ID -> archive path mapping.
+    """
+    export_metrics.reset()
+    with export_metrics.stage('validate'):
+        reference_validator.validate_references(gpkg_path)
+    os.makedirs(output_folder, exist_ok=True)
+
+    available_layers = list_layers(gpkg_path)
+    layers = [layer for layer in layers_to_export if layer in available_layers]
+    for layer in layers_to_export:
+        if layer not in available_layers:
+            print(f"Layer '{layer}' not found. Available layers: {available_layers}")
+    if 'venue' not in layers:
+        raise ValueError("Exporting per venue needs the venue layer")
+
+    ordered_layers = [layer for layer in VENUE_LAYER_ORDER if layer in layers]
+    ordered_layers += [layer for layer in layers if layer not in ordered_layers]
+
+    with export_metrics.stage('junctions'):
+        junction_index = load_junction_index(gpkg_path)
+
+    partitioner = None
+    archives = {}
+
+    with ExitStack() as stack:
+        for layer in ordered_layers:
+            print(f"Reading layer: {layer}")
+            with export_metrics.stage('read', layer):
+                features = read_layer_features(gpkg_path, layer, junction_index)
+            if features is None:
+                print(f"Warning: Layer '{layer}' has no features. Skipping export.")
+                continue
+            features = export_metrics.timed(features, 'transform', layer, 'features')
+
+            if partitioner is None:
+                # The venue layer comes first, its features are needed to route all others
+                features = list(features)
+                partitioner = VenuePartitioner(features)
+                for venue_id in partitioner.venue_ids:
+                    zip_path = os.path.join(output_folder, f"{venue_id}.zip")
+                    archives[venue_id] = stack.enter_context(zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED))
+
+            write_partitioned_layer(layer, features, partitioner, archives)
+
+        for zipf in archives.values():
+            with export_metrics.stage('write'):
+                create_manifest_json(output_folder, zipf=zipf)
+
+    if config.metrics_report:
+        report_path = export_metrics.write_report(output_folder, "venues.zip")
+        print(f"Wrote export metrics to {report_path}")
+
+    zip_paths = {venue_id: zipf.filename for venue_id, zipf in archives.items()}
+    for zip_path in zip_paths.values():
+        print(f"Created ZIP archive: {zip_path}")
+    return zip_paths
+
+def write_partitioned_layer(layer, features, partitioner, archives):
+    """Write the features of a layer into the <layer>.geojson entries of the archives of their venues"""
+    file_name = f"{layer}.geojson"
+    writers = {}
+    unassigned = 0
+
+    with ExitStack() as stack, export_metrics.stage('serialize', layer):
+        for feature in features:
+            venue_ids = partitioner.route(feature)
+            if not venue_ids:
+                unassigned += 1
+                continue
+
+            for venue_id in venue_ids:
+                if venue_id not in writers:
+                    # Venues without features in this layer get no entry, like empty layers
+                    entry = stack.enter_context(archives[venue_id].open(file_name, "w"))
+                    writers[venue_id] = FeatureCollectionWriter(export_metrics.TimedWriter(entry, layer))
+                writers[venue_id].write(feature)
+
+        for writer in writers.values():
+            writer.close()
+            export_metrics.count(layer, 'bytes', writer.f.bytes_written)
+
+    if unassigned:
+        print(f"Warning: {unassigned} {layer} feature(s) belong to no venue and were not exported")
+
+class VenuePartitioner:
+    """
+    Decides which venues a feature belongs to
+
+    A feature belongs to the venues of the features it references (VENUE_REFERENCE_FIELDS
+    and the origin, intermediary and destination of relationships) and of the features
+    that reference it through VENUE_REVERSE_FIELDS. Features that are linked to no venue
+    that way, like levels, belong to the venue whose polygon contains them. Features must
+    be routed in VENUE_LAYER_ORDER.
+    """
+
+    def __init__(self, venue_features):
+        self.venue_ids = [feature['id'] for feature in venue_features]
+        self.feature_venues = {venue_id: {venue_id} for venue_id in self.venue_ids}
+        self.venue_polygons = []
+
+        if len(self.venue_ids) > 1:
+            if shapely is None:
+                raise ImportError("Exporting several venues needs shapely to place features in their venue")
+            for feature in venue_features:
+                if feature['geometry']:
+                    polygon = shapely.geometry.shape(feature['geometry'])
+                    shapely.prepare(polygon)
+                    self.venue_polygons.append((feature['id'], polygon))
+
+    def route(self, feature):
+        """Get the IDs of the venues a feature belongs to, empty if it cannot be placed"""
+        if len(self.venue_ids) == 1:
+            return self.venue_ids
+
+        properties = feature['properties']
+        venue_ids = set(self.feature_venues.get(feature['id'], ()))
+        reference_ids = get_referenced_ids(properties, VENUE_REFERENCE_FIELDS) + get_relationship_ids(properties)
+        for reference_id in reference_ids:
+            venue_ids.update(self.feature_venues.get(reference_id, ()))
+
+        if not venue_ids and feature['geometry']:
+            venue_ids = self.find_containing_venues(feature['geometry'])
+
+        self.feature_venues[feature['id']] = venue_ids
+        for reference_id in get_referenced_ids(properties, VENUE_REVERSE_FIELDS):
+            self.feature_venues.setdefault(reference_id, set()).update(venue_ids)
+
+        return [venue_id for venue_id in self.venue_ids if venue_id in venue_ids]
+
+    def find_containing_venues(self, geometry):
+        """Get the IDs of the venues whose polygon contains a point on the surface of a GeoJSON geometry"""
+        point = shapely.point_on_surface(shapely.geometry.shape(geometry))
+        return {venue_id for venue_id, polygon in self.venue_polygons if polygon.covers(point)}
+
+def get_referenced_ids(properties, fields):
+    """Get the feature IDs held by the given properties of a feature"""
+    referenced_ids = []
+    for field in fields:
+        value = properties.get(field)
+        if isinstance(value, list):
+            referenced_ids.extend(value)
+        elif value is not None:
+            referenced_ids.append(value)
+    return referenced_ids
+
+def get_relationship_ids(properties):
+    """Get the feature IDs of the origin, intermediary and destination of a relationship"""
+    referenced_ids = []
+    for field in ('origin', 'intermediary', 'destination'):
+        value = properties.get(field)
+        for reference in value if isinstance(value, list) else [value]:
+            if isinstance(reference, dict) and reference.get('id'):
+                referenced_ids.append(reference['id'])
+    return referenced_ids
+
 if __name__ == "__main__":
-    
+
+    logging.basicConfig(level=config.log_level, format="%(levelname)s: %(message)s")
+
     gpkg_file = config.gpkg_path
     output_dir = config.output_dir
 
     excluded_layers = config.excluded_layers
-    all_layers = fiona.listlayers(gpkg_file)
+    all_layers = list_layers(gpkg_file)
     layers = [layer for layer in all_layers if layer not in excluded_layers]
 
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
 
-    # Export files and create zip
-    exported_files = export_layers_custom_format(gpkg_file, output_dir, layers)
-    manifest_path = create_manifest_json(output_dir)
-    exported_files.append(manifest_path)
-    create_zip_archive(output_dir, exported_files)
+    if config.partition_by_venue:
+        # One archive per venue
+        export_venue_archives(gpkg_file, output_dir, layers)
+    else:
+        # Export layers and the manifest straight into the zip
+        export_imdf_archive(gpkg_file, output_dir, layers)
 
-    print("IMDF zip file created successfully!")
\ No newline at end of file
+    print("IMDF zip file created successfully!")
@@ -1,27 +1,3 @@
-junction_mappings = {
-        'level': {
-            'building_ids': {'table': 'level_building', 'id': 'building_id', 'ref': 'level_id'}
-        },
-        'footprint': {
-            'building_ids': {'table': 'footprint_building', 'id': 'building_id', 'ref': 'footprint_id'}
-        },
-        'geofence': {
-            'building_ids': {'table': 'geofence_building', 'id': 'building_id', 'ref': 'geofence_id'},
-            'level_ids': {'table': 'geofence_level', 'id': 'level_id', 'ref': 'geofence_id'},
-            'parents': {'table': 'geofence_parent', 'id': 'parent_id', 'ref': 'child_id'}
-        },
-        'section': {
-            'parents': {'table': 'section_parent', 'id': 'parent_id', 'ref': 'child_id'}
-        },
-        'amenity': {
-            'unit_ids': {'table': 'amenity_unit', 'id': 'unit_id', 'ref': 'amenity_id'}
-        },
-        'relationship': {
-            'opening_ids': {'table': 'relationship_opening', 'id': 'opening_id', 'ref': 'relationship_id'},
-            'unit_ids': {'table': 'relationship_unit', 'id': 'unit_id', 'ref': 'relationship_id'}
-        }
-    }
-
 excluded_layers = [
         'access_control_domain', 
         'accessibility_domain',
@@ -36,6 +12,92 @@ excluded_layers = [
         'amenity_unit'
     ]
 
+# Check before exporting that every ID reference (relationships_config and the junction tables
+# in junction_mappings, both in gpkg_schema.py) points to an existing feature:
+# "warn" - print every orphan reference and export anyway
+# "error" - print every orphan reference and stop the export
+# "off" - skip the check
+validate_references = "warn"
+
+# Reader engine used to read the GeoPackage:
+# "auto" - "arrow" when pyogrio, pyarrow and shapely are installed and feature_cache is
+#          off, else "sqlite" (geopandas is only used when it is chosen explicitly)
+# "arrow" - pyogrio Arrow record batches with WKB geometries, transformed column by column
+# "geopandas" - geopandas/fiona GeoDataFrames
+# "sqlite" - sqlite3 with GeoPackage geometry blobs decoded straight to GeoJSON
+reader_engine = "auto"
+
+# Read layers in batches of this many features (in fid order) so that memory use is bounded
+# by the batch size instead of the layer size, None reads every layer at once.
+# Used by the "arrow" and "geopandas" engines, the "sqlite" engine always streams rows one by one.
+read_batch_size = None
+
+# Number of worker processes exporting layers in parallel (1 exports layers one after another)
+export_workers = 1
+
+# Also write loose <layer>.geojson and manifest.json files next to the IMDF zip
+# (layers are always streamed straight into the zip)
+write_geojson_files = False
+
+# Reuse the previous export of layers whose table, junction tables and export settings
+# have not changed (cached in <output_dir>/.imdf_cache)
+incremental_export = False
+
+# Reuse the encoded features of rows that did not change since an earlier export, cached in
+# <output_dir>/.imdf_cache/features.sqlite by a hash of the raw row, its geometry blob and its
+# junction IDs. Only used with the "sqlite" reader engine (which "auto" then picks) while
+# geometry_qa and display_point_check are "off" (the other engines transform whole columns at once).
+feature_cache = False
+
+# Size limit of the feature cache in MB, the least recently used features are removed first
+feature_cache_max_mb = 256
+
+# Layout of the exported GeoJSON and manifest files:
+# "pretty" - indented with 2 spaces
+# "compact" - no whitespace, smallest and fastest to write
+output_profile = "pretty"
+
+# JSON encoder: "auto" uses orjson when it is installed and the standard library otherwise,
+# "orjson" or "json" force one of them
+json_encoder = "auto"
+
+# Number of decimals exported coordinates are rounded to, None keeps full precision
+# (7 decimals, about 1 cm, matches the display_point default expression in GPKG_setup.py)
+coordinate_precision = None
+
+# Drop consecutive vertices that became equal through coordinate_precision rounding
+drop_repeated_vertices = False
+
+# Check the geometries of every layer with shapely 2.1+ (whole layers or batches at once):
+# invalid geometries, rings that do not follow the RFC 7946 right-hand rule (exterior rings
+# counterclockwise) and geometry types that differ from gpkg_layers_config
+# "report" - print every problem, geometries are exported as they are
+# "fix" - make invalid geometries valid, convert Polygon/MultiPolygon (and other single/multi
+#         part) mismatches and reorient rings, printing what was fixed
+# "off" - export geometries as they are without checking them
+geometry_qa = "off"
+
+# Check display_point values against the feature geometries with shapely 2.1+ (whole layers or
+# batches at once):
+# "fill" - compute missing display points with point_on_surface (like the default expression in
+#          GPKG_setup.py) and print the points that lie outside their geometry
+# "fix" - also compute the points that lie outside their geometry again
+# "off" - export display_point values as they are
+display_point_check = "off"
+
+# Write one archive per venue, <output_dir>/<venue id>.zip, instead of exported_imdf.zip.
+# Features go to the venues they reference (levels, units, anchors, ...) or that contain them.
+# Layers are read once and exported one after another (export_workers and incremental_export
+# are not used).
+partition_by_venue = False
+
+# Write <zip name>.metrics.json next to the archive with the time spent per stage
+# (validate, read, junctions, transform, serialize, write) and feature, byte and junction counts per layer
+metrics_report = True
+
+# Logging level of the exporter, "DEBUG" logs every processed feature and junction lookup
+log_level = "WARNING"
+
 # Language code for the IMDF manifest JSON
 language = "lt-LT"
 
@@ -0,0 +1,123 @@
+import glob
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+import config
+import gpkg_reader
+import shared_schema
+from shared_schema import junction_mappings
+
+# Cache folder created inside the output directory
+CACHE_FOLDER_NAME = ".imdf_cache"
+STATE_FILE_NAME = "state.json"
+
+# Config values that do not change the exported bytes of a layer
+IGNORED_SETTINGS = [
+    'gpkg_path',
+    'output_dir',
+    'export_workers',
+    'incremental_export',
+    'write_geojson_files',
+    'metrics_report',
+    'log_level',
+    'read_batch_size',
+    'validate_references',
+    'feature_cache',
+    'feature_cache_max_mb'
+]
+
+def get_cache_folder(output_folder):
+    """Get (and create) the incremental export cache folder of an output directory"""
+    cache_folder = os.path.join(output_folder, CACHE_FOLDER_NAME)
+    os.makedirs(cache_folder, exist_ok=True)
+    return cache_folder
+
+def load_state(cache_folder):
+    """Load the layer -> fingerprint state of the cache, empty if there is none yet"""
+    state_path = os.path.join(cache_folder, STATE_FILE_NAME)
+    try:
+        with open(state_path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Warning: Ignoring unreadable export cache state {state_path}: {e}")
+        return {}
+
+def update_state(cache_folder, state, layer, fingerprint, has_features, features=0):
+    """Record the fingerprint and feature count of a freshly exported layer and save the state"""
+    state[layer] = {"fingerprint": fingerprint, "has_features": has_features, "features": features}
+
+    state_path = os.path.join(cache_folder, STATE_FILE_NAME)
+    temp_path = state_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(temp_path, state_path)
+
+def get_settings_hash(config_settings):
+    """Hash the config values, exporter code and layer schema that shape the exported layers"""
+    settings_hash = hashlib.sha256()
+
+    settings = {name: value for name, value in config_settings.items() if name not in IGNORED_SETTINGS}
+    settings_hash.update(json.dumps(settings, sort_keys=True, default=str).encode("utf-8"))
+
+    # Any change to the exporter code or to the shared layer schema invalidates the cache too
+    source_paths = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "*.py")))
+    source_paths.append(os.path.join(shared_schema.GPKG_CREATE_FOLDER, "gpkg_schema.py"))
+    for source_path in source_paths:
+        with open(source_path, "rb") as f:
+            settings_hash.update(f.read())
+
+    return settings_hash.hexdigest()
+
+def get_layer_fingerprint(gpkg_path, layer, settings_hash, column_plan):
+    """
+    Fingerprint a layer from its table, the junction tables it uses, the export settings
+    and its column plan, which follows the column types and gpkg_data_columns metadata
+    """
+    junction_tables = sorted({
+        mapping['table'] for mapping in junction_mappings.get(layer, {}).values()
+    })
+
+    fingerprint = {
+        "layer": gpkg_reader.get_table_fingerprint(gpkg_path, layer),
+        "junction_tables": {
+            table: gpkg_reader.get_table_fingerprint(gpkg_path, table) for table in junction_tables
+        },
+        "settings": settings_hash,
+        "columns": list(column_plan.items())
+    }
+    return hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode("utf-8")).hexdigest()
+
+def get_cached_feature_count(state, layer):
+    """Get the number of features of a cached layer"""
+    return state.get(layer, {}).get("features", 0)
+
+def get_cached_layer(cache_folder, state, layer, fingerprint):
+    """
+    Look up a layer in the cache
+
+    Returns (is_cached, path of the cached GeoJSON or None if the layer had no features).
+    """
+    entry = state.get(layer)
+    if not entry or entry.get("fingerprint") != fingerprint:
+        return False, None
+
+    if not entry.get("has_features"):
+        return True, None
+
+    cached_path = os.path.join(cache_folder, f"{layer}.geojson")
+    if not os.path.exists(cached_path):
+        return False, None
+    return True, cached_path
+
+@contextmanager
+def open_cache_file(cache_folder, file_name):
+    """Open a cache file for writing, it only replaces the previous version once fully written"""
+    cached_path = os.path.join(cache_folder, file_name)
+    temp_path = cached_path + ".tmp"
+
+    with open(temp_path, "wb") as f:
+        yield f
+    os.replace(temp_path, cached_path)
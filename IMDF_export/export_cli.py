@@ -0,0 +1,172 @@
+import argparse
+import ast
+import glob
+import io
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+import config
+import export_metrics
+import IMDF_export
+
+def expand_gpkg_paths(patterns):
+    """Expand GeoPackage paths and glob patterns (shells on Windows do not expand them), keeping the order"""
+    gpkg_paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            print(f"Warning: No GeoPackages match '{pattern}'")
+        for gpkg_path in matches:
+            if gpkg_path not in gpkg_paths:
+                gpkg_paths.append(gpkg_path)
+    return gpkg_paths
+
+def get_run_names(gpkg_paths):
+    """Name every run after its GeoPackage, numbering GeoPackages with the same file name"""
+    run_names = []
+    for gpkg_path in gpkg_paths:
+        base_name = os.path.splitext(os.path.basename(gpkg_path))[0]
+        run_name = base_name
+        number = 2
+        while run_name in run_names:
+            run_name = f"{base_name}_{number}"
+            number += 1
+        run_names.append(run_name)
+    return run_names
+
+def parse_settings(assignments):
+    """Parse key=value config overrides, values are Python literals or plain strings"""
+    settings = {}
+    for assignment in assignments:
+        name, separator, value = assignment.partition('=')
+        if not separator or not hasattr(config, name):
+            raise ValueError(f"Invalid config override '{assignment}', expected an existing config name=value")
+        try:
+            settings[name] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            settings[name] = value
+    return settings
+
+def init_cli_worker(config_settings):
+    """Process pool initializer: apply the parent's config to the worker"""
+    for name, value in config_settings.items():
+        setattr(config, name, value)
+    logging.basicConfig(level=config.log_level, format="%(levelname)s: %(message)s")
+
+def run_export(gpkg_path, output_folder, zip_name, verbose=False):
+    """
+    Export one GeoPackage into output_folder/zip_name (or one archive per venue with
+    config.partition_by_venue), returns a summary of the run
+    """
+    summary = {"gpkg_path": gpkg_path, "zip_path": None, "error": None, "features": 0, "zip_size": 0}
+    start = time.perf_counter()
+
+    try:
+        output = sys.stdout if verbose else io.StringIO()
+        with redirect_stdout(output):
+            layers = [
+                layer for layer in IMDF_export.list_layers(gpkg_path) if layer not in config.excluded_layers
+            ]
+            if config.partition_by_venue:
+                zip_paths = list(IMDF_export.export_venue_archives(gpkg_path, output_folder, layers).values())
+            else:
+                zip_paths = [IMDF_export.export_imdf_archive(gpkg_path, output_folder, layers, zip_name)]
+
+        summary["zip_path"] = zip_paths[0] if len(zip_paths) == 1 else output_folder
+        summary["zip_size"] = sum(os.path.getsize(zip_path) for zip_path in zip_paths)
+        summary["features"] = export_metrics.get_metrics().get_report()["counters"].get("features", 0)
+    except Exception as e:
+        summary["error"] = f"{type(e).__name__}: {e}"
+
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+def print_progress(summary):
+    """Print the outcome of a finished run"""
+    if summary["error"]:
+        print(f"Failed {summary['gpkg_path']}")
+    else:
+        print(f"Exported {summary['gpkg_path']} to {summary['zip_path']}")
+
+def print_summary(summaries, wall_time):
+    """Print one line per run and the totals of all runs"""
+    name_width = max([len("GeoPackage")] + [len(os.path.basename(s["gpkg_path"])) for s in summaries])
+
+    print()
+    print(f"{'GeoPackage':<{name_width}}  {'status':<6} {'features':>9} {'zip MB':>8} {'seconds':>8}")
+    for summary in summaries:
+        status = "failed" if summary["error"] else "ok"
+        print(
+            f"{os.path.basename(summary['gpkg_path']):<{name_width}}  {status:<6} {summary['features']:>9} "
+            f"{summary['zip_size'] / (1024 * 1024):>8.2f} {summary['seconds']:>8.2f}"
+        )
+
+    failed = [summary for summary in summaries if summary["error"]]
+    for summary in failed:
+        print(f"Error: {summary['gpkg_path']}: {summary['error']}")
+
+    features = sum(summary["features"] for summary in summaries)
+    zip_size = sum(summary["zip_size"] for summary in summaries)
+    print(
+        f"{len(summaries) - len(failed)} exported, {len(failed)} failed: {features} features, "
+        f"{zip_size / (1024 * 1024):.2f} MB in {wall_time:.2f} s"
+    )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export GeoPackages to IMDF archives")
+    parser.add_argument("gpkg", nargs="+", help="GeoPackage files or glob patterns")
+    parser.add_argument("-o", "--output-dir", default=config.output_dir or ".",
+                        help="Folder that gets one sub folder per GeoPackage (default: config.output_dir)")
+    parser.add_argument("-j", "--jobs", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Number of GeoPackages exported at the same time")
+    parser.add_argument("--set", dest="settings", action="append", default=[], metavar="NAME=VALUE",
+                        help="Override a config value, e.g. --set reader_engine=sqlite")
+    parser.add_argument("--verbose", action="store_true", help="Show the exporter output of every run")
+    args = parser.parse_args(argv)
+
+    try:
+        settings = parse_settings(args.settings)
+    except ValueError as e:
+        parser.error(str(e))
+    for name, value in settings.items():
+        setattr(config, name, value)
+    logging.basicConfig(level=config.log_level, format="%(levelname)s: %(message)s")
+
+    gpkg_paths = expand_gpkg_paths(args.gpkg)
+    if not gpkg_paths:
+        print("Error: No GeoPackages to export")
+        return 1
+
+    runs = [
+        (gpkg_path, os.path.join(args.output_dir, run_name), f"{run_name}.zip")
+        for gpkg_path, run_name in zip(gpkg_paths, get_run_names(gpkg_paths))
+    ]
+    jobs = max(1, min(args.jobs, len(runs)))
+    print(f"Exporting {len(runs)} GeoPackage(s) with {jobs} worker(s)")
+
+    start = time.perf_counter()
+    summaries = {}
+    if jobs == 1:
+        for run in runs:
+            summaries[run[0]] = run_export(*run, args.verbose)
+            print_progress(summaries[run[0]])
+    else:
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=init_cli_worker,
+            initargs=(IMDF_export.get_config_settings(),)
+        ) as executor:
+            futures = {executor.submit(run_export, *run, args.verbose): run[0] for run in runs}
+            for future in as_completed(futures):
+                summaries[futures[future]] = future.result()
+                print_progress(summaries[futures[future]])
+
+    summaries = [summaries[run[0]] for run in runs]
+    print_summary(summaries, time.perf_counter() - start)
+    return 1 if any(summary["error"] for summary in summaries) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Stages timed per layer:
+# validate - checking the ID references of the GeoPackage before exporting (not tied to a layer)
+# read - reading the layer from the GeoPackage
+# geometry_qa - checking (and fixing) geometries and display points, see config.geometry_qa
+#               and config.display_point_check
+# junctions - reading junction tables and resolving the _ids fields of features
+# transform - turning rows into IMDF features
+# serialize - encoding features to JSON
+# write - writing the encoded bytes to zip entries (including compression) and files
+STAGES = ['validate', 'read', 'geometry_qa', 'junctions', 'transform', 'serialize', 'write']
+
+# Report file written next to the archive, {} is the archive name without extension
+REPORT_FILE_NAME = "{}.metrics.json"
+
+class ExportMetrics:
+    """
+    Stage timings and counters of an export run, per layer
+
+    Stage times are exclusive: time spent in a stage that runs inside another one (e.g.
+    reading rows while features are transformed) only counts for the inner stage.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.layers = {}
+        self._stack = []
+
+    def get_layer(self, layer):
+        """Get the metrics entry of a layer, None is the entry of work not tied to a layer"""
+        if layer not in self.layers:
+            self.layers[layer] = {"stages": dict.fromkeys(STAGES, 0.0), "counters": {}}
+        return self.layers[layer]
+
+    def add_time(self, layer, stage, seconds):
+        """Add time to a stage of a layer"""
+        stages = self.get_layer(layer)["stages"]
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+    def count(self, layer, counter, value=1):
+        """Increase a counter of a layer"""
+        counters = self.get_layer(layer)["counters"]
+        counters[counter] = counters.get(counter, 0) + value
+
+    def start(self):
+        """Start timing a stage, returns the token to pass to stop()"""
+        frame = [time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        return frame
+
+    def stop(self, frame, layer, stage):
+        """Stop timing a stage, the time of stages nested in it is left out"""
+        elapsed = time.perf_counter() - frame[0]
+        self._stack.pop()
+        if self._stack:
+            self._stack[-1][1] += elapsed
+        self.add_time(layer, stage, elapsed - frame[1])
+
+    def merge(self, snapshot):
+        """Add the metrics of another process (a snapshot() of its ExportMetrics)"""
+        for layer, entry in snapshot.items():
+            layer = None if layer == "" else layer
+            for stage, seconds in entry["stages"].items():
+                self.add_time(layer, stage, seconds)
+            for counter, value in entry["counters"].items():
+                self.count(layer, counter, value)
+
+    def snapshot(self):
+        """Get the per layer metrics in a JSON and pickle friendly form"""
+        return {
+            "" if layer is None else layer: {
+                "stages": dict(entry["stages"]),
+                "counters": dict(entry["counters"])
+            }
+            for layer, entry in self.layers.items()
+        }
+
+    def get_report(self):
+        """Build the metrics report: totals per stage and counter, plus the metrics of every layer"""
+        stage_totals = dict.fromkeys(STAGES, 0.0)
+        counter_totals = {}
+        for entry in self.layers.values():
+            for stage, seconds in entry["stages"].items():
+                stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+            for counter, value in entry["counters"].items():
+                counter_totals[counter] = counter_totals.get(counter, 0) + value
+
+        return {
+            "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "wall_time": round(time.perf_counter() - self.started, 6),
+            "stages": {stage: round(seconds, 6) for stage, seconds in stage_totals.items()},
+            "counters": counter_totals,
+            "layers": {
+                layer: {
+                    "stages": {stage: round(seconds, 6) for stage, seconds in entry["stages"].items()},
+                    **entry["counters"]
+                }
+                for layer, entry in self.layers.items() if layer is not None
+            }
+        }
+
+_metrics = ExportMetrics()
+
+def reset():
+    """Start a new run, dropping all metrics collected so far"""
+    global _metrics
+    _metrics = ExportMetrics()
+
+def get_metrics():
+    """Get the metrics of the current run"""
+    return _metrics
+
+def count(layer, counter, value=1):
+    """Increase a counter of a layer in the current run"""
+    _metrics.count(layer, counter, value)
+
+def get_count(layer, counter):
+    """Get a counter of a layer in the current run"""
+    return _metrics.get_layer(layer)["counters"].get(counter, 0)
+
+@contextmanager
+def stage(name, layer=None):
+    """Time the enclosed block as a stage of a layer"""
+    frame = _metrics.start()
+    try:
+        yield
+    finally:
+        _metrics.stop(frame, layer, name)
+
+def timed(iterable, name, layer=None, counter=None):
+    """Yield from iterable, timing each step as a stage and counting the items in counter"""
+    metrics = _metrics
+    iterator = iter(iterable)
+    items = 0
+    try:
+        while True:
+            frame = metrics.start()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                metrics.stop(frame, layer, name)
+            items += 1
+            yield item
+    finally:
+        if counter:
+            metrics.count(layer, counter, items)
+
+class TimedWriter:
+    """Binary writer that times its writes as the write stage and counts the bytes written"""
+
+    def __init__(self, f, layer=None):
+        self.f = f
+        self.layer = layer
+        self.bytes_written = 0
+
+    def write(self, data):
+        frame = _metrics.start()
+        try:
+            self.f.write(data)
+        finally:
+            _metrics.stop(frame, self.layer, 'write')
+        self.bytes_written += len(data)
+        return len(data)
+
+def write_report(output_folder, zip_name):
+    """Write the metrics report of the current run next to the archive, returns its path"""
+    report_path = os.path.join(output_folder, REPORT_FILE_NAME.format(os.path.splitext(zip_name)[0]))
+    report = _metrics.get_report()
+    report["archive"] = zip_name
+
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    return report_path
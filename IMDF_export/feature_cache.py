@@ -0,0 +1,132 @@
+import hashlib
+import os
+import sqlite3
+import time
+import export_cache
+
+FEATURE_CACHE_FILE_NAME = "features.sqlite"
+
+# Keys looked up with one query
+LOOKUP_BATCH_SIZE = 500
+# New entries kept in memory before they are written
+WRITE_BATCH_SIZE = 10000
+
+# The size and last use of an entry live in their own small rows, so marking
+# thousands of cache hits as used does not rewrite the encoded features
+CREATE_TABLES_SQL = """
+    CREATE TABLE IF NOT EXISTS features (
+        id INTEGER PRIMARY KEY,
+        key BLOB NOT NULL UNIQUE,
+        data BLOB NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS feature_use (
+        id INTEGER PRIMARY KEY,
+        size INTEGER NOT NULL,
+        last_used INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS feature_use_last_used ON feature_use (last_used);
+"""
+
+def get_cache_path(output_folder):
+    """Get the path of the feature cache database of an output directory"""
+    return os.path.join(export_cache.get_cache_folder(output_folder), FEATURE_CACHE_FILE_NAME)
+
+def get_key_prefix(settings_hash, layer, column_plan):
+    """
+    Start the feature keys of a layer with the export settings hash, the layer name and the
+    column plan, so that renamed, reordered or retyped columns do not match old entries
+    """
+    return hashlib.sha256(f"{settings_hash}\0{layer}\0{list(column_plan.items())!r}\0".encode("utf-8"))
+
+def get_feature_key(key_prefix, row, junction_ids):
+    """Key a feature by its raw row (attribute values and geometry blob) and its resolved junction IDs"""
+    key = key_prefix.copy()
+    key.update(repr((tuple(row), junction_ids)).encode("utf-8"))
+    return key.digest()
+
+class FeatureCache:
+    """
+    Persistent cache of encoded features in a SQLite database
+
+    New entries and the use of cached ones are collected in memory and written in batches.
+    close() writes the rest and removes the least recently used entries until the cache is
+    no larger than max_bytes.
+    """
+
+    def __init__(self, path, max_bytes):
+        self.max_bytes = max_bytes
+        # Parallel export workers share the database
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        # Read cached features straight from the mapped file
+        self.conn.execute(f"PRAGMA mmap_size = {max_bytes * 2}")
+        self.conn.executescript(CREATE_TABLES_SQL)
+        self.used_ids = []
+        self.new_entries = {}
+
+    def get_many(self, keys):
+        """Get key -> encoded feature of the keys that are cached"""
+        found = {}
+        for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+            batch = keys[start:start + LOOKUP_BATCH_SIZE]
+            placeholders = ", ".join("?" * len(batch))
+            for entry_id, key, data in self.conn.execute(
+                f"SELECT id, key, data FROM features WHERE key IN ({placeholders})", batch
+            ):
+                found[key] = data
+                self.used_ids.append(entry_id)
+        return found
+
+    def put(self, key, data):
+        """Add an encoded feature, new features are written in batches"""
+        self.new_entries[key] = data
+        if len(self.new_entries) >= WRITE_BATCH_SIZE:
+            self.write(evict=False)
+
+    def write(self, evict=True):
+        """Write the new entries and the last use of the cached ones in one transaction"""
+        now = time.time_ns()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                "UPDATE feature_use SET last_used = ? WHERE id = ?", ((now, entry_id) for entry_id in sorted(self.used_ids))
+            )
+            # Another export worker may have added the same feature in the meantime
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO features (key, data) VALUES (?, ?)", self.new_entries.items()
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO feature_use (id, size, last_used) SELECT id, length(data), ? FROM features WHERE key = ?",
+                ((now, key) for key in self.new_entries)
+            )
+            if evict:
+                self.evict()
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.used_ids = []
+        self.new_entries = {}
+
+    def close(self):
+        """Write what is left, evict down to max_bytes and close the database"""
+        try:
+            self.write()
+        finally:
+            self.conn.close()
+
+    def evict(self):
+        """Delete the least recently used entries until the cache is no larger than max_bytes"""
+        excess = (self.conn.execute("SELECT SUM(size) FROM feature_use").fetchone()[0] or 0) - self.max_bytes
+        if excess <= 0:
+            return
+
+        evicted = []
+        for entry_id, size in self.conn.execute("SELECT id, size FROM feature_use ORDER BY last_used, id"):
+            evicted.append((entry_id,))
+            excess -= size
+            if excess <= 0:
+                break
+        self.conn.executemany("DELETE FROM features WHERE id = ?", evicted)
+        self.conn.executemany("DELETE FROM feature_use WHERE id = ?", evicted)
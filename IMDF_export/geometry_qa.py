@@ -0,0 +1,249 @@
+import config
+import export_metrics
+from shared_schema import gpkg_layers_config
+
+try:
+    import numpy as np
+    import shapely
+except ImportError:
+    np = shapely = None
+
+# gpkg_layers_config geometry names (QGIS WKB type strings) -> shapely type id
+DECLARED_TYPE_IDS = {
+    'point': 0,
+    'string': 1,
+    'linestring': 1,
+    'polygon': 3,
+    'multipoint': 4,
+    'multilinestring': 5,
+    'multipolygon': 6
+}
+
+# Rows checked at once by the "sqlite" reader engine, which streams rows one by one
+QA_CHUNK_SIZE = 10000
+
+# Decimals of computed display points, like the display_point default expression in GPKG_setup.py
+DISPLAY_POINT_PRECISION = 7
+# Distance (in degrees) an existing display point may be off its geometry through rounding
+DISPLAY_POINT_TOLERANCE = 10 ** -DISPLAY_POINT_PRECISION
+
+# Single part type id -> multi part type id
+MULTI_TYPE_IDS = {0: 4, 1: 5, 3: 6}
+
+# Problems "fix" mode leaves in place
+UNFIXABLE_PROBLEMS = ["cannot be made valid", "type cannot be converted"]
+
+GEOMETRY_TYPE_NAMES = {
+    0: 'Point', 1: 'LineString', 2: 'LinearRing', 3: 'Polygon', 4: 'MultiPoint',
+    5: 'MultiLineString', 6: 'MultiPolygon', 7: 'GeometryCollection'
+}
+
+def get_declared_type_id(feature_type):
+    """Get the shapely type id of the geometry declared in gpkg_layers_config, None if there is none"""
+    geometry = gpkg_layers_config.get(feature_type, {}).get('geometry', 'None')
+    return DECLARED_TYPE_IDS.get(geometry.lower())
+
+def is_geometry_qa_enabled():
+    """Check config.geometry_qa, raises if it needs shapely and shapely is missing or too old"""
+    if config.geometry_qa == "off":
+        return False
+    if config.geometry_qa not in ("report", "fix"):
+        raise ValueError(f"Unknown geometry QA mode '{config.geometry_qa}', expected 'report', 'fix' or 'off'")
+    if shapely is None or not hasattr(shapely, 'orient_polygons'):
+        raise ImportError("Geometry QA needs shapely 2.1 or newer, set config.geometry_qa to 'off'")
+    return True
+
+def check_geometries(geometries, ids, feature_type):
+    """
+    Check an array of shapely geometries of a layer for invalid geometries, rings that do not
+    follow the RFC 7946 right-hand rule and geometry types that differ from gpkg_layers_config
+
+    Every check runs on the whole array at once. Problems are printed per feature and counted
+    in the export metrics. In "fix" mode invalid geometries are made valid, single/multi part
+    types are converted to the declared type and rings are reoriented; returns the array with
+    the fixed geometries, the geometries are returned unchanged in "report" mode.
+    """
+    geometries = np.array(geometries, dtype=object)
+    fix = config.geometry_qa == "fix"
+    present = ~shapely.is_missing(geometries) & ~shapely.is_empty(geometries)
+    problems = {}
+
+    with export_metrics.stage('geometry_qa', feature_type):
+        invalid = present & ~shapely.is_valid(geometries)
+        for index, reason in zip(np.flatnonzero(invalid), shapely.is_valid_reason(geometries[invalid])):
+            problems.setdefault(index, []).append(f"invalid ({reason})")
+        if fix and invalid.any():
+            repaired = shapely.make_valid(geometries[invalid], method='structure', keep_collapsed=False)
+            # A geometry that collapses completely cannot be repaired, it is kept as it is
+            collapsed = shapely.is_empty(repaired)
+            geometries[np.flatnonzero(invalid)[~collapsed]] = repaired[~collapsed]
+            for index in np.flatnonzero(invalid)[collapsed]:
+                problems[index].append("cannot be made valid")
+
+        declared_type_id = get_declared_type_id(feature_type)
+        if declared_type_id is not None:
+            geometries = check_geometry_types(geometries, present, declared_type_id, fix, problems)
+
+        # Exterior rings counterclockwise, holes clockwise
+        polygonal = present & np.isin(shapely.get_type_id(geometries), [3, 6])
+        oriented = shapely.orient_polygons(geometries[polygonal], exterior_cw=False)
+        misoriented = ~shapely.equals_exact(geometries[polygonal], oriented, tolerance=0)
+        for index in np.flatnonzero(polygonal)[misoriented]:
+            problems.setdefault(index, []).append("rings do not follow the right-hand rule")
+        if fix:
+            geometries[np.flatnonzero(polygonal)[misoriented]] = oriented[misoriented]
+
+        export_metrics.count(feature_type, 'invalid_geometries', int(invalid.sum()))
+        export_metrics.count(feature_type, 'misoriented_geometries', int(misoriented.sum()))
+
+    for index in sorted(problems):
+        if not fix:
+            label = "Geometry problem"
+        elif any(problem in UNFIXABLE_PROBLEMS for problem in problems[index]):
+            label = "Geometry problem (not fixed)"
+        else:
+            label = "Fixed geometry"
+        print(f"{label}: {feature_type} {ids[index]}: {', '.join(problems[index])}")
+    if problems:
+        export_metrics.count(feature_type, 'geometry_problems', len(problems))
+    return geometries
+
+def check_geometry_types(geometries, present, declared_type_id, fix, problems):
+    """Report (and in fix mode convert) geometries whose type differs from the declared type"""
+    type_ids = shapely.get_type_id(geometries)
+    mismatched = present & (type_ids != declared_type_id)
+    if not mismatched.any():
+        return geometries
+
+    declared_name = GEOMETRY_TYPE_NAMES[declared_type_id]
+    for index in np.flatnonzero(mismatched):
+        problems.setdefault(index, []).append(f"{GEOMETRY_TYPE_NAMES.get(type_ids[index])} instead of {declared_name}")
+
+    if not fix:
+        return geometries
+
+    # Single part geometries of a multi part layer become one part collections
+    to_multi = mismatched & np.array([MULTI_TYPE_IDS.get(type_id) == declared_type_id for type_id in type_ids])
+    if to_multi.any():
+        indices = np.arange(int(to_multi.sum()))
+        if declared_type_id == 6:
+            geometries[to_multi] = shapely.multipolygons(geometries[to_multi], indices=indices)
+        elif declared_type_id == 5:
+            geometries[to_multi] = shapely.multilinestrings(geometries[to_multi], indices=indices)
+        else:
+            geometries[to_multi] = shapely.multipoints(geometries[to_multi], indices=indices)
+
+    # One part collections of a single part layer become that part
+    to_single = mismatched & (type_ids == MULTI_TYPE_IDS.get(declared_type_id, -1))
+    to_single &= shapely.get_num_geometries(geometries) == 1
+    if to_single.any():
+        geometries[to_single] = shapely.get_geometry(geometries[to_single], 0)
+
+    for index in np.flatnonzero(mismatched & ~to_multi & ~to_single):
+        problems[index].append("type cannot be converted")
+    return geometries
+
+def is_display_point_check_enabled():
+    """Check config.display_point_check, raises if it needs shapely and shapely is missing or too old"""
+    if config.display_point_check == "off":
+        return False
+    if config.display_point_check not in ("fill", "fix"):
+        raise ValueError(
+            f"Unknown display point check '{config.display_point_check}', expected 'fill', 'fix' or 'off'"
+        )
+    if shapely is None or not hasattr(shapely, 'dwithin'):
+        raise ImportError("Checking display points needs shapely 2.1 or newer, set config.display_point_check to 'off'")
+    return True
+
+def parse_display_point(value):
+    """Parse a "lat, lon" display_point string into (lat, lon), None if it is missing or malformed"""
+    if not isinstance(value, str):
+        return None
+    try:
+        lat_str, lon_str = value.split(',')
+        return float(lat_str), float(lon_str)
+    except ValueError:
+        return None
+
+def check_display_points(values, geometries, ids, feature_type):
+    """
+    Fill in missing display points of a layer and find the ones that lie outside their geometry
+
+    values are the "lat, lon" display_point strings of the features and geometries their
+    shapely geometries. Missing points are computed with point_on_surface for all features at
+    once, like the display_point default expression in GPKG_setup.py, and every existing point
+    is tested against its own geometry in one call. In "fix" mode points outside their geometry
+    are computed again. Returns the new display_point strings.
+    """
+    values = list(values)
+    geometries = np.asarray(geometries, dtype=object)
+    present = ~shapely.is_missing(geometries) & ~shapely.is_empty(geometries)
+
+    with export_metrics.stage('geometry_qa', feature_type):
+        coordinates = np.full((len(values), 2), np.nan)
+        for index, value in enumerate(values):
+            point = parse_display_point(value)
+            if point is not None:
+                coordinates[index] = point
+
+        missing = present & np.isnan(coordinates[:, 0])
+        existing = np.flatnonzero(present & ~missing)
+        # Stored points are rounded, so a point on a line or boundary may be a rounding step off it
+        points = shapely.points(coordinates[existing, 1], coordinates[existing, 0])
+        inside = shapely.dwithin(geometries[existing], points, DISPLAY_POINT_TOLERANCE)
+        outside = existing[~inside]
+
+        for index in outside:
+            print(f"Display point outside its geometry: {feature_type} {ids[index]}: {values[index]}")
+
+        recompute = np.flatnonzero(missing)
+        if config.display_point_check == "fix":
+            recompute = np.union1d(recompute, outside)
+        computed = shapely.point_on_surface(geometries[recompute])
+        for index, lon, lat in zip(recompute, shapely.get_x(computed), shapely.get_y(computed)):
+            values[index] = f"{round(float(lat), DISPLAY_POINT_PRECISION)}, {round(float(lon), DISPLAY_POINT_PRECISION)}"
+
+        export_metrics.count(feature_type, 'display_points_computed', len(recompute))
+        export_metrics.count(feature_type, 'display_points_outside', len(outside))
+
+    if missing.any():
+        print(f"Computed {int(missing.sum())} missing display point(s) of layer {feature_type}")
+    return values
+
+def check_row_geometries(rows, feature_type, round_geometries, chunk_size=QA_CHUNK_SIZE):
+    """
+    Run the geometry QA and display point check on streamed layer rows in chunks of chunk_size rows
+
+    rows are (row dict, WKB) pairs as gpkg_reader.read_rows_with_wkb yields them, round_geometries
+    rounds an array of shapely geometries like the other reader engines do. Only the geometries
+    and display points that changed are replaced in the rows, which are yielded as dicts.
+    """
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield from check_chunk(chunk, feature_type, round_geometries)
+            chunk = []
+    yield from check_chunk(chunk, feature_type, round_geometries)
+
+def check_chunk(rows, feature_type, round_geometries):
+    """Check the geometries and display points of a list of (row dict, WKB) pairs at once"""
+    if not rows:
+        return []
+    # All WKB geometries of the chunk are parsed in one call
+    geometries = round_geometries(shapely.from_wkb(np.array([wkb for _, wkb in rows], dtype=object)))
+    rows = [row_dict for row_dict, _ in rows]
+    ids = [row.get('id') for row in rows]
+
+    if is_geometry_qa_enabled():
+        checked = check_geometries(geometries, ids, feature_type)
+        for index, (geometry, checked_geometry) in enumerate(zip(geometries, checked)):
+            if checked_geometry is not geometry:
+                rows[index]['geometry'] = checked_geometry.__geo_interface__
+        geometries = checked
+
+    if 'display_point' in rows[0] and is_display_point_check_enabled():
+        display_points = check_display_points([row['display_point'] for row in rows], geometries, ids, feature_type)
+        for row_dict, display_point in zip(rows, display_points):
+            row_dict['display_point'] = display_point
+    return rows
@@ -0,0 +1,379 @@
+import hashlib
+import sqlite3
+import struct
+from contextlib import closing
+from datetime import date, datetime
+from pathlib import Path
+
+try:
+    import numpy
+except ImportError:
+    # Only used to round coordinates, plain Python rounding is used without it
+    numpy = None
+
+# Envelope indicator (flags bits 1-3) -> envelope size in bytes
+ENVELOPE_SIZES = {0: 0, 1: 32, 2: 48, 3: 48, 4: 64}
+
+GEOMETRY_TYPES = {
+    1: 'Point',
+    2: 'LineString',
+    3: 'Polygon',
+    4: 'MultiPoint',
+    5: 'MultiLineString',
+    6: 'MultiPolygon',
+    7: 'GeometryCollection'
+}
+
+def connect(gpkg_path):
+    """Open a GeoPackage read-only"""
+    uri = Path(gpkg_path).resolve().as_uri() + "?mode=ro"
+    return sqlite3.connect(uri, uri=True)
+
+def list_layers(gpkg_path):
+    """List feature and attribute tables registered in gpkg_contents, in the same order as OGR"""
+    with closing(connect(gpkg_path)) as conn:
+        rows = conn.execute(
+            "SELECT table_name FROM gpkg_contents "
+            "WHERE data_type IN ('features', 'attributes') "
+            "ORDER BY data_type = 'attributes', rowid"
+        ).fetchall()
+    return [row[0] for row in rows]
+
+def get_table_schema(conn, table_name):
+    """Get (fid column, geometry column, [(column, declared type), ...]) of a table"""
+    columns = conn.execute(f'PRAGMA table_info("{table_name}")').fetchall()
+    if not columns:
+        raise ValueError(f"Table '{table_name}' does not exist")
+
+    geometry_row = conn.execute(
+        "SELECT column_name FROM gpkg_geometry_columns WHERE table_name = ?", (table_name,)
+    ).fetchone()
+    geometry_column = geometry_row[0] if geometry_row else None
+
+    # Mirror OGR: the integer primary key is the feature ID, not an attribute
+    fid_column = None
+    attributes = []
+    for _, name, declared_type, _, _, pk in columns:
+        if pk and declared_type.upper() == 'INTEGER' and fid_column is None:
+            fid_column = name
+        elif name != geometry_column:
+            attributes.append((name, declared_type.upper()))
+
+    return fid_column, geometry_column, attributes
+
+def get_column_metadata(gpkg_path, table_name):
+    """
+    Get the declared types of the attribute columns of a table and their gpkg_data_columns rows
+
+    Returns ({column: declared type}, {column: {'mime_type': ..., 'constraint_name': ...}}).
+    """
+    with closing(connect(gpkg_path)) as conn:
+        _, _, attributes = get_table_schema(conn, table_name)
+        try:
+            rows = conn.execute(
+                "SELECT column_name, mime_type, constraint_name FROM gpkg_data_columns WHERE table_name = ?",
+                (table_name,)
+            ).fetchall()
+        except sqlite3.OperationalError:
+            # gpkg_data_columns is an optional extension table
+            rows = []
+
+    data_columns = {
+        column: {'mime_type': mime_type, 'constraint_name': constraint_name}
+        for column, mime_type, constraint_name in rows
+    }
+    return dict(attributes), data_columns
+
+def parse_datetime(value):
+    """Parse a GeoPackage DATETIME string (ISO 8601, usually with a 'Z' suffix)"""
+    if not isinstance(value, str):
+        return value
+    try:
+        if value.endswith('Z'):
+            value = value[:-1] + '+00:00'
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return value
+
+def parse_date(value):
+    """Parse a GeoPackage DATE string"""
+    if not isinstance(value, str):
+        return value
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return value
+
+def get_converter(declared_type):
+    """Get the value converter for a declared GeoPackage column type, None if values are used as-is"""
+    if declared_type == 'BOOLEAN':
+        return lambda value: value if value is None else bool(value)
+    if declared_type == 'DATETIME':
+        return parse_datetime
+    if declared_type == 'DATE':
+        return parse_date
+    return None
+
+def read_rows(gpkg_path, layer, precision=None, drop_repeated=False):
+    """
+    Yield the features of a layer as dicts of attributes plus a GeoJSON 'geometry'
+
+    Coordinates are rounded to precision decimals if it is given, see read_coordinates.
+    """
+    with closing(connect(gpkg_path)) as conn:
+        sql, _, decode_row = prepare_row_query(conn, layer, precision, drop_repeated)
+        for row in conn.execute(sql):
+            yield decode_row(row)
+
+def read_rows_with_wkb(gpkg_path, layer, precision=None, drop_repeated=False):
+    """Yield (read_rows dict, WKB of the geometry or None) pairs of a layer, for checks that parse WKB in bulk"""
+    with closing(connect(gpkg_path)) as conn:
+        sql, names, decode_row = prepare_row_query(conn, layer, precision, drop_repeated)
+        for row in conn.execute(sql):
+            yield decode_row(row), get_wkb(row[-1]) if len(row) > len(names) else None
+
+def prepare_row_query(conn, layer, precision=None, drop_repeated=False):
+    """
+    Get (SELECT statement, attribute names, decode_row) for reading a layer in fid order
+
+    The statement selects the attributes followed by the geometry blob (if the layer has a
+    geometry column), decode_row turns one of its raw rows into a read_rows dict.
+    """
+    fid_column, geometry_column, attributes = get_table_schema(conn, layer)
+
+    names = [name for name, _ in attributes]
+    converters = [(i, get_converter(declared_type)) for i, (_, declared_type) in enumerate(attributes)]
+    converters = [(i, converter) for i, converter in converters if converter]
+
+    select = [f'"{name}"' for name in names]
+    if geometry_column:
+        select.append(f'"{geometry_column}"')
+    order_by = f' ORDER BY "{fid_column}"' if fid_column else ''
+    sql = f'SELECT {", ".join(select) or "NULL"} FROM "{layer}"{order_by}'
+
+    def decode_row(row):
+        values = list(row[:len(names)])
+        for i, converter in converters:
+            values[i] = converter(values[i])
+
+        row_dict = dict(zip(names, values))
+        row_dict['geometry'] = decode_gpkg_geometry(row[-1], precision, drop_repeated) if geometry_column else None
+        return row_dict
+
+    return sql, names, decode_row
+
+def get_fid_batches(gpkg_path, table, batch_size):
+    """
+    Split a table into batches of batch_size rows in fid order
+
+    Returns (fid column, [(first fid, last fid), ...]), the fid column is None if the table
+    has no integer primary key.
+    """
+    with closing(connect(gpkg_path)) as conn:
+        fid_column, _, _ = get_table_schema(conn, table)
+        if fid_column is None:
+            return None, []
+
+        batches = []
+        first_fid = last_fid = None
+        for i, (fid,) in enumerate(conn.execute(f'SELECT "{fid_column}" FROM "{table}" ORDER BY "{fid_column}"')):
+            if i % batch_size == 0:
+                if first_fid is not None:
+                    batches.append((first_fid, last_fid))
+                first_fid = fid
+            last_fid = fid
+        if first_fid is not None:
+            batches.append((first_fid, last_fid))
+
+    return fid_column, batches
+
+def count_rows(gpkg_path, table):
+    """Count the rows of a table"""
+    with closing(connect(gpkg_path)) as conn:
+        return conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+
+def get_table_fingerprint(gpkg_path, table):
+    """Get gpkg_contents.last_change, the row count and a content hash of a table"""
+    with closing(connect(gpkg_path)) as conn:
+        last_change = conn.execute(
+            "SELECT last_change FROM gpkg_contents WHERE table_name = ?", (table,)
+        ).fetchone()
+
+        content_hash = hashlib.sha256()
+        row_count = 0
+        for row in conn.execute(f'SELECT * FROM "{table}" ORDER BY rowid'):
+            content_hash.update(repr(row).encode("utf-8"))
+            row_count += 1
+
+    return {
+        "last_change": last_change[0] if last_change else None,
+        "row_count": row_count,
+        "content_hash": content_hash.hexdigest()
+    }
+
+def read_columns(gpkg_path, table, columns):
+    """Yield tuples of the raw values of the given columns of a table"""
+    select = ", ".join(f'"{column}"' for column in columns)
+    with closing(connect(gpkg_path)) as conn:
+        yield from conn.execute(f'SELECT {select} FROM "{table}"')
+
+def parse_gpkg_header(view):
+    """Parse a GeoPackage binary header, returns (srs_id, is_empty, WKB offset)"""
+    if view[0] != 0x47 or view[1] != 0x50:  # 'GP'
+        raise ValueError("Not a GeoPackage geometry blob")
+
+    flags = view[3]
+    byte_order = '<' if flags & 0x01 else '>'
+    envelope_indicator = (flags >> 1) & 0x07
+    is_empty = bool(flags & 0x10)
+
+    if envelope_indicator not in ENVELOPE_SIZES:
+        raise ValueError(f"Invalid envelope indicator {envelope_indicator}")
+
+    srs_id = struct.unpack_from(f'{byte_order}i', view, 4)[0]
+    return srs_id, is_empty, 8 + ENVELOPE_SIZES[envelope_indicator]
+
+def decode_gpkg_geometry(blob, precision=None, drop_repeated=False):
+    """Decode a GeoPackage geometry blob into a GeoJSON geometry dict, None for NULL or empty geometries"""
+    if blob is None:
+        return None
+
+    view = memoryview(blob)
+    _, is_empty, offset = parse_gpkg_header(view)
+    if is_empty:
+        return None
+
+    geometry, _ = decode_wkb(view, offset, precision, drop_repeated)
+    return geometry if not is_empty_geometry(geometry) else None
+
+def get_wkb(blob):
+    """Get the WKB of a GeoPackage geometry blob, None for NULL or empty geometries"""
+    if blob is None:
+        return None
+    view = memoryview(blob)
+    _, is_empty, offset = parse_gpkg_header(view)
+    return None if is_empty else bytes(view[offset:])
+
+def is_empty_geometry(geometry):
+    """Check if a decoded geometry has no coordinates"""
+    if geometry['type'] == 'GeometryCollection':
+        return len(geometry['geometries']) == 0
+    return len(geometry['coordinates']) == 0
+
+def read_wkb_type(view, offset):
+    """Read the byte order, geometry type and coordinate layout of a WKB geometry"""
+    byte_order = '<' if view[offset] == 1 else '>'
+    type_code = struct.unpack_from(f'{byte_order}I', view, offset + 1)[0]
+
+    # EWKB flags
+    has_z = bool(type_code & 0x80000000)
+    has_m = bool(type_code & 0x40000000)
+    type_code &= 0x0FFFFFFF
+
+    # ISO WKB: 1000 = Z, 2000 = M, 3000 = ZM
+    dimension_code, base_type = divmod(type_code, 1000)
+    has_z = has_z or dimension_code in (1, 3)
+    has_m = has_m or dimension_code in (2, 3)
+
+    if base_type not in GEOMETRY_TYPES:
+        raise ValueError(f"Unsupported WKB geometry type {type_code}")
+
+    return byte_order, base_type, 2 + has_z + has_m, has_z, offset + 5
+
+def read_coordinates(view, offset, byte_order, count, dimensions, has_z, precision=None, drop_repeated=False, min_points=2):
+    """
+    Read count points in one unpack call, returns (list of coordinate tuples, new offset)
+
+    With precision the whole coordinate array is rounded to that many decimals at once, and
+    with drop_repeated consecutive points that became equal are dropped unless fewer than
+    min_points would be left.
+    """
+    if precision is not None and numpy is not None:
+        return read_rounded_coordinates(
+            view, offset, byte_order, count, dimensions, has_z, precision, drop_repeated, min_points
+        )
+
+    values = struct.unpack_from(f'{byte_order}{count * dimensions}d', view, offset)
+    offset += 8 * count * dimensions
+
+    if precision is not None:
+        # Same rounding as numpy.round, so both give identical coordinates. NaN (the
+        # coordinates of empty points) cannot be rounded and stays NaN, as with numpy.round
+        scale = 10.0 ** precision
+        values = [round(value * scale) / scale if value == value else value for value in values]
+
+    xs = values[0::dimensions]
+    ys = values[1::dimensions]
+    if has_z:
+        points = list(zip(xs, ys, values[2::dimensions]))
+    else:
+        points = list(zip(xs, ys))
+
+    if drop_repeated and precision is not None:
+        kept_points = [point for i, point in enumerate(points) if i == 0 or point != points[i - 1]]
+        if len(kept_points) >= min_points:
+            points = kept_points
+    return points, offset
+
+def read_rounded_coordinates(view, offset, byte_order, count, dimensions, has_z, precision, drop_repeated, min_points):
+    """NumPy version of read_coordinates with rounding"""
+    values = numpy.frombuffer(view, dtype=f'{byte_order}f8', count=count * dimensions, offset=offset)
+    offset += 8 * count * dimensions
+
+    # M values are not exported
+    values = values.reshape(count, dimensions)[:, :3 if has_z else 2].round(precision)
+
+    if drop_repeated and count > 1:
+        keep = numpy.ones(count, dtype=bool)
+        keep[1:] = (values[1:] != values[:-1]).any(axis=1)
+        if keep.sum() >= min_points:
+            values = values[keep]
+
+    return list(map(tuple, values.tolist())), offset
+
+def read_count(view, offset, byte_order):
+    """Read a WKB point, ring or part count"""
+    return struct.unpack_from(f'{byte_order}I', view, offset)[0], offset + 4
+
+def decode_wkb(view, offset=0, precision=None, drop_repeated=False):
+    """Decode a WKB geometry into a GeoJSON geometry dict, returns (geometry, new offset)"""
+    byte_order, base_type, dimensions, has_z, offset = read_wkb_type(view, offset)
+    geometry_type = GEOMETRY_TYPES[base_type]
+
+    if base_type == 1:
+        points, offset = read_coordinates(view, offset, byte_order, 1, dimensions, has_z, precision)
+        point = points[0]
+        # Empty points are encoded with NaN coordinates
+        coordinates = () if point[0] != point[0] else point
+        return {"type": geometry_type, "coordinates": coordinates}, offset
+
+    if base_type == 2:
+        count, offset = read_count(view, offset, byte_order)
+        points, offset = read_coordinates(
+            view, offset, byte_order, count, dimensions, has_z, precision, drop_repeated
+        )
+        return {"type": geometry_type, "coordinates": points}, offset
+
+    if base_type == 3:
+        ring_count, offset = read_count(view, offset, byte_order)
+        rings = []
+        for _ in range(ring_count):
+            count, offset = read_count(view, offset, byte_order)
+            # A linear ring needs at least 4 points
+            points, offset = read_coordinates(
+                view, offset, byte_order, count, dimensions, has_z, precision, drop_repeated, 4
+            )
+            rings.append(points)
+        return {"type": geometry_type, "coordinates": rings}, offset
+
+    # Multi geometries and collections hold complete WKB geometries
+    part_count, offset = read_count(view, offset, byte_order)
+    parts = []
+    for _ in range(part_count):
+        part, offset = decode_wkb(view, offset, precision, drop_repeated)
+        parts.append(part)
+
+    if base_type == 7:
+        return {"type": geometry_type, "geometries": parts}, offset
+
+    return {"type": geometry_type, "coordinates": [part['coordinates'] for part in parts]}, offset
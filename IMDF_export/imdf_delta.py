@@ -0,0 +1,178 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+import zipfile
+from datetime import datetime, timezone
+import config
+import IMDF_export
+# shared_schema (imported by IMDF_export) makes the GPKG_create scripts importable
+from imdf_import import iter_layer_features
+from domain_loader import get_file_hash
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DELTA_FILE_NAME = "delta.json"
+DELTA_VERSION = 1
+
+def encode_canonical(feature):
+    """Encode a feature as compact JSON with sorted keys, so equal features give equal bytes"""
+    if orjson is not None:
+        return orjson.dumps(feature, default=IMDF_export.encode_json_fallback, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(
+        feature, default=IMDF_export.encode_json_fallback, ensure_ascii=False, sort_keys=True, separators=(',', ':')
+    ).encode('utf-8')
+
+def get_feature_hash(encoded_feature):
+    """Hash the canonical encoding of a feature"""
+    return hashlib.sha256(encoded_feature).digest()
+
+def iter_archive_layers(zip_path):
+    """Yield (feature type, feature iterator) for every layer file of an IMDF archive"""
+    with zipfile.ZipFile(zip_path) as zipf:
+        for entry_name in zipf.namelist():
+            name, extension = os.path.splitext(os.path.basename(entry_name))
+            if extension == '.geojson':
+                yield name, iter_layer_features(zipf, entry_name)
+
+def iter_gpkg_layers(gpkg_path):
+    """Yield (feature type, feature iterator) for every exported layer of a GeoPackage, as the exporter builds them"""
+    layers = [layer for layer in IMDF_export.list_layers(gpkg_path) if layer not in config.excluded_layers]
+    junction_index = IMDF_export.load_junction_index(gpkg_path)
+    for layer in layers:
+        features = IMDF_export.read_layer_features(gpkg_path, layer, junction_index)
+        yield layer, features if features is not None else iter(())
+
+def iter_source_layers(path):
+    """Yield the layers of an IMDF archive (.zip) or of a GeoPackage"""
+    if path.lower().endswith('.zip'):
+        return iter_archive_layers(path)
+    return iter_gpkg_layers(path)
+
+def read_feature_hashes(path):
+    """Get feature type -> feature ID -> content hash of every feature of an archive or GeoPackage"""
+    hashes = {}
+    for feature_type, features in iter_source_layers(path):
+        layer_hashes = hashes.setdefault(feature_type, {})
+        for feature in features:
+            layer_hashes[feature.get('id')] = get_feature_hash(encode_canonical(feature))
+    return hashes
+
+def compute_delta(previous_path, current_path):
+    """
+    Compare the features of two revisions of a venue by feature ID
+
+    previous_path and current_path are IMDF archives or GeoPackages. Only the hashes of the
+    previous features are kept in memory and every current feature is hashed and looked up
+    once, so the comparison is linear in the number of features. Returns feature type ->
+    {'added': [...], 'modified': [...], 'removed': [...]}, the added and modified features
+    as canonical JSON bytes and the removed ones as IDs. Unchanged types are left out.
+    """
+    previous_hashes = read_feature_hashes(previous_path)
+    delta = {}
+
+    for feature_type, features in iter_source_layers(current_path):
+        layer_hashes = previous_hashes.pop(feature_type, {})
+        changes = {'added': [], 'modified': [], 'removed': []}
+        for feature in features:
+            encoded = encode_canonical(feature)
+            previous_hash = layer_hashes.pop(feature.get('id'), None)
+            if previous_hash is None:
+                changes['added'].append(encoded)
+            elif previous_hash != get_feature_hash(encoded):
+                changes['modified'].append(encoded)
+        # Whatever was not found again is gone
+        changes['removed'] = list(layer_hashes)
+        if any(changes.values()):
+            delta[feature_type] = changes
+
+    # Layers the current revision does not have at all
+    for feature_type, layer_hashes in previous_hashes.items():
+        if layer_hashes:
+            delta[feature_type] = {'added': [], 'modified': [], 'removed': list(layer_hashes)}
+
+    return delta
+
+def write_feature_collection(f, encoded_features):
+    """Write canonical feature encodings into a binary file as a compact GeoJSON FeatureCollection"""
+    f.write(b'{"type":"FeatureCollection","features":[')
+    f.write(b','.join(encoded_features))
+    f.write(b']}')
+
+def write_delta_bundle(delta, bundle_path, previous_path, current_path):
+    """
+    Write a delta as a ZIP bundle
+
+    The bundle holds added/<feature type>.geojson and modified/<feature type>.geojson with the
+    complete new features, the manifest.json of the current revision and delta.json with the
+    change counts, the removed IDs per feature type and the SHA-256 of the previous archive
+    the delta applies to.
+    """
+    summary = {
+        "version": DELTA_VERSION,
+        "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "base": {"name": os.path.basename(previous_path), "sha256": get_file_hash(previous_path)},
+        "target": {"name": os.path.basename(current_path)},
+        "feature_types": {
+            feature_type: {change: len(items) for change, items in changes.items()}
+            for feature_type, changes in delta.items()
+        },
+        "removed": {feature_type: changes['removed'] for feature_type, changes in delta.items() if changes['removed']}
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(bundle_path)), exist_ok=True)
+    with zipfile.ZipFile(bundle_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for feature_type, changes in delta.items():
+            for change in ('added', 'modified'):
+                if changes[change]:
+                    with zipf.open(f"{change}/{feature_type}.geojson", "w") as f:
+                        write_feature_collection(f, changes[change])
+
+        write_current_manifest(zipf, current_path)
+        zipf.writestr(DELTA_FILE_NAME, json.dumps(summary, ensure_ascii=False, separators=(',', ':')))
+
+    return bundle_path
+
+def write_current_manifest(zipf, current_path):
+    """Copy the manifest of the current archive into the bundle, or create one for a GeoPackage"""
+    if current_path.lower().endswith('.zip'):
+        with zipfile.ZipFile(current_path) as current_zipf:
+            if "manifest.json" in current_zipf.namelist():
+                zipf.writestr("manifest.json", current_zipf.read("manifest.json"))
+        return
+    IMDF_export.create_manifest_json(os.path.dirname(zipf.filename), zipf=zipf)
+
+def print_delta(delta):
+    """Print the number of added, modified and removed features per feature type"""
+    if not delta:
+        print("No feature changed")
+    for feature_type, changes in delta.items():
+        print(
+            f"{feature_type}: {len(changes['added'])} added, {len(changes['modified'])} modified, "
+            f"{len(changes['removed'])} removed"
+        )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the feature changes between two revisions of a venue as a delta bundle")
+    parser.add_argument("previous", help="Previously published IMDF archive")
+    parser.add_argument("current", nargs="?", default=config.gpkg_path,
+                        help="Current GeoPackage or IMDF archive (default: config.gpkg_path)")
+    parser.add_argument("-o", "--output", default="imdf_delta.zip", help="Delta bundle to write (default: imdf_delta.zip)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=config.log_level, format="%(levelname)s: %(message)s")
+
+    start = time.perf_counter()
+    delta = compute_delta(args.previous, args.current)
+    print_delta(delta)
+    write_delta_bundle(delta, args.output, args.previous, args.current)
+    print(f"Wrote delta bundle {args.output} in {time.perf_counter() - start:.2f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import argparse
+import sys
+from contextlib import closing
+import config
+import gpkg_reader
+from shared_schema import relationships_config, junction_mappings
+
+def get_reference_checks():
+    """
+    Get the (referencing layer, field, referenced layer, referenced field) references to check
+
+    Built from relationships_config and the junction tables in junction_mappings,
+    whose reference column points to the id of the feature that gets the _ids field.
+    """
+    checks = []
+    for relation in relationships_config.values():
+        check = (
+            relation['referencing_layer'], relation['referencing_field'],
+            relation['referenced_layer'], relation['referenced_field']
+        )
+        if check not in checks:
+            checks.append(check)
+
+    for feature_type, mappings in junction_mappings.items():
+        for mapping in mappings.values():
+            check = (mapping['table'], mapping['ref'], feature_type, 'id')
+            if check not in checks:
+                checks.append(check)
+
+    return checks
+
+def read_key_set(conn, layer, field):
+    """Read the distinct non-empty values of a key column as strings"""
+    rows = conn.execute(f'SELECT DISTINCT "{field}" FROM "{layer}" WHERE "{field}" IS NOT NULL')
+    return {str(value) for value, in rows if value != ''}
+
+def find_orphan_references(gpkg_path, checks=None):
+    """
+    Find every reference to a feature that does not exist
+
+    Every key column is read once into a set and every referencing layer once with all its
+    reference fields, references are then checked with set lookups. Returns a list of orphan
+    dicts with the layer, feature_id (the id column, else the fid), field, value and
+    referenced_layer, ordered by check and feature.
+    """
+    checks = get_reference_checks() if checks is None else checks
+    available_layers = set(gpkg_reader.list_layers(gpkg_path))
+    orphans = []
+
+    with closing(gpkg_reader.connect(gpkg_path)) as conn:
+        layer_columns = {}
+        for layer in available_layers:
+            fid_column, _, attributes = gpkg_reader.get_table_schema(conn, layer)
+            layer_columns[layer] = (fid_column, {name for name, _ in attributes})
+
+        # Reference fields per referencing layer, in check order
+        references = {}
+        for layer, field, referenced_layer, referenced_field in checks:
+            if layer not in available_layers:
+                continue
+            if field not in layer_columns[layer][1]:
+                print(f"Warning: Layer '{layer}' has no field '{field}', its references are not checked")
+                continue
+            references.setdefault(layer, []).append((field, referenced_layer, referenced_field))
+
+        key_sets = {}
+        for layer, fields in references.items():
+            fid_column, attributes = layer_columns[layer]
+            id_column = 'id' if 'id' in attributes else fid_column
+            select = ", ".join(f'"{column}"' for column in [id_column] + [field for field, _, _ in fields])
+            rows = conn.execute(f'SELECT {select} FROM "{layer}" ORDER BY rowid').fetchall()
+
+            for index, (field, referenced_layer, referenced_field) in enumerate(fields, 1):
+                key = (referenced_layer, referenced_field)
+                if key not in key_sets:
+                    if referenced_layer in available_layers and referenced_field in layer_columns[referenced_layer][1]:
+                        key_sets[key] = read_key_set(conn, referenced_layer, referenced_field)
+                    else:
+                        key_sets[key] = set()
+
+                # Only the values missing from the key set need a look at the rows
+                values = {str(row[index]) for row in rows if row[index] is not None and row[index] != ''}
+                missing = values - key_sets[key]
+                if not missing:
+                    continue
+                orphans.extend(
+                    {
+                        "layer": layer,
+                        "feature_id": row[0],
+                        "field": field,
+                        "value": str(row[index]),
+                        "referenced_layer": referenced_layer
+                    }
+                    for row in rows if row[index] is not None and str(row[index]) in missing
+                )
+
+    return orphans
+
+def print_orphan_references(orphans):
+    """Print every orphan reference and a count per layer and field"""
+    for orphan in orphans:
+        print(
+            f"Orphan reference: {orphan['layer']} {orphan['feature_id']} {orphan['field']}="
+            f"{orphan['value']} (no {orphan['referenced_layer']} with this ID)"
+        )
+
+    counts = {}
+    for orphan in orphans:
+        key = f"{orphan['layer']}.{orphan['field']}"
+        counts[key] = counts.get(key, 0) + 1
+    for key, count in counts.items():
+        print(f"{key}: {count} orphan reference(s)")
+
+def validate_references(gpkg_path, mode=None):
+    """
+    Check the ID references of a GeoPackage as set by config.validate_references
+
+    Prints every orphan reference, raises ValueError in "error" mode if there are any.
+    Returns the orphans.
+    """
+    mode = config.validate_references if mode is None else mode
+    if mode == "off":
+        return []
+    if mode not in ("warn", "error"):
+        raise ValueError(f"Unknown reference validation mode '{mode}', expected 'warn', 'error' or 'off'")
+
+    orphans = find_orphan_references(gpkg_path)
+    if not orphans:
+        print("All ID references point to existing features")
+        return orphans
+
+    print_orphan_references(orphans)
+    if mode == "error":
+        raise ValueError(f"Found {len(orphans)} orphan ID reference(s), fix them or set config.validate_references to 'warn'")
+    print(f"Warning: Found {len(orphans)} orphan ID reference(s)")
+    return orphans
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that every ID reference of a GeoPackage points to an existing feature")
+    parser.add_argument("gpkg", nargs="?", default=config.gpkg_path, help="GeoPackage file (default: config.gpkg_path)")
+    args = parser.parse_args(argv)
+
+    orphans = find_orphan_references(args.gpkg)
+    print_orphan_references(orphans)
+    print(f"{len(orphans)} orphan ID reference(s)")
+    return 1 if orphans else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# The layer schema lives in GPKG_create/gpkg_schema.py and is shared with the GeoPackage
+# setup scripts; importing this module makes GPKG_create importable
+GPKG_CREATE_FOLDER = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'GPKG_create'))
+if GPKG_CREATE_FOLDER not in sys.path:
+    sys.path.append(GPKG_CREATE_FOLDER)
+
+from gpkg_schema import gpkg_layers_config, domain_fields_config, domain_config, relationships_config, junction_mappings
@@ -0,0 +1,229 @@
+import argparse
+import ast
+import glob
+import json
+import os
+import platform
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+
+from generate_venue import generate_venue
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, peak RSS then comes from psutil if it is installed
+    resource = None
+
+BENCHMARK_FOLDER = os.path.dirname(os.path.abspath(__file__))
+EXPORT_FOLDER = os.path.join(BENCHMARK_FOLDER, '..', 'IMDF_export')
+BASELINE_PATH = os.path.join(BENCHMARK_FOLDER, 'baselines.json')
+
+# Size tiers: venues, buildings per venue, levels per building and units per level
+TIERS = {
+    'small': {'venues': 1, 'buildings': 1, 'levels': 2, 'units': 50},
+    'medium': {'venues': 1, 'buildings': 2, 'levels': 5, 'units': 200},
+    'large': {'venues': 2, 'buildings': 3, 'levels': 10, 'units': 250}
+}
+
+# Stages in the order they run, zip_archive zips the files written by export_layers
+STAGES = ['export_layers', 'zip_archive', 'pipeline']
+
+def get_peak_rss_mb():
+    """Peak resident set size of this process in MB, None if it cannot be measured"""
+    if resource is not None:
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Reported in bytes on macOS and in kilobytes elsewhere
+        return peak_rss / (1024 * 1024) if sys.platform == 'darwin' else peak_rss / 1024
+
+    try:
+        import psutil
+    except ImportError:
+        return None
+    memory_info = psutil.Process().memory_info()
+    return getattr(memory_info, 'peak_wset', memory_info.rss) / (1024 * 1024)
+
+def run_stage(stage, gpkg_path, output_folder, settings):
+    """Run one stage in this process, returns its wall time in seconds"""
+    sys.path.insert(0, EXPORT_FOLDER)
+    import config
+
+    for name, value in settings.items():
+        setattr(config, name, value)
+    config.gpkg_path = gpkg_path
+    config.output_dir = output_folder
+
+    if stage == 'pipeline':
+        # The full script run, including its imports
+        start = time.perf_counter()
+        runpy.run_path(os.path.join(EXPORT_FOLDER, 'IMDF_export.py'), run_name='__main__')
+        return time.perf_counter() - start
+
+    import IMDF_export
+
+    if stage == 'export_layers':
+        layers = [layer for layer in IMDF_export.list_layers(gpkg_path) if layer not in config.excluded_layers]
+        start = time.perf_counter()
+        IMDF_export.export_layers_custom_format(gpkg_path, output_folder, layers)
+        return time.perf_counter() - start
+
+    if stage == 'zip_archive':
+        files_to_zip = sorted(glob.glob(os.path.join(output_folder, '*.geojson')))
+        start = time.perf_counter()
+        IMDF_export.create_zip_archive(output_folder, files_to_zip)
+        return time.perf_counter() - start
+
+    raise ValueError(f"Unknown stage '{stage}'")
+
+def measure_stage(stage, gpkg_path, output_folder, settings, repeat, verbose):
+    """
+    Run a stage repeat times, each in a fresh process so that peak RSS is per stage
+
+    Returns the best wall time and the highest peak RSS of the runs.
+    """
+    runs = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as temp_folder:
+            result_path = os.path.join(temp_folder, 'result.json')
+            command = [
+                sys.executable, os.path.abspath(__file__), '--run-stage', stage,
+                '--gpkg', gpkg_path, '--output', output_folder, '--result', result_path,
+                '--stage-settings', repr(settings)
+            ]
+            subprocess.run(command, check=True, stdout=None if verbose else subprocess.DEVNULL)
+
+            with open(result_path, encoding='utf-8') as f:
+                runs.append(json.load(f))
+
+    peak_rss_values = [run['peak_rss_mb'] for run in runs if run['peak_rss_mb'] is not None]
+    return {
+        'wall_time': min(run['wall_time'] for run in runs),
+        'peak_rss_mb': max(peak_rss_values) if peak_rss_values else None
+    }
+
+def count_exported_features(counts):
+    """Number of features the exporter writes for the given layer row counts"""
+    sys.path.insert(0, EXPORT_FOLDER)
+    import config
+    return sum(count for layer, count in counts.items() if layer not in config.excluded_layers)
+
+def run_tier(tier, work_folder, settings, repeat, verbose):
+    """Generate the venue of a tier and measure all stages on it"""
+    tier_folder = os.path.join(work_folder, tier)
+    os.makedirs(tier_folder, exist_ok=True)
+    gpkg_path = os.path.join(tier_folder, 'venue.gpkg')
+
+    counts = generate_venue(gpkg_path, **TIERS[tier])
+    features = count_exported_features(counts)
+    print(f"{tier}: {features} features ({sum(counts.values())} rows)")
+
+    results = {}
+    for stage in STAGES:
+        stage_folder = os.path.join(tier_folder, 'pipeline' if stage == 'pipeline' else 'export')
+        result = measure_stage(stage, gpkg_path, stage_folder, settings, repeat, verbose)
+        result['features'] = features
+        result['features_per_second'] = features / result['wall_time'] if result['wall_time'] else None
+        results[stage] = result
+    return results
+
+def load_baselines():
+    """Load the saved baselines, empty if none have been saved yet"""
+    try:
+        with open(BASELINE_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def save_baselines(baselines):
+    """Save the baselines next to this script"""
+    with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, indent=2)
+        f.write('\n')
+    print(f"Saved baselines to {BASELINE_PATH}")
+
+def compare_to_baseline(result, baseline, tolerance):
+    """List the metrics of a stage that regressed by more than tolerance against its baseline"""
+    regressions = []
+    for metric in ('wall_time', 'peak_rss_mb'):
+        if result.get(metric) is None or not baseline.get(metric):
+            continue
+        change = result[metric] / baseline[metric] - 1
+        if change > tolerance:
+            regressions.append(f"{metric} +{change:.0%}")
+    return regressions
+
+def print_report(results, baselines, settings, tolerance):
+    """Print a table of all measured stages, returns the number of regressed stages"""
+    print()
+    print(f"{'tier':<8} {'stage':<14} {'wall s':>9} {'features/s':>11} {'peak MB':>9}  baseline")
+
+    regressed = 0
+    for tier, stages in results.items():
+        for stage, result in stages.items():
+            tier_baseline = baselines.get(tier, {})
+            baseline = tier_baseline.get('stages', {}).get(stage)
+            if baseline is None:
+                status = "-"
+            elif tier_baseline.get('settings', {}) != settings:
+                status = "baseline has other settings"
+            else:
+                regressions = compare_to_baseline(result, baseline, tolerance)
+                status = "REGRESSION " + ", ".join(regressions) if regressions else "ok"
+                regressed += bool(regressions)
+
+            peak_rss = f"{result['peak_rss_mb']:.1f}" if result['peak_rss_mb'] is not None else "n/a"
+            print(
+                f"{tier:<8} {stage:<14} {result['wall_time']:>9.3f} "
+                f"{result['features_per_second'] or 0:>11.0f} {peak_rss:>9}  {status}"
+            )
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the IMDF export on synthetic venues")
+    parser.add_argument("settings", nargs="*", metavar="key=value", help="IMDF_export config overrides")
+    parser.add_argument("--tiers", nargs="+", choices=list(TIERS), default=['small', 'medium'])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage, the best wall time is reported")
+    parser.add_argument("--work-dir", help="Folder for the generated venues and exports (default: a temporary folder)")
+    parser.add_argument("--save-baseline", action="store_true", help="Save the results as the new baselines")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown/growth against the baselines")
+    parser.add_argument("--verbose", action="store_true", help="Show the exporter output")
+    # Internal: run a single stage in a child process
+    parser.add_argument("--run-stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--gpkg", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    parser.add_argument("--stage-settings", default="{}", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        # The parsed settings come as a dict literal, so the exporter is not imported before the stage is timed
+        settings = ast.literal_eval(args.stage_settings)
+        wall_time = run_stage(args.run_stage, args.gpkg, args.output, settings)
+        with open(args.result, 'w', encoding='utf-8') as f:
+            json.dump({'wall_time': wall_time, 'peak_rss_mb': get_peak_rss_mb()}, f)
+        return 0
+
+    sys.path.insert(0, EXPORT_FOLDER)
+    from export_cli import parse_settings
+    settings = parse_settings(args.settings)
+
+    with tempfile.TemporaryDirectory() as temp_folder:
+        work_folder = args.work_dir or temp_folder
+        results = {tier: run_tier(tier, work_folder, settings, args.repeat, args.verbose) for tier in args.tiers}
+
+    baselines = load_baselines()
+    regressed = print_report(results, baselines, settings, args.tolerance)
+
+    if args.save_baseline:
+        for tier, stages in results.items():
+            baselines[tier] = {'settings': settings, 'python': platform.python_version(), 'stages': stages}
+        save_baselines(baselines)
+        return 0
+
+    return 1 if regressed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+import argparse
+import os
+import sys
+import tempfile
+
+from benchmark import TIERS, count_exported_features, measure_stage, parse_settings
+from generate_venue import generate_venue
+
+READER_ENGINES = ['arrow', 'geopandas', 'sqlite']
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the layer export time of the reader engines")
+    parser.add_argument("settings", nargs="*", metavar="key=value", help="IMDF_export config overrides")
+    parser.add_argument("--tiers", nargs="+", choices=list(TIERS), default=['small', 'medium', 'large'])
+    parser.add_argument("--engines", nargs="+", choices=READER_ENGINES, default=READER_ENGINES)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per engine, the best wall time is reported")
+    args = parser.parse_args()
+
+    settings = parse_settings(args.settings)
+
+    print(f"{'tier':<8} {'engine':<10} {'wall s':>9} {'features/s':>11} {'peak MB':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as work_folder:
+        for tier in args.tiers:
+            gpkg_path = os.path.join(work_folder, f'{tier}.gpkg')
+            features = count_exported_features(generate_venue(gpkg_path, **TIERS[tier]))
+
+            results = {}
+            for engine in args.engines:
+                output_folder = os.path.join(work_folder, f'{tier}_{engine}')
+                results[engine] = measure_stage(
+                    'export_layers', gpkg_path, output_folder, dict(settings, reader_engine=engine),
+                    args.repeat, verbose=False
+                )
+
+            # Speedup against the slowest engine
+            slowest = max(result['wall_time'] for result in results.values())
+            for engine, result in results.items():
+                peak_rss = f"{result['peak_rss_mb']:.1f}" if result['peak_rss_mb'] is not None else "n/a"
+                print(
+                    f"{tier:<8} {engine:<10} {result['wall_time']:>9.3f} {features / result['wall_time']:>11.0f} "
+                    f"{peak_rss:>9} {slowest / result['wall_time']:>7.1f}x"
+                )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
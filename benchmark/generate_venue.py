@@ -0,0 +1,263 @@
+import argparse
+import json
+import os
+import random
+import sqlite3
+import struct
+import sys
+import uuid
+from datetime import datetime, timezone
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'IMDF_export'))
+from shared_schema import gpkg_layers_config
+# shared_schema makes GPKG_create importable, the tables are created as gpkg_builder.py creates them
+from gpkg_builder import SRS_ID, GEOMETRY_TYPE_NAMES, GEOMETRY_COLUMN, create_system_tables, create_layer_table
+
+# Reference fields -> layer they point to
+REFERENCE_LAYERS = {
+    'address_id': 'address',
+    'anchor_id': 'anchor',
+    'building_id': 'building',
+    'footprint_id': 'footprint',
+    'geofence_id': 'geofence',
+    'level_id': 'level',
+    'opening_id': 'opening',
+    'relationship_id': 'relationship',
+    'unit_id': 'unit',
+    'amenity_id': 'amenity',
+    'origin_unit_id': 'unit',
+    'origin_opening_id': 'opening',
+    'destination_unit_id': 'unit',
+    'destination_opening_id': 'opening'
+}
+
+CATEGORIES = {
+    'venue': 'universitycampus',
+    'building': 'unspecified',
+    'level': 'unspecified',
+    'unit': 'room',
+    'opening': 'pedestrian',
+    'amenity': 'restroom',
+    'fixture': 'furniture',
+    'footprint': 'ground',
+    'geofence': 'paidarea',
+    'occupant': 'restaurant',
+    'relationship': 'traversal',
+    'section': 'eatingdrinking'
+}
+
+# Size of a unit cell in degrees, units of a level are laid out on a grid
+CELL_SIZE = 0.0001
+ORIGIN = (25.27, 54.67)
+
+def get_layer_counts(venues, buildings, levels, units):
+    """Get the number of rows of every layer for a venue of the given size"""
+    building_count = venues * buildings
+    level_count = building_count * levels
+    unit_count = level_count * units
+    anchor_count = max(1, unit_count // 10)
+
+    return {
+        'accessibility_domain': 1,
+        'access_control_domain': 1,
+        'address': venues + building_count,
+        'venue': venues,
+        'building': building_count,
+        'footprint': building_count,
+        'level': level_count,
+        'unit': unit_count,
+        'opening': unit_count,
+        'section': level_count * 2,
+        'geofence': level_count,
+        'fixture': max(1, unit_count // 5),
+        'kiosk': level_count,
+        'detail': level_count * 4,
+        'anchor': anchor_count,
+        'amenity': max(1, unit_count // 10),
+        'occupant': anchor_count,
+        'relationship': max(1, unit_count // 4),
+        'level_building': level_count,
+        'footprint_building': building_count,
+        'geofence_level': level_count,
+        'geofence_building': level_count,
+        'geofence_parent': max(0, level_count - 1),
+        'section_parent': level_count,
+        'relationship_unit': max(1, unit_count // 4) * 2,
+        'relationship_opening': max(1, unit_count // 4),
+        'amenity_unit': max(1, unit_count // 10)
+    }
+
+def gpkg_blob(wkb):
+    """Wrap little endian WKB in a GeoPackage geometry header without envelope"""
+    return b'GP\x00\x01' + struct.pack('<i', SRS_ID) + wkb
+
+def point_wkb(x, y):
+    """Encode a point as WKB"""
+    return struct.pack('<BIdd', 1, 1, x, y)
+
+def linestring_wkb(points):
+    """Encode a linestring as WKB"""
+    return struct.pack('<BII', 1, 2, len(points)) + b''.join(struct.pack('<dd', *p) for p in points)
+
+def polygon_wkb(ring):
+    """Encode a single ring polygon as WKB"""
+    return struct.pack('<BIII', 1, 3, 1, len(ring)) + b''.join(struct.pack('<dd', *p) for p in ring)
+
+def multi_wkb(type_code, parts):
+    """Encode a multi geometry from the WKB of its parts"""
+    return struct.pack('<BII', 1, type_code, len(parts)) + b''.join(parts)
+
+def cell_origin(index):
+    """Lower left corner of the index-th grid cell"""
+    row, column = divmod(index, 100)
+    return ORIGIN[0] + column * CELL_SIZE * 1.2, ORIGIN[1] + row * CELL_SIZE * 1.2
+
+def make_geometry(geometry_type, index):
+    """Build a GeoPackage geometry blob of the given gpkg_schema geometry type"""
+    x, y = cell_origin(index)
+    ring = [(x, y), (x + CELL_SIZE, y), (x + CELL_SIZE, y + CELL_SIZE), (x, y + CELL_SIZE), (x, y)]
+
+    if geometry_type == 'Point':
+        return gpkg_blob(point_wkb(x + CELL_SIZE / 2, y + CELL_SIZE / 2))
+    if geometry_type == 'String':
+        return gpkg_blob(linestring_wkb([(x, y), (x + CELL_SIZE / 2, y)]))
+    if geometry_type == 'Polygon':
+        return gpkg_blob(polygon_wkb(ring))
+    if geometry_type == 'MultiLineString':
+        return gpkg_blob(multi_wkb(5, [
+            linestring_wkb([(x, y), (x + CELL_SIZE, y + CELL_SIZE)]),
+            linestring_wkb([(x, y + CELL_SIZE), (x + CELL_SIZE, y)])
+        ]))
+    return gpkg_blob(multi_wkb(6, [polygon_wkb(ring)]))
+
+def make_value(rng, layer, name, dtype, index, ids):
+    """Build a plausible value for an attribute of the index-th row of a layer"""
+    if name == 'id':
+        return ids[layer][index]
+    if name in ('code', 'value'):
+        code = 'wheelchair' if layer == 'accessibility_domain' else 'keycard'
+        return code if name == 'code' else code.title()
+
+    # Junction tables pair up rows of both referenced layers
+    if name in ('parent_id', 'child_id'):
+        parent_layer = 'geofence' if layer == 'geofence_parent' else 'section'
+        offset = 0 if name == 'parent_id' else 1
+        targets = ids[parent_layer]
+        return targets[(index + offset) % len(targets)]
+    if name in REFERENCE_LAYERS:
+        targets = ids[REFERENCE_LAYERS[name]]
+        if layer == 'relationship' and name.startswith(('origin_opening', 'destination_opening')):
+            return targets[index % len(targets)] if index % 2 else None
+        if layer == 'relationship' and name.startswith(('origin_unit', 'destination_unit')):
+            return None if index % 2 else targets[index % len(targets)]
+        return targets[(index * 7 + len(name)) % len(targets)]
+
+    if dtype == 'StringList':
+        if name == 'alt_name' and index % 3:
+            return None
+        return json.dumps({'en': f'{layer.title()} {index}', 'lt': f'{layer} Nr. {index}'}, ensure_ascii=False)
+    if dtype == 'Bool':
+        return index % 2
+    if dtype == 'Int':
+        return index
+    if dtype == 'DateTime':
+        if rng.random() < 0.5:
+            return None
+        return datetime(2024, 1, 1 + index % 28, 8, 0, tzinfo=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+    if name == 'category':
+        return CATEGORIES.get(layer, 'unspecified')
+    if name == 'display_point':
+        # A point on the feature geometry: the middle of the cell, or of the line of openings
+        x, y = cell_origin(index)
+        if gpkg_layers_config[layer]['geometry'] == 'String':
+            return f'{y:.7f}, {x + CELL_SIZE / 4:.7f}'
+        return f'{y + CELL_SIZE / 2:.7f}, {x + CELL_SIZE / 2:.7f}'
+    if name in ('accessibility', 'access_control'):
+        return rng.choice(['{wheelchair}', '{keycard}', None])
+    if name in ('origin_type', 'destination_type', 'intermediary_type'):
+        return 'opening' if index % 2 else 'unit'
+    if name == 'direction':
+        return 'undirected'
+    if name == 'type':
+        return 'hinged' if index % 2 else None
+    if name == 'material':
+        return 'wood' if index % 3 == 0 else None
+    if name == 'hours':
+        return 'Mo-Fr 08:00-20:00' if index % 2 else None
+    if name == 'phone':
+        return f'+3705{index:07d}'
+    if name == 'website':
+        return f'https://example.com/{layer}/{index}'
+    if name == 'country':
+        return 'LT'
+    if name == 'locality':
+        return 'Vilnius'
+    if name == 'address':
+        return f'Naugarduko g. {index + 1}'
+    if name == 'postal_code':
+        return f'{3000 + index % 1000:05d}'
+    if name in ('unit', 'province', 'postal_code_ext', 'postal_code_vanity', 'restriction', 'correlation_id'):
+        return None
+    return f'{name} {index}'
+
+def write_layer(conn, rng, layer, layer_config, count, ids):
+    """Create and fill the table of one layer"""
+    attributes = layer_config['attributes']
+    geometry_type = layer_config['geometry']
+    has_geometry = geometry_type in GEOMETRY_TYPE_NAMES
+
+    # Without the ST_* functions of GDAL the R-tree triggers could not run on a plain sqlite3 connection
+    create_layer_table(conn, layer, layer_config, spatial_index=False)
+
+    names = list(attributes)
+    placeholders = ', '.join('?' * (len(names) + has_geometry))
+    select = ([GEOMETRY_COLUMN] if has_geometry else []) + [f'"{name}"' for name in names]
+    sql = f'INSERT INTO "{layer}" ({", ".join(select)}) VALUES ({placeholders})'
+
+    def rows():
+        for index in range(count):
+            values = [make_value(rng, layer, name, attributes[name]['type'], index, ids) for name in names]
+            if has_geometry:
+                values.insert(0, make_geometry(geometry_type, index))
+            yield values
+
+    conn.executemany(sql, rows())
+
+def generate_venue(gpkg_path, venues=1, buildings=1, levels=2, units=50, seed=1):
+    """Generate a synthetic IMDF GeoPackage from gpkg_layers_config, returns the row count of every layer"""
+    if os.path.exists(gpkg_path):
+        os.remove(gpkg_path)
+
+    rng = random.Random(seed)
+    counts = get_layer_counts(venues, buildings, levels, units)
+
+    # IDs are generated up front so that references can point to any layer
+    ids = {
+        layer: [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(counts[layer])]
+        for layer in gpkg_layers_config
+    }
+
+    conn = sqlite3.connect(gpkg_path)
+    try:
+        with conn:
+            create_system_tables(conn)
+            for layer, layer_config in gpkg_layers_config.items():
+                write_layer(conn, rng, layer, layer_config, counts[layer], ids)
+    finally:
+        conn.close()
+
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic IMDF GeoPackage")
+    parser.add_argument("gpkg_path")
+    parser.add_argument("--venues", type=int, default=1)
+    parser.add_argument("--buildings", type=int, default=1, help="Buildings per venue")
+    parser.add_argument("--levels", type=int, default=2, help="Levels per building")
+    parser.add_argument("--units", type=int, default=50, help="Units per level")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    counts = generate_venue(args.gpkg_path, args.venues, args.buildings, args.levels, args.units, args.seed)
+    print(f"Generated {args.gpkg_path} with {sum(counts.values())} rows")
@@ -0,0 +1,46 @@
+import os
+import sys
+from contextlib import ExitStack
+
+import pytest
+
+TESTS_FOLDER = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_FOLDER, '..', 'IMDF_export'))
+sys.path.insert(0, os.path.join(TESTS_FOLDER, '..', 'benchmark'))
+import config
+import IMDF_export
+from generate_venue import generate_venue
+
+@pytest.fixture(scope="session")
+def venue_gpkg(tmp_path_factory):
+    """Small synthetic venue with null values in most layers"""
+    gpkg_path = str(tmp_path_factory.mktemp("venue") / "venue.gpkg")
+    generate_venue(gpkg_path, venues=1, buildings=1, levels=2, units=12, seed=3)
+    return gpkg_path
+
+@pytest.fixture
+def use_reader_engine(monkeypatch):
+    """
+    Switch config.reader_engine for a test, skipping engines whose packages are missing
+
+    pandas reads missing strings as NaN meanwhile (as pandas 3 does by default), so the
+    geopandas engine sees the values it gets in the field.
+    """
+    with ExitStack() as stack:
+        def use(reader_engine):
+            if reader_engine != 'sqlite' and IMDF_export.shapely is None:
+                pytest.skip("shapely is not installed")
+            if reader_engine == 'arrow' and not IMDF_export.is_arrow_available():
+                pytest.skip("pyogrio with pyarrow is not installed")
+            if reader_engine == 'geopandas' and IMDF_export.gpd is None:
+                pytest.skip("geopandas is not installed")
+            monkeypatch.setattr(config, 'reader_engine', reader_engine)
+
+            pd = sys.modules.get('pandas')
+            if pd is not None:
+                try:
+                    stack.enter_context(pd.option_context('future.infer_string', True))
+                except (KeyError, pd.errors.OptionError):
+                    pass
+
+        yield use
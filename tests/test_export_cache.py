@@ -0,0 +1,24 @@
+import zipfile
+
+import config
+import export_metrics
+import IMDF_export
+
+def export_features(gpkg_path, output_folder):
+    """Export every layer into a zip, returns the features counter of the run"""
+    export_metrics.reset()
+    layers = [layer for layer in IMDF_export.list_layers(gpkg_path) if layer not in config.excluded_layers]
+    with zipfile.ZipFile(output_folder / "venue.zip", "w") as zipf:
+        IMDF_export.export_layers_custom_format(gpkg_path, str(output_folder), layers, zipf)
+    return export_metrics.get_metrics().get_report()["counters"]
+
+def test_cached_layers_count_their_features(monkeypatch, use_reader_engine, venue_gpkg, tmp_path):
+    use_reader_engine('sqlite')
+    monkeypatch.setattr(config, 'incremental_export', True)
+
+    exported = export_features(venue_gpkg, tmp_path)
+    cached = export_features(venue_gpkg, tmp_path)
+
+    assert exported['features'] > 0
+    assert cached['cached_layers'] > 0
+    assert cached['features'] == exported['features']
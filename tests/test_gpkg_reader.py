@@ -0,0 +1,111 @@
+import json
+import os
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'IMDF_export'))
+import gpkg_reader
+
+EMPTY_POINT_WKB = struct.pack('<BIdd', 1, 1, float('nan'), float('nan'))
+POINT_WKB = struct.pack('<BIdd', 1, 1, 25.123456789, 54.987654321)
+
+@pytest.fixture(params=[False, True], ids=["python", "numpy"])
+def rounding(request, monkeypatch):
+    """Run a test with the pure Python rounding and with the NumPy rounding"""
+    if request.param:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(gpkg_reader, 'numpy', None)
+    return request.param
+
+@pytest.mark.parametrize("precision", [None, 7])
+def test_empty_point_has_no_coordinates(rounding, precision):
+    geometry, offset = gpkg_reader.decode_wkb(EMPTY_POINT_WKB, precision=precision)
+    assert geometry == {"type": "Point", "coordinates": ()}
+    assert offset == len(EMPTY_POINT_WKB)
+
+def test_point_is_rounded(rounding):
+    geometry, _ = gpkg_reader.decode_wkb(POINT_WKB, precision=7)
+    assert geometry == {"type": "Point", "coordinates": (25.1234568, 54.9876543)}
+
+def gpkg_blob(wkb, envelope=(), empty=False):
+    """Wrap WKB in a GeoPackage header, the envelope indicator follows the number of envelope values"""
+    indicator = {0: 0, 4: 1, 6: 2}[len(envelope)]
+    flags = 0x01 | indicator << 1 | (0x10 if empty else 0)
+    return b'GP\x00' + bytes([flags]) + struct.pack('<i', 4326) + struct.pack(f'<{len(envelope)}d', *envelope) + wkb
+
+@pytest.mark.parametrize("envelope", [(), (25.0, 26.0, 54.0, 55.0), (25.0, 26.0, 54.0, 55.0, 0.0, 1.0)],
+                         ids=["no_envelope", "xy_envelope", "xyz_envelope"])
+def test_envelope_is_skipped(envelope):
+    geometry = gpkg_reader.decode_gpkg_geometry(gpkg_blob(POINT_WKB, envelope))
+    assert geometry == {"type": "Point", "coordinates": (25.123456789, 54.987654321)}
+
+# (WKT, big endian WKB, with envelope) of the rows of the comparison GeoPackage
+SHAPES = [
+    ("POINT (25.27 54.67)", False, False),
+    ("POINT Z (25.27 54.67 12.5)", False, True),
+    ("LINESTRING (25.27 54.67, 25.2701234567891 54.6701234567891)", True, True),
+    ("POLYGON ((0 0, 4 0, 4 4, 0 4, 0 0), (1 1, 1 2, 2 2, 2 1, 1 1))", False, True),
+    ("POLYGON Z ((0 0 1, 4 0 1, 4 4 2, 0 0 1))", True, False),
+    ("MULTIPOINT ((1 2), (3 4))", False, False),
+    ("MULTILINESTRING Z ((0 0 0, 1 1 1), (2 2 2, 3 3.00000001 3))", False, True),
+    ("MULTIPOLYGON (((0 0, 2 0, 2 2, 0 0)), ((5 5, 9 5, 9 9, 5 9, 5 5), (6 6, 6 7, 7 7, 6 6)))", True, True),
+    ("GEOMETRYCOLLECTION (POINT (1 1), LINESTRING (0 0, 1 1))", False, False),
+    ("POINT EMPTY", False, False),
+    (None, False, False)
+]
+
+@pytest.fixture(scope="module")
+def shapes_gpkg(tmp_path_factory):
+    """GeoPackage with one row per SHAPES entry in a table with a generic geometry column"""
+    shapely = pytest.importorskip("shapely")
+    import sqlite3
+    from shared_schema import GPKG_CREATE_FOLDER
+    sys.path.insert(0, GPKG_CREATE_FOLDER)
+    from gpkg_builder import create_system_tables
+
+    gpkg_path = str(tmp_path_factory.mktemp("shapes") / "shapes.gpkg")
+    conn = sqlite3.connect(gpkg_path)
+    with conn:
+        create_system_tables(conn)
+        conn.execute('CREATE TABLE shapes (fid INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL, geom GEOMETRY, id TEXT)')
+        conn.execute("INSERT INTO gpkg_contents (table_name, data_type, identifier, srs_id) VALUES ('shapes', 'features', 'shapes', 4326)")
+        conn.execute("INSERT INTO gpkg_geometry_columns VALUES ('shapes', 'geom', 'GEOMETRY', 4326, 2, 0)")
+        for index, (wkt, big_endian, with_envelope) in enumerate(SHAPES):
+            blob = None
+            if wkt is not None:
+                geometry = shapely.from_wkt(wkt)
+                wkb = shapely.to_wkb(geometry, flavor='iso', byte_order=0 if big_endian else 1, include_srid=False)
+                envelope = ()
+                if with_envelope and not geometry.is_empty:
+                    min_x, min_y, max_x, max_y = geometry.bounds
+                    envelope = (min_x, max_x, min_y, max_y)
+                    if shapely.has_z(geometry):
+                        z = shapely.get_coordinates(geometry, include_z=True)[:, 2]
+                        envelope += (z.min(), z.max())
+                blob = gpkg_blob(wkb, envelope, empty=geometry.is_empty)
+            conn.execute("INSERT INTO shapes (geom, id) VALUES (?, ?)", (blob, f"shape-{index}"))
+    conn.close()
+    return gpkg_path
+
+@pytest.mark.parametrize("precision", [None, 7, 0])
+def test_sqlite_reader_matches_geopandas(monkeypatch, shapes_gpkg, precision):
+    gpd = pytest.importorskip("geopandas")
+    import config
+    import IMDF_export
+    monkeypatch.setattr(config, 'coordinate_precision', precision)
+
+    rows = gpkg_reader.read_rows(shapes_gpkg, 'shapes', precision)
+    decoded = {row['id']: row['geometry'] for row in rows}
+
+    gdf = gpd.read_file(shapes_gpkg, layer='shapes')
+    geometries = IMDF_export.round_geometries(gdf['geometry'].values)
+    expected = {
+        feature_id: geometry.__geo_interface__ if geometry else None
+        for feature_id, geometry in zip(gdf['id'], geometries)
+    }
+
+    # Tuples and lists encode alike
+    assert json.loads(json.dumps(decoded)) == json.loads(json.dumps(expected))
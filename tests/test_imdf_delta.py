@@ -0,0 +1,27 @@
+import zipfile
+
+import pytest
+
+import config
+import IMDF_export
+import imdf_delta
+
+@pytest.fixture(scope="module")
+def venue_archive(venue_gpkg, tmp_path_factory):
+    """IMDF archive of the synthetic venue, exported with the sqlite engine"""
+    output_folder = tmp_path_factory.mktemp("archive")
+    archive_path = output_folder / "venue.zip"
+    previous_engine = config.reader_engine
+    config.reader_engine = 'sqlite'
+    try:
+        layers = [layer for layer in IMDF_export.list_layers(venue_gpkg) if layer not in config.excluded_layers]
+        with zipfile.ZipFile(archive_path, "w") as zipf:
+            IMDF_export.export_layers_custom_format(venue_gpkg, str(output_folder), layers, zipf)
+    finally:
+        config.reader_engine = previous_engine
+    return str(archive_path)
+
+@pytest.mark.parametrize("reader_engine", ['sqlite', 'arrow', 'geopandas'])
+def test_unchanged_gpkg_yields_empty_delta(use_reader_engine, venue_gpkg, venue_archive, reader_engine):
+    use_reader_engine(reader_engine)
+    assert imdf_delta.compute_delta(venue_archive, venue_gpkg) == {}
@@ -0,0 +1,95 @@
+import io
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'IMDF_export'))
+import config
+import IMDF_export
+
+FEATURE_COLLECTION = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "id": "b0b4b6a2-0c1f-4a7e-9a53-0f3c1d2e4a10",
+            "type": "Feature",
+            "feature_type": "unit",
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [[[25.27, 54.67], [25.2701, 54.67], [25.2701, 54.6701], [25.27, 54.67]]]
+            },
+            "properties": {
+                "category": "room",
+                "name": {"en": "Room 1", "lt": "Kambarys Nr. 1"},
+                "alt_name": None,
+                "level_id": "6fc484db-cc2b-38b3-c5dd-dd3512803301",
+                "display_point": {"type": "Point", "coordinates": [25.27005, 54.67005]}
+            }
+        },
+        {
+            "id": "3e0b9f35-3c5d-4d5b-8b8e-5f2d3f0f6c21",
+            "type": "Feature",
+            "feature_type": "opening",
+            "geometry": {"type": "LineString", "coordinates": [[25.27, 54.67], [25.2701, 54.67]]},
+            "properties": {
+                "category": "pedestrian",
+                "door": {"type": "hinged", "automatic": False, "material": "wood"},
+                "accessibility": ["wheelchair", "hearing"],
+                "name": None
+            }
+        }
+    ]
+}
+
+MANIFEST = {
+    "version": "1.0.0",
+    "created": "2024-01-01T10:00:00Z",
+    "generated_by": "Vilnius University",
+    "language": "lt-LT"
+}
+
+PROFILES = [
+    (output_profile, json_encoder)
+    for output_profile in ('pretty', 'compact')
+    for json_encoder in ('json', 'orjson', 'auto')
+]
+
+def skip_without_orjson(json_encoder):
+    if json_encoder == 'orjson' and IMDF_export.orjson is None:
+        pytest.skip("orjson is not installed")
+
+@pytest.mark.parametrize("output_profile, json_encoder", PROFILES)
+@pytest.mark.parametrize("document", [FEATURE_COLLECTION, MANIFEST], ids=["feature_collection", "manifest"])
+def test_profiles_decode_to_identical_json(output_profile, json_encoder, document):
+    skip_without_orjson(json_encoder)
+    encode = IMDF_export.create_json_encoder(output_profile, json_encoder)
+    assert json.loads(encode(document)) == document
+
+@pytest.mark.parametrize("output_profile, json_encoder", PROFILES)
+def test_streamed_feature_collection_decodes_to_identical_json(monkeypatch, output_profile, json_encoder):
+    skip_without_orjson(json_encoder)
+    monkeypatch.setattr(config, 'output_profile', output_profile)
+    monkeypatch.setattr(config, 'json_encoder', json_encoder)
+
+    f = io.BytesIO()
+    IMDF_export.write_feature_collection(FEATURE_COLLECTION['features'], f)
+    assert json.loads(f.getvalue()) == FEATURE_COLLECTION
+
+@pytest.mark.parametrize("output_profile, json_encoder", PROFILES)
+def test_profiles_encode_numpy_scalars_and_datetimes(output_profile, json_encoder):
+    skip_without_orjson(json_encoder)
+    np = pytest.importorskip("numpy")
+
+    encode = IMDF_export.create_json_encoder(output_profile, json_encoder)
+    properties = {
+        "level": np.int64(2),
+        "automatic": np.bool_(True),
+        "height": np.float64(2.5),
+        "start": datetime(2024, 1, 1, 10, tzinfo=timezone.utc)
+    }
+    assert json.loads(encode(properties)) == {
+        "level": 2, "automatic": True, "height": 2.5, "start": "2024-01-01T10:00:00+00:00"
+    }
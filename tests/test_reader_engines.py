@@ -0,0 +1,57 @@
+import io
+
+import pytest
+
+import config
+import IMDF_export
+
+def export_engine_layers(gpkg_path):
+    """Export every layer of a GeoPackage with the current reader engine, returns layer -> bytes"""
+    layers = [layer for layer in IMDF_export.list_layers(gpkg_path) if layer not in config.excluded_layers]
+    junction_index = IMDF_export.load_junction_index(gpkg_path)
+
+    exported = {}
+    for layer in layers:
+        features = IMDF_export.read_layer_features(gpkg_path, layer, junction_index)
+        f = io.BytesIO()
+        if features is not None:
+            IMDF_export.write_feature_collection(features, f)
+        exported[layer] = f.getvalue()
+    return exported
+
+@pytest.mark.parametrize("reader_engine", ['arrow', 'geopandas'])
+def test_reader_engines_export_identical_bytes(monkeypatch, use_reader_engine, venue_gpkg, reader_engine):
+    monkeypatch.setattr(config, 'json_encoder', 'json')
+    use_reader_engine('sqlite')
+    expected = export_engine_layers(venue_gpkg)
+    use_reader_engine(reader_engine)
+    exported = export_engine_layers(venue_gpkg)
+
+    assert list(exported) == list(expected)
+    for layer in expected:
+        assert exported[layer] == expected[layer], f"{layer} differs from the sqlite engine"
+        assert b'NaN' not in exported[layer]
+
+@pytest.mark.parametrize("arrow_available, feature_cache, expected", [
+    (True, False, 'arrow'),
+    (False, False, 'sqlite'),
+    (True, True, 'sqlite')
+])
+def test_auto_reader_engine(monkeypatch, arrow_available, feature_cache, expected):
+    monkeypatch.setattr(config, 'reader_engine', 'auto')
+    monkeypatch.setattr(config, 'feature_cache', feature_cache)
+    monkeypatch.setattr(IMDF_export, 'is_arrow_available', lambda: arrow_available)
+    assert IMDF_export.get_reader_engine() == expected
+
+@pytest.mark.parametrize("reader_engine", ['arrow', 'geopandas'])
+def test_reader_engines_check_geometries_alike(monkeypatch, use_reader_engine, venue_gpkg, reader_engine):
+    shapely = pytest.importorskip("shapely")
+    if not hasattr(shapely, 'dwithin'):
+        pytest.skip("Geometry QA needs shapely 2.1 or newer")
+    monkeypatch.setattr(config, 'json_encoder', 'json')
+    monkeypatch.setattr(config, 'geometry_qa', 'fix')
+    monkeypatch.setattr(config, 'display_point_check', 'fix')
+    use_reader_engine('sqlite')
+    expected = export_engine_layers(venue_gpkg)
+    use_reader_engine(reader_engine)
+    assert export_engine_layers(venue_gpkg) == expected